@@ -37,6 +37,11 @@ from myhdl._Waiter import _Waiter, _inferWaiter, _SignalWaiter, _SignalTupleWait
 from myhdl._util import _flatten, _printExcInfo
 from myhdl._instance import _Instantiator
 from myhdl._ShadowSignal import _ShadowSignal
+from myhdl import _checkpoint, _fork
+from myhdl._simstats import SimulationStats
+from myhdl._capture import Capture
+from myhdl._playback import Playback
+from myhdl._clock import Clock, _schedules
 
 
 schedule = _futureEvents.append
@@ -47,6 +52,7 @@ class _error:
 _error.ArgType = "Inappropriate argument type"
 _error.MultipleCosim = "Only a single cosimulator argument allowed"
 _error.DuplicatedArg = "Duplicated argument"
+_error.ProfileCoverage = "A run can have a profile or a coverage, not both"
 
 
 class Simulation(object):
@@ -55,14 +61,19 @@ class Simulation(object):
 
     Methods:
     run -- run a simulation for some duration
+    checkpoint -- save the simulation state to a file
+    restore -- restore the simulation state from a file
+    fork -- continue the simulation in several child processes
+    capture -- record the values of signals at each trigger
+    playback -- drive signals from a file of test vectors
 
     """
 
     def __init__(self, *args):
         """ Construct a simulation object.
 
-        *args -- list of arguments. Each argument is a generator or
-                 a nested sequence of generators.
+        *args -- list of arguments. Each argument is a generator, a
+                 Clock, or a nested sequence of them.
 
         """
 #         print(_siglist)
@@ -71,9 +82,16 @@ class Simulation(object):
         self._waiters, self._cosim = _makeWaiters(arglist)
         if not self._cosim and _simulator._cosim:
             warn("Cosimulation not registered as Simulation argument")
+        self._arglist = arglist
+        self.stats = SimulationStats()
+        self._started = False
         self._finished = False
         del _futureEvents[:]
         del _siglist[:]
+        self._clocks = _schedules([arg for arg in arglist
+                                   if isinstance(arg, Clock)])
+        for c in self._clocks:
+            c.start(0)
 #         print(_siglist)
 
     def _finalize(self):
@@ -91,14 +109,87 @@ class Simulation(object):
             s._clear()
         self._finished = True
 
+    def checkpoint(self, path):
+        """ Save the state of a suspended simulation to a file.
+
+        path -- name of the checkpoint file
+
+        """
+        _checkpoint.save(self, path)
+
+    def restore(self, path):
+        """ Restore the state saved by checkpoint, before running.
+
+        path -- name of the checkpoint file
+
+        """
+        _checkpoint.load(self, path)
+
+    def fork(self, n, setup=None, duration=None):
+        """ Continue a suspended simulation in n child processes.
+
+        n -- number of child processes
+        setup -- callback, called with the child index in each child
+                 before it runs; its return value is sent to the parent
+                 after the run, so it can hold captured values
+        duration -- simulation duration of each child (default: forever)
+
+        Returns a list of ForkResult tuples with fields index, returncode,
+        time, value and exception (a formatted traceback or None).
+        The simulation in the parent process is not affected.
+
+        """
+        return _fork.fork(self, n, setup, duration)
+
+    def capture(self, signals, on):
+        """ Record the values of signals each time a trigger fires.
+
+        signals -- dict of names and signals, or a sequence of signals;
+                   Arrays and StructTypes are recorded per element
+        on -- the trigger: an edge, such as clk.posedge, or a signal,
+              for each change
+
+        Returns a Capture, with a column of values per signal and a
+        column of times. The values are sampled as a process that waits
+        on the trigger sees them, but no process is resumed.
+
+        """
+        return Capture(signals, on)
+
+    def playback(self, signals, path, on=None, fmt=None):
+        """ Drive signals with the rows of a file of test vectors.
+
+        signals -- sequence of signals, one per column; Arrays and
+                   StructTypes take a column per element
+        path -- a .npy file, or a raw binary file
+        on -- the trigger: an edge, such as clk.posedge, or a signal. If
+              None, the first column holds the time of each row,
+              relative to the current time
+        fmt -- struct format of the rows of a raw binary file. The
+               default is a little-endian word per column, the smallest
+               that fits the signal, and an unsigned 64-bit time
+
+        Returns a Playback. The file is memory-mapped, and each row is
+        applied as the next values of the signals, as a process would,
+        but no process is resumed.
+
+        """
+        return Playback(signals, path, on, fmt)
+
     def runc(self, duration=0, quiet=0):
         simrunc.run(sim=self, duration=duration, quiet=quiet)
 
-    def run(self, duration=None, quiet=0):
+    def run(self, duration=None, quiet=0, profile=None, coverage=None):
         """ Run the simulation for some duration.
 
         duration -- specified simulation duration (default: forever)
         quiet -- don't print StopSimulation messages (default: off)
+        profile -- SimulationProfile that records the activations and
+                   the time of each process (default: no profiling)
+        coverage -- SimulationCoverage that records the toggles of the
+                    signals, the states of the enum signals and the
+                    activations of the always blocks (default: no
+                    coverage). It can't be combined with a profile.
 
         """
 
@@ -107,6 +198,11 @@ class Simulation(object):
         # From this point it will propagate to the caller, that can catch it.
         if self._finished:
             raise StopSimulation("Simulation has already finished")
+        if coverage is not None:
+            if profile is not None:
+                raise SimulationError(_error.ProfileCoverage)
+            coverage._begin(self)
+        self._started = True
         waiters = self._waiters
         maxTime = None
         if duration:
@@ -120,6 +216,10 @@ class Simulation(object):
         tracing = _simulator._tracing
         tracefile = _simulator._tf
         exc = []
+        if profile is not None:
+            names = profile._names(self._arglist)
+        stats = self.stats
+        stats._begin(t, len(_futureEvents))
 #         _pop = waiters.pop
 #         _append = waiters.append
 #         _extend = waiters.extend
@@ -129,19 +229,32 @@ class Simulation(object):
         while 1:
             try:
 
+                updates = len(_siglist)
+                if coverage is not None:
+                    coverage._update(_siglist)
                 for s in _siglist:
                     waiters.extend(s._update())
                 del _siglist[:]
 
 #                 if waiters:
 #                     print('waiters not empty', len(waiters))
+                resumed = 0
+                if profile is not None:
+                    resumed = profile._run(waiters, actives, exc, names)
+                elif coverage is not None:
+                    resumed = coverage._run(waiters, actives, exc)
                 while waiters:
                     waiter = waiters.pop()
+                    resumed += 1
 #                     print(repr(waiter))
                     try:
                         waiter.next(waiters, actives, exc)
                     except StopIteration:
                         continue
+                if updates or resumed:
+                    stats.updates += updates
+                    stats.resumed += resumed
+                    stats.deltas += 1
 
                 if cosim:
                     cosim._get()
@@ -166,6 +279,7 @@ class Simulation(object):
                         raise _SuspendSimulation(
                             "Simulated %s timesteps" % duration)
 
+                    stats._step(len(_futureEvents))
                     _futureEvents.sort(key=itemgetter(0))
                     t = _simulator._time = _futureEvents[0][0]
                     if tracing:
@@ -183,6 +297,7 @@ class Simulation(object):
                                 waiters.extend(event.apply())
 
                             del _futureEvents[0]
+                            stats._due += 1
 
                         else:
                             break
@@ -190,6 +305,7 @@ class Simulation(object):
                     raise StopSimulation("No more events")
 
             except _SuspendSimulation:
+                stats._end(t, len(_futureEvents))
                 if not quiet:
                     _printExcInfo()
 
@@ -199,6 +315,7 @@ class Simulation(object):
                 return 1
 
             except StopSimulation:
+                stats._end(t, len(_futureEvents))
                 if not quiet:
                     _printExcInfo()
 
@@ -207,6 +324,7 @@ class Simulation(object):
                 return 0
 
             except Exception as e:
+                stats._end(t, len(_futureEvents))
                 if tracing:
                     tracefile.flush()
 
@@ -240,6 +358,10 @@ def _makeWaiters(arglist):
         elif isinstance(arg, _Waiter):
             waiters.append(arg)
 
+        elif isinstance(arg, Clock):
+            # scheduled by the simulation
+            pass
+
         elif arg == True:
             pass
 
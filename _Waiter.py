@@ -24,11 +24,9 @@ from __future__ import absolute_import
 from types import GeneratorType
 
 import ast
-import inspect
 import re
 
 
-from myhdl._util import _dedent
 from myhdl._delay import delay
 from myhdl._join import join
 from myhdl._Signal import _Signal, _WaiterList, posedge, negedge
@@ -206,28 +204,34 @@ class _kind(object):
 
 
 def _inferWaiter(gen):
+    from myhdl._codecache import _getCodeInfo
     f = gen.gi_frame
-    s = inspect.getsource(f)
-    s = _dedent(s)
-    root = ast.parse(s)
-    root.symdict = f.f_globals.copy()
-    root.symdict.update(f.f_locals)
-    # print ast.dump(root)
-    v = _YieldVisitor(root)
-    v.visit(root)
-    if v.kind == _kind.EDGE_TUPLE:
+    info = _getCodeInfo(f)
+    f_locals = f.f_locals
+    key = ('waiter', info.signature(f_locals, f.f_globals))
+    kind = info.results.get(key)
+    if kind is None:
+        root = info.parse()
+        root.symdict = f.f_globals.copy()
+        root.symdict.update(f_locals)
+        # print ast.dump(root)
+        v = _YieldVisitor(root)
+        v.visit(root)
+        kind = info.results[key] = v.kind
+
+    if kind == _kind.EDGE_TUPLE:
         return _EdgeTupleWaiter(gen)
     
-    if v.kind == _kind.SIGNAL_TUPLE:
+    if kind == _kind.SIGNAL_TUPLE:
         return _SignalTupleWaiter(gen)
     
-    if v.kind == _kind.DELAY:
+    if kind == _kind.DELAY:
         return _DelayWaiter(gen)
     
-    if v.kind == _kind.EDGE:
+    if kind == _kind.EDGE:
         return _EdgeWaiter(gen)
     
-    if v.kind == _kind.SIGNAL:
+    if kind == _kind.SIGNAL:
         return _SignalWaiter(gen)
     
     # default
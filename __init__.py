@@ -21,6 +21,8 @@
 
 This module provides the following myhdl objects:
 Simulation -- simulation class
+Clock -- clock generator, for a simulation
+elaborate -- function that elaborates a design once for repeated simulation
 StopStimulation -- exception that stops a simulation
 now -- function that returns the current time
 Signal -- factory function to model hardware signals
@@ -40,12 +42,15 @@ bin -- returns a binary string representation.
 concat -- function to concat ints, bitstrings, bools, intbvs, Signals
        -- returns an intbv
 instances -- function that returns all instances defined in a function
+block -- decorator that records the hierarchy of a design explicitly
 always --
 always_comb -- decorator that returns an input-sensitive generator
 always_seq --
 ResetSignal --
 enum -- function that returns an enumeration type
 traceSignals -- function that enables signal tracing in a VCD file
+SimulationProfile -- class that profiles the processes of a simulation
+SimulationCoverage -- class that records the coverage of a simulation
 toVerilog -- function that converts a design to Verilog
 
 """
@@ -103,6 +108,11 @@ class InstanceError(Error):
 
 
 
+class BlockError(Error):
+    pass
+
+
+
 class CosimulationError(Error):
     pass
 
@@ -187,18 +197,24 @@ from ._simulator import now
 from ._delay import delay
 from ._Cosimulation import Cosimulation
 from ._Simulation import Simulation
+from ._clock import Clock
+from ._elaborate import elaborate
 from ._misc import rtlinstances, instances, downrange  # , rtlinstance
 from ._always_comb import always_comb
 from ._always_seq import always_seq, ResetSignal
 from ._always import always
 from ._instance import instance
+from ._block import block
 from ._enum import enum, EnumType, EnumItemType
 from ._traceSignals import traceSignals, _TraceSignalsClass
+from ._profile import SimulationProfile
+from ._coverage import SimulationCoverage
 from myhdl import conversion
 from .conversion import toVerilog
 from .conversion import toVHDL
 from ._structured import Array, StructType
 from ._tristate import Tristate
+from ._memfile import readmemh
 
 __all__ = ["bin",
            "concat",
@@ -217,8 +233,11 @@ __all__ = ["bin",
            "StopSimulation",
            "Cosimulation",
            "Simulation",
+           "Clock",
+           "elaborate",
            "instances",
            "instance",
+           "block",
            "always_comb",
            "always_seq",
            "ResetSignal",
@@ -227,6 +246,8 @@ __all__ = ["bin",
            "EnumType",
            "EnumItemType",
            "traceSignals",
+           "SimulationProfile",
+           "SimulationCoverage",
            "_TraceSignalsClass",
            "toVerilog",
            "toVHDL",
@@ -235,6 +256,7 @@ __all__ = ["bin",
            "Array",
            "StructType",
            "rtlinstances",
+           "readmemh",
 #            "rtlinstance"
            ]
 
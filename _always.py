@@ -24,7 +24,7 @@ from __future__ import absolute_import
 from types import FunctionType
 
 from myhdl import AlwaysError
-from myhdl._util import _isGenFunc, _makeAST
+from myhdl._util import _isGenFunc, _makeAST, _ChainedDict
 from myhdl._delay import delay
 from myhdl._Signal import _Signal, _WaiterList
 from myhdl._Waiter import _Waiter, _SignalWaiter, _SignalTupleWaiter, \
@@ -71,17 +71,17 @@ class _Always(_Instantiator):
         self.func = func
         self.senslist = tuple(senslist)
         super(_Always, self).__init__(self.genfunc)
-        varnames = func.__code__.co_varnames
-        symdict = {}
-        for n, v in func.__globals__.items():
-            if n not in varnames:
-                symdict[n] = v
         # handle free variables
         freevars = func.__code__.co_freevars
         if freevars:
             closure = (c.cell_contents for c in func.__closure__)
-            symdict.update(zip(freevars, closure))
-        self.symdict = symdict
+            cells = dict(zip(freevars, closure))
+        else:
+            cells = {}
+        # a view on the globals, as a copy per instance adds up; the
+        # local names of func hide the globals
+        self.symdict = _ChainedDict(cells, func.__globals__,
+                                    hidden=func.__code__.co_varnames)
 
     def _waiter(self):
         # infer appropriate waiter class
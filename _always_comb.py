@@ -20,20 +20,17 @@
 from __future__ import absolute_import, print_function
 
 import sys
-import inspect
 from types import FunctionType
 import re
-import ast
 
 from myhdl import AlwaysCombError
 from myhdl._Signal import _Signal, _isListOfSigs
 from myhdl._intbv import intbv
-from myhdl._util import _isGenFunc, _dedent
+from myhdl._util import _isGenFunc
 from myhdl._Waiter import _Waiter, _SignalWaiter, _SignalTupleWaiter
 from myhdl._instance import _Instantiator
 from myhdl._always import _Always
-from myhdl._resolverefs import _AttrRefTransformer
-from myhdl._visitors import _SigNameVisitor
+from myhdl._visitors import _getSigNames
 
 from myhdl._structured import Array, StructType
 
@@ -104,24 +101,9 @@ class _AlwaysComb(_Always):
         senslist = []
         super(_AlwaysComb, self).__init__(func, senslist)
 #         print('_AlwaysComb', senslist)
-        s = inspect.getsource(func)
-        s = _dedent(s)
-        tree = ast.parse(s)
-#         print(ast.dump(tree))
-#         for item in ast.dump(tree).split():
-#             print(item)
-        v = _AttrRefTransformer(self)
-        v.visit(tree)
-#         print(ast.dump(tree))
-#         for item in ast.dump(tree).split():
-#             print(item)
-        v = _SigNameVisitor(self.symdict)
-        v.visit(tree)
-#         print(ast.dump(tree))
-#         for item in ast.dump(tree).split():
-#             print(item)
-        self.inputs = v.results['input']
-        self.outputs = v.results['output']
+        results = _getSigNames(self)
+        self.inputs = results['input']
+        self.outputs = results['output']
 #         print(v.results)
 #         print('inputs:', self.inputs)
 #         print('outputs:', self.outputs)
@@ -129,7 +111,7 @@ class _AlwaysComb(_Always):
 #         if inouts:
 #             raise AlwaysCombError(_error.SignalAsInout % inouts)
 
-        if v.results['embedded_func']:
+        if results['embedded_func']:
             raise AlwaysCombError(_error.EmbeddedFunction)
 #         print(self.inputs)
 #         print('2', self.senslist)
@@ -22,18 +22,15 @@ from __future__ import absolute_import
 
 
 import sys
-import inspect
 from types import FunctionType
-import ast
 
 from myhdl import AlwaysError, intbv
-from myhdl._util import _isGenFunc, _dedent
+from myhdl._util import _isGenFunc
 from myhdl._delay import delay
 from myhdl._Signal import _Signal, _WaiterList, _isListOfSigs
 from myhdl._Waiter import _Waiter, _EdgeWaiter, _EdgeTupleWaiter
 from myhdl._always import _Always
-from myhdl._resolverefs import _AttrRefTransformer
-from myhdl._visitors import _SigNameVisitor
+from myhdl._visitors import _getSigNames
 
 from myhdl._structured import Array, StructType
 
@@ -119,24 +116,17 @@ class _AlwaysSeq(_Always):
         super(_AlwaysSeq, self).__init__(func, senslist)
 
         # now infer outputs to be reset
-        s = inspect.getsource(func)
-        s = _dedent(s)
-        tree = ast.parse(s)
-#         print ast.dump(tree)
-        v = _AttrRefTransformer(self)
-        v.visit(tree)
-        v = _SigNameVisitor(self.symdict)
-        v.visit(tree)
-
-        if v.results['inout']:
-            raise AlwaysSeqError(_error.SigAugAssign, v.results['inout'])
-
-        if v.results['embedded_func']:
+        results = _getSigNames(self)
+
+        if results['inout']:
+            raise AlwaysSeqError(_error.SigAugAssign, results['inout'])
+
+        if results['embedded_func']:
             raise AlwaysSeqError(_error.EmbeddedFunction)
 
         sigregs = self.sigregs = []
         varregs = self.varregs = []
-        for n in v.results['output']:
+        for n in results['output']:
             reg = self.symdict[n]
             if isinstance(reg, _Signal):
                 sigregs.append(reg)
@@ -0,0 +1,100 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the block decorator.
+
+A design whose top level function is decorated with @block has its
+hierarchy recorded explicitly by the decorated functions, instead of
+by a profile hook on every Python call. Functions that are not
+decorated are transparent: the instances they return are attributed
+to the enclosing block.
+
+A block should create its instances and subblocks in its own body,
+as that is where its local names are taken from.
+"""
+from __future__ import absolute_import
+
+
+import sys
+from functools import wraps
+from types import FunctionType
+
+from myhdl import BlockError
+from myhdl._util import _isGenFunc
+
+
+class _error:
+    pass
+
+
+_error.ArgType = "decorated object should be a classic (non-generator) function"
+
+
+# the _HierExtr instance that records the hierarchy, if any
+_extractor = None
+# the records of the blocks that are being called, innermost last
+_blockStack = []
+
+
+class _BlockRecord(object):
+    __slots__ = ['code', 'frame']
+
+    def __init__(self, code):
+        self.code = code
+        self.frame = None
+
+
+def block(func):
+    if not isinstance(func, FunctionType) or _isGenFunc(func):
+        raise BlockError(_error.ArgType)
+
+    @wraps(func)
+    def _block_wrapper(*args, **kwargs):
+        if _extractor is None:
+            return func(*args, **kwargs)
+        return _extractor.callBlock(_block_wrapper, func, sys._getframe(1), args, kwargs)
+
+    _block_wrapper.__wrapped__ = func
+    _block_wrapper._isBlock = True
+    return _block_wrapper
+
+
+_blockWrapperCode = block(lambda: None).__code__
+
+
+def _isBlock(obj):
+    return getattr(obj, '_isBlock', False)
+
+
+def _noteFrame(frame):
+    """ Find the frame of the innermost active block, starting at frame.
+
+    Called when a subblock or an instance is created, to capture the
+    frame (and so the local names) of the block that creates it.
+    """
+    if not _blockStack:
+        return
+    rec = _blockStack[-1]
+    if rec.frame is not None:
+        return
+    while frame is not None and frame.f_code is not _blockWrapperCode:
+        if frame.f_code is rec.code:
+            rec.frame = frame
+            return
+        frame = frame.f_back
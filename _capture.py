@@ -0,0 +1,176 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the signal capture of a simulation.
+
+A capture records the values of signals in columns, each time a trigger
+fires. It waits on the trigger itself, as a process would, but without
+a generator: a sample costs a method call, and a store per signal.
+
+The columns are NumPy arrays when NumPy is installed, and lists
+otherwise.
+"""
+from __future__ import absolute_import
+
+
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from myhdl import SimulationError
+from myhdl import _simulator
+from myhdl._compat import string_types
+from myhdl._intbv import intbv
+from myhdl._Signal import _Signal, _WaiterList
+from myhdl._structured import Array, StructType
+
+
+class _error:
+    pass
+
+
+_error.ArgType = "Expected a Signal, Array or StructType"
+_error.TriggerType = "Capture trigger should be an edge or a signal"
+
+
+def _expand(name, obj):
+    """ Return the signals of an object, with their names """
+    if isinstance(obj, _Signal):
+        return [(name, obj)]
+    if isinstance(obj, (Array, list)):
+        sigs = []
+        for i in range(len(obj)):
+            sigs.extend(_expand('%s[%d]' % (name, i), obj[i]))
+        return sigs
+    if isinstance(obj, StructType):
+        sigs = []
+        for key in obj.sequencelist or sorted(vars(obj)):
+            item = getattr(obj, key, None)
+            if isinstance(item, (_Signal, Array, StructType)):
+                sigs.extend(_expand('%s.%s' % (name, key), item))
+        return sigs
+    raise SimulationError(_error.ArgType, repr(obj))
+
+
+def _dtype(sig):
+    """ Return the NumPy type of the values of a signal """
+    val = sig._val
+    if isinstance(val, bool):
+        return numpy.bool_
+    if isinstance(val, intbv):
+        if val._min is not None and val._max is not None and \
+                -2**63 <= val._min and val._max <= 2**63:
+            return numpy.int64
+    return object
+
+
+def _value(val):
+    """ The value to store: a copy, as an intbv changes in place """
+    if isinstance(val, intbv):
+        return val._val
+    return val
+
+
+class Capture(object):
+
+    """ The values of signals, sampled at each trigger.
+
+    capture[name] -- the column of a signal, by name or by the signal
+    capture.time -- the column of the sample times
+    len(capture) -- the number of samples
+    """
+
+    def __init__(self, signals, on, size=1024):
+        if isinstance(signals, dict):
+            items = signals.items()
+        else:
+            items = [(str(i), s) for i, s in enumerate(signals)]
+        sigs = []
+        for name, obj in items:
+            sigs.extend(_expand(name, obj))
+        if isinstance(on, _Signal):
+            on = on._eventWaiters
+        if not isinstance(on, _WaiterList):
+            raise SimulationError(_error.TriggerType, repr(on))
+        self.names = [name for name, s in sigs]
+        self._index = {}
+        for i, (name, s) in enumerate(sigs):
+            self._index[name] = self._index[id(s)] = i
+        self._sigs = [s for name, s in sigs]
+        self._n = 0
+        if numpy is None:
+            self._time = []
+            self._cols = [[] for s in self._sigs]
+        else:
+            self._time = numpy.empty(size, numpy.int64)
+            self._cols = [numpy.empty(size, _dtype(s)) for s in self._sigs]
+        self._trigger = on
+        # a waiter that is not a process
+        self.generator = None
+        self.hasRun = 0
+        on.append(self)
+
+    def next(self, waiters, actives, exc):
+        n = self._n
+        if numpy is None:
+            self._time.append(_simulator._time)
+            for col, s in zip(self._cols, self._sigs):
+                col.append(_value(s._val))
+        else:
+            if n == len(self._time):
+                self._grow()
+            self._time[n] = _simulator._time
+            for col, s in zip(self._cols, self._sigs):
+                col[n] = _value(s._val)
+        self._n = n + 1
+        self._trigger.append(self)
+
+    def _grow(self):
+        n = self._n
+        self._time = numpy.resize(self._time, 2 * n)
+        for i, col in enumerate(self._cols):
+            new = numpy.empty(2 * n, col.dtype)
+            new[:n] = col
+            self._cols[i] = new
+
+    def stop(self):
+        """ Stop sampling """
+        if self in self._trigger:
+            self._trigger.remove(self)
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def time(self):
+        return self._time[:self._n]
+
+    def __getitem__(self, key):
+        i = self._index[key if isinstance(key, string_types) else id(key)]
+        return self._cols[i][:self._n]
+
+    def columns(self):
+        """ Return the columns by name, time first """
+        cols = OrderedDict([('time', self.time)])
+        for name in self.names:
+            cols[name] = self[name]
+        return cols
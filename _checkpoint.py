@@ -0,0 +1,257 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the checkpoint and restore support of Simulation.
+
+A checkpoint holds the simulation time, the values of all signals, the
+pending events and the state of the processes. Only processes that can
+be restarted are supported: @always, @always_comb and @always_seq blocks,
+as they are stateless between activations apart from intbv's in their
+closure. Other generators are only supported when they have finished.
+
+The signals of the design are those used by its processes. They are
+identified by the order in which they were created, and the processes
+by their order in the Simulation, so a checkpoint should be restored in
+a simulation of the same design, elaborated in the same way.
+"""
+from __future__ import absolute_import
+
+
+import pickle
+from copy import deepcopy
+from types import ModuleType
+
+from myhdl import SimulationError
+from myhdl import _simulator
+from myhdl._simulator import _signals, _siglist, _futureEvents
+from myhdl._Signal import _Signal, _DelayedSignal, _SignalWrap, _WaiterList
+from myhdl._Waiter import _Waiter, _DelayWaiter
+from myhdl._always import _Always
+from myhdl._intbv import intbv
+from myhdl._structured import Array, StructType
+from myhdl._enum import EnumItemType
+from myhdl._clock import Clock, _ClockSchedule
+
+
+class _error:
+    pass
+
+
+_error.NotRestorable = "Process state can't be saved; only @always " \
+                       "blocks and finished generators are supported"
+_error.Started = "Restore should be done before the simulation is run"
+_error.Finished = "Simulation has already finished"
+_error.Mismatch = "Checkpoint doesn't match the simulated design"
+
+_version = 1
+
+
+def _encode(val):
+    if isinstance(val, intbv):
+        return ('intbv', val._val)
+    if isinstance(val, EnumItemType):
+        return ('enum', val._name)
+    return ('obj', val)
+
+
+def _decode(enc, ref):
+    kind, val = enc
+    if kind == 'intbv':
+        obj = deepcopy(ref)
+        obj._val = val
+        return obj
+    if kind == 'enum':
+        return getattr(ref._type, val)
+    return val
+
+
+def _processInfo(arg):
+    func = getattr(arg, 'func', None) or getattr(arg, 'genfunc', None)
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return type(arg).__name__
+    return (type(arg).__name__, code.co_name, code.co_firstlineno)
+
+
+def _closureState(arg):
+    """ Return the intbv objects in the closure of an always block """
+    closure = arg.func.__closure__ or ()
+    return [c.cell_contents for c in closure
+            if isinstance(c.cell_contents, intbv)]
+
+
+def _designSignals(sim):
+    """ Return the signals used by the processes, in creation order.
+
+    The signals are found in the sensitivity lists, the names and the
+    closures of the processes, also as elements of lists, Arrays and
+    StructTypes, and as attributes of interface objects.
+    """
+    found = {}
+    # the containers that were walked, held so that their ids stay unique
+    seen = {}
+
+    def add(obj):
+        if isinstance(obj, _Signal):
+            if id(obj) not in found:
+                found[id(obj)] = obj
+                add(obj._slicesigs)
+                add(getattr(obj, '_sig', None))
+            return
+        if id(obj) in seen:
+            return
+        seen[id(obj)] = obj
+        if isinstance(obj, (list, tuple)):
+            for o in obj:
+                add(o)
+        elif isinstance(obj, _WaiterList):
+            add(getattr(obj, 'sig', None))
+        elif isinstance(obj, Array):
+            add(obj._flatten())
+        elif isinstance(obj, StructType):
+            add([getattr(obj, key, None) for key in
+                 obj.sequencelist or sorted(vars(obj))])
+        elif hasattr(obj, '__dict__') and not callable(obj) and \
+                not isinstance(obj, ModuleType):
+            # an interface
+            add([v for k, v in sorted(vars(obj).items())])
+
+    for arg in sim._arglist:
+        if isinstance(arg, _Always):
+            add(arg.senslist)
+            add(getattr(arg, 'reset', None))
+            add([arg.symdict.get(n) for n in arg.func.__code__.co_names])
+            add([c.cell_contents for c in arg.func.__closure__ or ()])
+        elif isinstance(arg, Clock):
+            add(arg.sig)
+    return [s for s in _signals if id(s) in found]
+
+
+def save(sim, path):
+    if sim._finished:
+        raise SimulationError(_error.Finished)
+    procs = []
+    genmap = {}
+    for i, arg in enumerate(sim._arglist):
+        if isinstance(arg, _Always):
+            if arg._waiter() is _Waiter:
+                # mixed sensitivity list: the waiter state can't be rebuilt
+                raise SimulationError(_error.NotRestorable, arg.func.__name__)
+            genmap[id(arg.gen)] = i
+            state = [v._val for v in _closureState(arg)]
+            procs.append(['always', state, None])
+        elif isinstance(arg, Clock):
+            procs.append(['clock', None, None])
+        else:
+            gen = getattr(arg, 'gen', arg)
+            if getattr(gen, 'gi_frame', True) is not None:
+                raise SimulationError(_error.NotRestorable, repr(arg))
+            procs.append(['done', None, None])
+
+    signals = _designSignals(sim)
+    # signals compare by value, so index them by identity
+    sigmap = dict((id(s), i) for i, s in enumerate(signals))
+    delayed = []
+    clocks = []
+    for t, event in _futureEvents:
+        if isinstance(event, _SignalWrap):
+            delayed.append((t, sigmap[id(event.sig)],
+                            _encode(event.next), event.timeStamp))
+        elif isinstance(event, _ClockSchedule):
+            clocks.append((t, sim._clocks.index(event), event._index,
+                           event._base))
+        elif event.generator is not None:
+            i = genmap.get(id(event.generator))
+            if i is None or not isinstance(event, _DelayWaiter):
+                raise SimulationError(_error.NotRestorable, repr(event.generator))
+            procs[i][2] = t
+
+    sigs = []
+    for s in signals:
+        extra = None
+        if isinstance(s, _DelayedSignal):
+            extra = (_encode(s._nextZ), s._timeStamp)
+        sigs.append((_encode(s._val), _encode(s._next), extra))
+
+    data = {'version': _version,
+            'time': _simulator._time,
+            'design': [_processInfo(arg) for arg in sim._arglist],
+            'nrsigs': len(signals),
+            'procs': procs,
+            'sigs': sigs,
+            'delayed': delayed,
+            'clocks': clocks,
+            }
+    with open(path, 'wb') as f:
+        pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+
+
+def load(sim, path):
+    if sim._started:
+        raise SimulationError(_error.Started)
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    signals = _designSignals(sim)
+    if data['version'] != _version or data['nrsigs'] != len(signals) or \
+            data['design'] != [_processInfo(arg) for arg in sim._arglist]:
+        raise SimulationError(_error.Mismatch)
+
+    for s, (val, nxt, extra) in zip(signals, data['sigs']):
+        del s._eventWaiters[:]
+        del s._posedgeWaiters[:]
+        del s._negedgeWaiters[:]
+        ref = s._val if s._val is not None else s._init
+        s._val = _decode(val, ref)
+        s._next = _decode(nxt, ref)
+        if extra is not None:
+            s._nextZ = _decode(extra[0], ref)
+            s._timeStamp = extra[1]
+
+    waiters = []
+    del _futureEvents[:]
+    del _siglist[:]
+    for arg, (kind, state, t) in zip(sim._arglist, data['procs']):
+        if kind in ('done', 'clock'):
+            continue
+        for obj, val in zip(_closureState(arg), state):
+            obj._val = val
+        arg.gen = arg.genfunc()
+        if t is None:
+            waiters.append(arg.waiter)
+        else:
+            # advance to the delay clause, and wait for the saved time
+            w = _DelayWaiter(arg.gen)
+            next(arg.gen)
+            _futureEvents.append((t, w))
+    for t, i, nxt, timeStamp in data['delayed']:
+        s = signals[i]
+        _futureEvents.append((t, _SignalWrap(s, _decode(nxt, s._val), timeStamp)))
+    for t, i, index, base in data.get('clocks', ()):
+        c = sim._clocks[i]
+        c._index, c._base = index, base
+        _futureEvents.append((t, c))
+    # shadow signals: the generator is stateless, the waiter is not
+    for s in signals:
+        if hasattr(s, '_waiter'):
+            w = s._waiter
+            s._waiter = type(w)(w.generator)
+            waiters.append(s._waiter)
+
+    sim._waiters = waiters
+    _simulator._time = data['time']
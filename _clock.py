@@ -0,0 +1,156 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the clock generators of a simulation.
+
+A Clock is passed to Simulation like a process, but it is not one: the
+simulation groups its clocks into schedules, each with the edges of its
+clocks over their common period, computed once. A schedule is a single
+future event, that sets the clocks of an edge time directly and
+reschedules itself for the next one.
+"""
+from __future__ import absolute_import
+
+
+from myhdl._compat import integer_types
+from myhdl._simulator import _siglist, _futureEvents
+from myhdl._Signal import _Signal
+
+
+class _error:
+    pass
+
+
+_error.SigType = "Clock should drive a Signal"
+_error.Period = "Clock period should be an int of at least 2"
+_error.Duty = "Clock duty cycle should leave a high and a low time of at least 1"
+_error.Phase = "Clock phase should be an int in range(period)"
+
+# the maximum number of edge times of a schedule
+_maxEdges = 4096
+
+
+class Clock(object):
+
+    """ A clock generator, for Simulation.
+
+    sig -- the clock signal
+    period -- the clock period, in simulation time units
+    duty -- the fraction of the period that the clock is high
+    phase -- the time of the first rising edge
+
+    The clock keeps its initial value until its first edge.
+    """
+
+    def __init__(self, sig, period, duty=0.5, phase=0):
+        if not isinstance(sig, _Signal):
+            raise TypeError(_error.SigType)
+        if not isinstance(period, integer_types) or period < 2:
+            raise ValueError(_error.Period)
+        high = int(round(period * duty))
+        if not 0 < high < period:
+            raise ValueError(_error.Duty)
+        if not isinstance(phase, integer_types) or not 0 <= phase < period:
+            raise ValueError(_error.Phase)
+        self.sig = sig
+        self.period = period
+        self.duty = duty
+        self.phase = phase
+        self._high = high
+
+    def _edges(self, hyper):
+        """ Return the edges up to time hyper, as (time, value) """
+        edges = []
+        for t in range(self.phase, hyper, self.period):
+            edges.append((t, 1))
+            edges.append(((t + self._high) % hyper, 0))
+        return edges
+
+    def __repr__(self):
+        return "Clock(%s, %d, duty=%s, phase=%d)" % \
+            (self.sig._name or 'sig', self.period, self.duty, self.phase)
+
+
+def _gcd(a, b):
+    while b:
+        a, b = b, a % b
+    return a
+
+
+class _ClockSchedule(object):
+
+    """ The edges of a group of clocks over their common period """
+
+    def __init__(self, clocks):
+        hyper = 1
+        for c in clocks:
+            hyper = hyper * c.period // _gcd(hyper, c.period)
+        byTime = {}
+        for c in clocks:
+            for t, val in c._edges(hyper):
+                byTime.setdefault(t, []).append((c.sig, val))
+        self.clocks = clocks
+        self._hyper = hyper
+        self._times = sorted(byTime)
+        self._edges = [byTime[t] for t in self._times]
+        self._index = 0
+        self._base = 0
+
+    def start(self, t):
+        """ Schedule the first edge after time t, or at time t """
+        times = self._times
+        base = t - t % self._hyper
+        i = 0
+        while base + times[i] < t:
+            i += 1
+            if i == len(times):
+                i = 0
+                base += self._hyper
+        self._index, self._base = i, base
+        _futureEvents.append((base + times[i], self))
+
+    def apply(self):
+        # a future event
+        i = self._index
+        for sig, val in self._edges[i]:
+            sig._setNextVal(val)
+            _siglist.append(sig)
+        i += 1
+        if i == len(self._times):
+            i = 0
+            self._base += self._hyper
+        self._index = i
+        _futureEvents.append((self._base + self._times[i], self))
+        return []
+
+
+def _schedules(clocks):
+    """ Group clocks into schedules of at most _maxEdges edge times """
+    groups = []
+    for c in clocks:
+        for group in groups:
+            hyper = c.period
+            for g in group:
+                hyper = hyper * g.period // _gcd(hyper, g.period)
+            if sum(2 * hyper // g.period for g in group + [c]) <= _maxEdges:
+                group.append(c)
+                break
+        else:
+            groups.append([c])
+    return [_ClockSchedule(group) for group in groups]
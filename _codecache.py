@@ -0,0 +1,212 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the code object cache.
+
+A block function is typically instantiated many times (e.g. one per lane),
+but its source and the structure of its AST only depend on its code object.
+This module keeps, per code object, the dedented source and the names and
+attribute chains it refers to, together with the analysis results for each
+distinct 'signature' of the objects those names resolve to.
+
+The source-derived part can optionally be persisted to disk, keyed by a hash
+of the source, with saveCodeCache() and loadCodeCache().
+
+"""
+from __future__ import absolute_import
+
+
+import ast
+import hashlib
+import inspect
+import pickle
+from types import CodeType, FrameType, GeneratorType, FunctionType
+
+from myhdl._compat import to_bytes
+from myhdl._util import _dedent
+from myhdl._delay import delay
+from myhdl._Signal import SignalType, _isListOfSigs, posedge, negedge
+from myhdl._enum import EnumType
+from myhdl._structured import Array
+
+
+_codeInfoMap = {}
+_persistedMap = {}
+
+
+class _Missing(object):
+
+    def __repr__(self):
+        return '<missing>'
+
+_missing = _Missing()
+
+
+class _CodeInfo(object):
+
+    __slots__ = ('source', 'sourcefile', 'lineoffset', 'digest',
+                 'names', 'chains', 'results')
+
+    def __init__(self, source, sourcefile, lineoffset, digest, names=None, chains=None):
+        self.source = source
+        self.sourcefile = sourcefile
+        self.lineoffset = lineoffset
+        self.digest = digest
+        if names is None:
+            names, chains = _getStructure(ast.parse(source))
+        self.names = names
+        self.chains = chains
+        self.results = {}
+
+    def parse(self):
+        """ Return a new AST, the callers are free to modify it """
+        tree = ast.parse(self.source)
+        tree.sourcefile = self.sourcefile
+        tree.lineoffset = self.lineoffset
+        tree.digest = self.digest
+        tree.symnames = self.names
+        return tree
+
+    def signature(self, *symdicts):
+        """ Return a hashable summary of what the names in the code refer to.
+
+        symdicts -- the namespaces, searched in order
+
+        Two instances with the same signature give the same analysis results
+        (modulo the identity of the objects).
+        """
+        def lookup(n):
+            for d in symdicts:
+                if n in d:
+                    return d[n]
+            return _missing
+
+        kinds = [_symKind(lookup(n)) for n in self.names]
+        for chain in self.chains:
+            kinds.append(_chainKinds(lookup(chain[0]), chain[1:]))
+        return tuple(kinds)
+
+
+def _getCode(obj):
+    if isinstance(obj, CodeType):
+        return obj
+    if isinstance(obj, FrameType):
+        return obj.f_code
+    if isinstance(obj, GeneratorType):
+        return obj.gi_code
+    return getattr(obj, '__func__', obj).__code__
+
+
+def _getCodeInfo(obj):
+    """ Return the _CodeInfo for a function, frame, generator or code object """
+    code = _getCode(obj)
+    # code objects compare equal on their bytecode only, so key on identity;
+    # the code object is kept in the entry so that its id stays valid
+    entry = _codeInfoMap.get(id(code))
+    if entry is not None:
+        return entry[1]
+    lines, lnum = inspect.getsourcelines(code)
+    s = ''.join(lines)
+    digest = hashlib.sha1(to_bytes(s)).hexdigest()
+    sourcefile = inspect.getsourcefile(code)
+    if digest in _persistedMap:
+        source, names, chains = _persistedMap[digest]
+        info = _CodeInfo(source, sourcefile, lnum - 1, digest, names, chains)
+    else:
+        info = _CodeInfo(_dedent(s), sourcefile, lnum - 1, digest)
+    _codeInfoMap[id(code)] = (code, info)
+    return info
+
+
+def _getStructure(tree):
+    """ Collect the names and the attribute chains rooted at a name.
+
+    Decorators are skipped for the chains, as the _AttrRefTransformer
+    doesn't visit them.
+    """
+    names = set()
+    chains = set()
+    skip = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            for d in node.decorator_list:
+                skip.update(id(n) for n in ast.walk(d))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            names.add(node.id)
+        elif isinstance(node, ast.Attribute) and id(node) not in skip:
+            attrs = []
+            n = node
+            while isinstance(n, ast.Attribute):
+                attrs.append(n.attr)
+                n = n.value
+            if isinstance(n, ast.Name):
+                chains.add((n.id,) + tuple(reversed(attrs)))
+    return tuple(sorted(names)), tuple(sorted(chains))
+
+
+def _symKind(obj):
+    if obj is delay or obj is posedge or obj is negedge:
+        # _YieldVisitor tests these by identity
+        return obj
+    t = type(obj)
+    if t is list:
+        return (list, _isListOfSigs(obj))
+    return t
+
+
+def _chainKinds(obj, attrs):
+    """ Follow an attribute chain the way _AttrRefTransformer does """
+    kinds = [_symKind(obj)]
+    for attr in attrs:
+        if obj is _missing or attr in _reserved:
+            break
+        if isinstance(obj, (EnumType, FunctionType, Array)):
+            break
+        if isinstance(obj, SignalType) and hasattr(SignalType, attr):
+            break
+        try:
+            obj = getattr(obj, attr)
+        except Exception:
+            obj = _missing
+        kinds.append(_symKind(obj))
+    return tuple(kinds)
+
+
+def saveCodeCache(filename):
+    """ Write the source-derived part of the cache to a file """
+    for code, info in _codeInfoMap.values():
+        _persistedMap[info.digest] = (info.source, info.names, info.chains)
+    with open(filename, 'wb') as f:
+        pickle.dump(_persistedMap, f, pickle.HIGHEST_PROTOCOL)
+
+
+def loadCodeCache(filename):
+    """ Prime the cache from a file written by saveCodeCache() """
+    with open(filename, 'rb') as f:
+        _persistedMap.update(pickle.load(f))
+
+
+def clearCodeCache():
+    _codeInfoMap.clear()
+    _persistedMap.clear()
+
+
+# avoid problems with recursive imports
+from myhdl._resolverefs import _reserved
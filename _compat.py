@@ -15,6 +15,7 @@ if not PY2:
     from io import StringIO
     from os import set_inheritable
     import builtins
+    import queue
 
     def to_bytes(s):
         return s.encode()
@@ -29,6 +30,7 @@ else:
 
     from cStringIO import StringIO
     import __builtin__ as builtins
+    import Queue as queue
 
     to_bytes = _identity
     to_str = _identity
@@ -0,0 +1,270 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the coverage of a simulation.
+
+The coverage records the bits of each signal that rose and fell, the
+states and transitions of the enum signals, and the activations of the
+always blocks. It is filled by Simulation.run, when passed as its
+coverage argument: the signal updates are inspected once per delta
+cycle, before they are applied, so no monitor process is needed.
+
+Coverages are kept by name, so the coverages of several runs, or of
+parallel simulations, can be merged, also from their JSON files.
+"""
+from __future__ import absolute_import
+
+
+import json
+
+from myhdl import SimulationError
+from myhdl._always import _Always
+from myhdl._capture import _expand
+from myhdl._checkpoint import _designSignals
+from myhdl._compat import string_types
+from myhdl._enum import EnumItemType
+from myhdl._intbv import intbv
+from myhdl._profile import _hierarchy
+from myhdl._Signal import _DelayedSignal
+
+
+def _bitcount(n):
+    return bin(n).count('1')
+
+
+class SimulationCoverage(object):
+
+    """ Toggle, enum state and always block coverage of a simulation.
+
+    Calling the coverage with a design function and its arguments
+    elaborates the design, and returns its instances; the signals and
+    the always blocks of the design are then covered by their names in
+    the hierarchy. Otherwise, the signals and always blocks of the
+    simulation are covered by their own names.
+
+    Attributes, by name:
+    toggles -- [rise, fall, changes, mask] of the bool and intbv signals;
+               rise and fall are the bits that went from 0 to 1 and
+               from 1 to 0, as a bitmask
+    states -- {'states': visits, 'transitions': counts, 'all': names}
+              of the enum signals
+    activations -- number of activations of the always blocks, not
+                   counting their start
+    """
+
+    def __init__(self):
+        self.name = None
+        self.toggles = {}
+        self.states = {}
+        self.activations = {}
+        self._insts = []
+        self._sigs = []
+        self._toggle = {}
+        self._fsm = {}
+        self._names = {}
+        self._start = False
+
+    def __call__(self, dut, *args, **kwargs):
+        name = dut.__name__ if self.name is None else str(self.name)
+        top, insts, levels = _hierarchy(name, dut, *args, **kwargs)
+        # an instance can be found at several levels: keep the deepest
+        paths = {}
+        for obj, path in insts:
+            if isinstance(obj, _Always):
+                paths[id(obj)] = (obj, '.'.join(path))
+        self._insts.extend(paths.values())
+        seen = set(id(s) for s, n in self._sigs)
+        for inst, path in levels:
+            objs = list(inst.sigdict.items()) + \
+                [(n, m.mem) for n, m in inst.memdict.items()]
+            for n, obj in sorted(objs, key=lambda item: item[0]):
+                try:
+                    sigs = _expand('.'.join(path + (n,)), obj)
+                except SimulationError:
+                    continue
+                for sn, s in sigs:
+                    if id(s) not in seen:
+                        seen.add(id(s))
+                        self._sigs.append((s, sn))
+        return top
+
+    def _begin(self, sim):
+        """ Set up the coverage of the signals and always blocks of a run """
+        if self._insts:
+            insts = self._insts
+        else:
+            insts = [(arg, arg.func.__name__) for arg in sim._arglist
+                     if isinstance(arg, _Always)]
+        self._names = {}
+        for obj, name in insts:
+            self._names[id(obj.gen)] = name
+            self.activations.setdefault(name, 0)
+        if self._sigs:
+            sigs = self._sigs
+        else:
+            sigs = [(s, s._name or 'signal%d' % i)
+                    for i, s in enumerate(_designSignals(sim))]
+        self._toggle = {}
+        self._fsm = {}
+        for s, name in sigs:
+            val = s._val
+            if isinstance(s, _DelayedSignal):
+                continue
+            if isinstance(val, (bool, intbv)) and len(s):
+                rec = self.toggles.get(name)
+                if rec is None:
+                    rec = self.toggles[name] = [0, 0, 0, (1 << len(s)) - 1]
+                self._toggle[id(s)] = rec
+            elif isinstance(val, EnumItemType):
+                rec = self.states.get(name)
+                if rec is None:
+                    rec = self.states[name] = {
+                        'states': {val._name: 1},
+                        'transitions': {},
+                        'all': list(val._type._names)}
+                self._fsm[id(s)] = rec
+        # the first resumes start the processes
+        self._start = not sim._started
+
+    def _update(self, siglist):
+        """ Record the changes of the signals of a delta cycle """
+        toggle, fsm = self._toggle, self._fsm
+        seen = set()
+        for s in siglist:
+            i = id(s)
+            if i in seen:
+                continue
+            seen.add(i)
+            rec = toggle.get(i)
+            if rec is not None:
+                old, new = s._val, s._next
+                if isinstance(old, intbv):
+                    old, new = old._val, int(new)
+                if old != new:
+                    mask = rec[3]
+                    old &= mask
+                    new &= mask
+                    rec[0] |= new & ~old
+                    rec[1] |= old & ~new
+                    rec[2] += 1
+                continue
+            rec = fsm.get(i)
+            if rec is not None:
+                old, new = s._val, s._next
+                if old is not new:
+                    states, transitions = rec['states'], rec['transitions']
+                    states[new._name] = states.get(new._name, 0) + 1
+                    key = '%s -> %s' % (old._name, new._name)
+                    transitions[key] = transitions.get(key, 0) + 1
+
+    def _run(self, waiters, actives, exc):
+        """ Run the waiters of a delta cycle, as Simulation.run does, and
+        return their number
+        """
+        names = {} if self._start else self._names
+        self._start = False
+        activations = self.activations
+        resumed = 0
+        while waiters:
+            waiter = waiters.pop()
+            resumed += 1
+            try:
+                waiter.next(waiters, actives, exc)
+            except StopIteration:
+                continue
+            name = names.get(id(waiter.generator))
+            if name is not None:
+                activations[name] += 1
+        return resumed
+
+    def merge(self, other):
+        """ Add the coverage of another run: a SimulationCoverage, a dict
+        as returned by asDict, or the path of a JSON file
+        """
+        if isinstance(other, string_types):
+            with open(other) as f:
+                other = json.load(f)
+        elif isinstance(other, SimulationCoverage):
+            other = other.asDict()
+        for name, t in other['toggles'].items():
+            rec = self.toggles.get(name)
+            if rec is None:
+                rec = self.toggles[name] = [0, 0, 0, (1 << t['bits']) - 1]
+            rec[0] |= t['rise']
+            rec[1] |= t['fall']
+            rec[2] += t['changes']
+        for name, s in other['states'].items():
+            rec = self.states.setdefault(name, {'states': {},
+                                                'transitions': {},
+                                                'all': s['all']})
+            for key in ('states', 'transitions'):
+                counts = rec[key]
+                for k, n in s[key].items():
+                    counts[k] = counts.get(k, 0) + n
+        for name, n in other['activations'].items():
+            self.activations[name] = self.activations.get(name, 0) + n
+
+    def summary(self):
+        """ Return the covered and total numbers of toggle bits, enum
+        states and always blocks
+        """
+        bits = sum(_bitcount(r[3]) for r in self.toggles.values())
+        toggled = sum(_bitcount(r[0] & r[1]) for r in self.toggles.values())
+        states = sum(len(r['all']) for r in self.states.values())
+        visited = sum(len(r['states']) for r in self.states.values())
+        blocks = len(self.activations)
+        active = sum(1 for n in self.activations.values() if n)
+        return {'toggle': [toggled, bits],
+                'states': [visited, states],
+                'blocks': [active, blocks]}
+
+    def asDict(self):
+        return {'toggles': dict((name, {'bits': _bitcount(r[3]),
+                                        'rise': r[0],
+                                        'fall': r[1],
+                                        'changes': r[2]})
+                                for name, r in self.toggles.items()),
+                'states': self.states,
+                'activations': self.activations,
+                'summary': self.summary()}
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.asDict(), f, indent=2, sort_keys=True)
+
+    def __str__(self):
+        s = self.summary()
+        lines = ["Simulation coverage:"]
+        for key, what in (('toggle', 'signal bits toggled'),
+                          ('states', 'enum states visited'),
+                          ('blocks', 'always blocks activated')):
+            n, total = s[key]
+            lines.append("  %6d/%-6d %5.1f%%  %s" %
+                         (n, total, 100.0 * n / total if total else 100.0,
+                          what))
+        missed = sorted(name for name, r in self.toggles.items()
+                        if r[0] & r[1] != r[3])
+        missed += sorted('%s.%s' % (name, state)
+                         for name, r in self.states.items()
+                         for state in r['all'] if state not in r['states'])
+        missed += sorted(name for name, n in self.activations.items()
+                         if not n)
+        if missed:
+            lines.append("  not covered: %s" % ', '.join(missed))
+        return '\n'.join(lines)
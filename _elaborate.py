@@ -0,0 +1,101 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the elaborate function.
+
+elaborate -- elaborate a design once, to simulate it many times
+"""
+from __future__ import absolute_import
+
+
+from myhdl import SimulationError
+from myhdl._simulator import _signals
+from myhdl._Signal import _Signal
+from myhdl._Simulation import Simulation
+from myhdl._instance import _Instantiator
+from myhdl._intbv import intbv
+from myhdl._util import _flatten
+
+
+class _error:
+    pass
+
+
+_error.NotRestartable = "Only generators created by @instance or @always " \
+                        "decorators can be restarted"
+
+
+def elaborate(func, *args, **kwargs):
+    """ Elaborate a design, for repeated simulation.
+
+    func -- function that returns the instances of the design
+    *args, **kwargs -- the arguments for func
+
+    Returns an _ElaboratedDesign; its simulation() method returns a
+    new Simulation in the reset state. The signals that are reset are
+    those created by func and those passed as arguments.
+    """
+    start = len(_signals)
+    top = func(*args, **kwargs)
+    sigs = _signals[start:]
+    for arg in _flatten(list(args) + list(kwargs.values())):
+        if isinstance(arg, _Signal):
+            sigs.append(arg)
+            sigs.extend(arg._slicesigs)
+    return _ElaboratedDesign(top, sigs)
+
+
+class _ElaboratedDesign(object):
+
+    def __init__(self, top, sigs):
+        self.top = top
+        self._sigs = sigs
+        self._insts = _flatten(top)
+        for inst in self._insts:
+            if not isinstance(inst, _Instantiator):
+                raise SimulationError(_error.NotRestartable, repr(inst))
+        # intbv's in closures are used as state variables
+        self._state = []
+        for inst in self._insts:
+            closure = getattr(inst, 'func', inst.genfunc).__closure__ or ()
+            for c in closure:
+                obj = c.cell_contents
+                if isinstance(obj, intbv):
+                    self._state.append((obj, obj._val))
+
+    def reset(self):
+        """ Put the design back in the state right after elaboration """
+        for s in self._sigs:
+            s._clear()
+            if hasattr(s, '_waiter'):
+                # shadow signal: the generator is stateless, the waiter is not
+                w = s._waiter
+                s._waiter = type(w)(w.generator)
+            if hasattr(s, '_nextZ'):
+                s._nextZ = s._next
+                s._timeStamp = 0
+        for obj, val in self._state:
+            obj._val = val
+        for inst in self._insts:
+            inst.gen = inst.genfunc()
+
+    def simulation(self):
+        """ Return a new Simulation of the design in the reset state """
+        self.reset()
+        return Simulation(self.top)
@@ -35,12 +35,16 @@ import string
 
 from myhdl import ExtractHierarchyError, ToVerilogError, ToVHDLError
 from myhdl._Signal import _Signal, _isListOfSigs
-from myhdl._util import _isGenFunc, _flatten, _genfunc
+from myhdl._util import _isGenFunc, _flatten, _genfunc, _ChainedDict
 from myhdl._misc import _isGenSeq, m1Dinfo
+from myhdl._clock import Clock
 from myhdl._resolverefs import _resolveRefs
 from myhdl._getcellvars import _getCellVars
 
 from myhdl._structured import StructType, Array
+from myhdl import _block
+from myhdl._block import (_isBlock, _noteFrame, _blockStack, _BlockRecord,
+                          _blockWrapperCode)
 
 from myhdl.tracejb import Tracing
 
@@ -248,7 +252,7 @@ class _UserVhdlInstance(_UserVhdlCode):
         return s
 
 
-def _addUserCode(specs, arg, funcname, func, frame):
+def _addUserCode(specs, arg, funcname, func, f_globals, f_locals, code):
     classMap = {
         '__verilog__': _UserVerilogCodeDepr,
         '__vhdl__': _UserVhdlCodeDepr,
@@ -258,10 +262,9 @@ def _addUserCode(specs, arg, funcname, func, frame):
         'vhdl_instance': _UserVhdlInstance,
 
     }
-    namespace = frame.f_globals.copy()
-    namespace.update(frame.f_locals)
-    sourcefile = inspect.getsourcefile(frame)
-    sourceline = inspect.getsourcelines(frame)[1]
+    namespace = _ChainedDict(f_locals, f_globals)
+    sourcefile = inspect.getsourcefile(code)
+    sourceline = inspect.getsourcelines(code)[1]
     for hdl in _userCodeMap:
         oldspec = "__%s__" % hdl
         codespec = "%s_code" % hdl
@@ -319,20 +322,33 @@ class _HierExtr(object):
                           'processes', 'posedge', 'negedge')
         self.skip = 0
         self.hierarchy = hierarchy = []
+        self._globalsMap = {}
         self.absnames = absnames = collections.OrderedDict()  # {}
         self.level = 0
 
-        _profileFunc = self.extractor
-        sys.setprofile(_profileFunc)
-        if hasattr(dut, 'rtl'):
-            _top = dut(*args, **kwargs).rtl()
+        if _isBlock(getattr(dut, 'rtl', dut)):
+            # the blocks record the hierarchy themselves
+            _block._extractor = self
+            try:
+                if hasattr(dut, 'rtl'):
+                    _top = dut(*args, **kwargs).rtl()
+                else:
+                    _top = dut(*args, **kwargs)
+            finally:
+                _block._extractor = None
+                del _blockStack[:]
         else:
-            _top = dut(*args, **kwargs)
+            _profileFunc = self.extractor
+            sys.setprofile(_profileFunc)
+            if hasattr(dut, 'rtl'):
+                _top = dut(*args, **kwargs).rtl()
+            else:
+                _top = dut(*args, **kwargs)
+            sys.setprofile(None)
 
         trace.push(message='_HierExtr')
 #         for tt in _top:
 #             trace.print(tt)
-        sys.setprofile(None)
         if not hierarchy:
             raise ExtractHierarchyError(_error.NoInstances)
         self.top = _top
@@ -361,6 +377,9 @@ class _HierExtr(object):
                 _nDname(tn, sns, so)
 
     def extractor(self, frame, event, arg):
+        if frame.f_code is _blockWrapperCode:
+            # block wrappers are transparent, the wrapped function counts
+            return
         if event == "call":
             funcname = frame.f_code.co_name
             # skip certain functions
@@ -381,135 +400,196 @@ class _HierExtr(object):
                     func = getattr(obj, funcname)
 
             if not self.skip:
-                isGenSeq = _isGenSeq(arg)
-                if isGenSeq:
-                    specs = {}  # collections.OrderedDict() #{}
-                    for hdl in _userCodeMap:
-                        spec = "__%s__" % hdl
-                        if spec in frame.f_locals and frame.f_locals[spec]:
-                            specs[spec] = frame.f_locals[spec]
-                        spec = "%s_code" % hdl
-                        if func and hasattr(func, spec) and getattr(func, spec):
-                            specs[spec] = getattr(func, spec)
-                        spec = "%s_instance" % hdl
-                        if func and hasattr(func, spec) and getattr(func, spec):
-                            specs[spec] = getattr(func, spec)
-                    if specs:
-                        _addUserCode(specs, arg, funcname, func, frame)
-                # building hierarchy only makes sense if there are generators
-                if isGenSeq and arg:
-                    sigdict = {}  # collections.OrderedDict() #{}
-                    memdict = {}  # collections.OrderedDict() #{}
-                    argdict = {}  # collections.OrderedDict() #{}
-                    if func:
-                        arglist = inspect.getargspec(func).args
-                    else:
-                        arglist = []
-                    symdict = frame.f_globals.copy()
-                    symdict.update(frame.f_locals)
-                    cellvars = []
-                    # All nested functions will be in co_consts
-                    if func:
-                        local_gens = []
-                        consts = func.__code__.co_consts
-                        for item in _flatten(arg):
-                            genfunc = _genfunc(item)
-                            if genfunc.__code__ in consts:
-                                local_gens.append(item)
-                        if local_gens:
-                            cellvarlist = _getCellVars(symdict, local_gens)
-                            cellvars.extend(cellvarlist)
-                            # TODO: must re-work this to let 'interfaces' work
-                            # as before
-                            objlist = _resolveRefs(symdict, local_gens)
-                            cellvars.extend(objlist)
-
-                    # the last one passing by is the top module ...
-#                     for n, v in nsymdict.items():
-                    for n, v in symdict.items():
-                        # extract signals and memories
-                        # also keep track of whether they are used in generators
-                        # only include objects that are used in generators
-                        # #                             if not n in cellvars:
-                        # #                                 continue
-                        if isinstance(v, _Signal):
-                            trace.print('level {} Signal {} {}, used: {}, driven: {}, read: {}'.format(self.level, n, repr(v),
-                                                                                                       v._used, v.driven, v._read))
-                            sigdict[n] = v
-                            if n in cellvars:
-                                v._markUsed()
-
-                        elif isinstance(v, list):
-                            trace.print('level {} list {} {}'.format(self.level, n, v))
-                            if len(v) > 0:
-                                levels, sizes, totalelements, element = m1Dinfo(v)
-                                if isinstance(element, (_Signal, Array, StructType)):
-                                    m = _makeMemInfo(v, levels, sizes, totalelements, element)
-                                    memdict[n] = m
-                                    if n in cellvars:
-                                        m._used = True
-
-                                    if isinstance(element, (Array)):
-                                        if isinstance(v[0], list):
-                                            raise ValueError('don\'t handle nested lists', repr(v))
-                                        else:
-                                            # instantiate every element separately
-                                            for i, a in enumerate(v):
-                                                m = _makeMemInfo(a, len(a.shape), a.shape, a.size, element)
-                                                m.name = n + '({})'.format(str(i))
-                                                memdict[m.name] = m
-                                                trace.print('\t', m.name, m)
-#                                                 for item in m.mem:
-#                                                     trace.print('\t', m.driven)
-                                                if m.name in cellvars:
-                                                    m._used = True
-#                                 else:
-#                                     trace.print(repr(element))
-
-                        elif isinstance(v, Array):
-                            trace.print('level {} Array {} {} {} {}'.format(self.level, n, repr(v), v.driven, v._read))
-                            # only enter 'top' Arrays, i.e. not Arrays that are
-                            # a member of StructType(s)
-                            if '.' not in n:
-                                # we have all information handy in the Array
-                                # object
-                                m = _makeMemInfo(v, v.levels, v.shape, v.size, v.element)
-                                memdict[n] = m
-                                if n in cellvars:
-                                    m._used = True
-                                    m._driven = v.driven
-
-                        elif isinstance(v, StructType):
-                            trace.print('_HierExtr {} StructType {} {}'.format(self.level, n, v))
-                            # only enter 'top' StructTypes, i.e. not the nested
-                            # StructType(s)
-                            if '.' not in n:
-                                # should also be entered in the memdict
-                                m = _makeMemInfo(v, 1, 1, 1, v)
-                                memdict[n] = m
-                                if n in cellvars:
-                                    m._used = True
-                                    m._driven = v.driven
-
-                        # save any other variable in argdict
-                        if (n in arglist) and (n not in sigdict) and (n not in memdict):
-                            argdict[n] = v
-
-                    subs = []
-                    for n, sub in frame.f_locals.items():
-                        for elt in _inferArgs(arg):
-                            if elt is sub:
-                                subs.append((n, sub))
-
-                    inst = _Instance(self.level, arg, subs, sigdict, memdict, func, argdict, funcname)
-                    self.hierarchy.append(inst)
-
+                if _isGenSeq(arg):
+                    self._addInstance(func, funcname, arg, frame.f_globals,
+                                      frame.f_locals, frame.f_code)
                 self.level -= 1
 
             if funcname in self.skipNames:
                 self.skip -= 1
             trace.pop()
 
+    def callBlock(self, wrapper, func, caller, args, kwargs):
+        """ Call a block function and record its instance """
+        _noteFrame(caller)
+        rec = _BlockRecord(func.__code__)
+        _blockStack.append(rec)
+        self.level += 1
+        try:
+            arg = func(*args, **kwargs)
+        finally:
+            _blockStack.pop()
+        frame = rec.frame
+        if frame is not None:
+            f_globals, f_locals = frame.f_globals, frame.f_locals
+        else:
+            # nothing was created in the body of the block
+            f_globals, f_locals = func.__globals__, {}
+        if _isGenSeq(arg):
+            self._addInstance(wrapper, func.__name__, arg, f_globals, f_locals, func.__code__)
+        self.level -= 1
+        return arg
+
+    def _symbols(self, symdict, code):
+        """ Return the items of symdict that can be signals or memories.
+
+        The globals are filtered once per module and extraction, which
+        keeps the time per instance independent of the size of the
+        globals. The filter is redone when globals are added or removed,
+        or when a filtered global is rebound. The globals named in the
+        code of the instance, that it can rebind, are checked on their own.
+        """
+        refs, f_locals, f_globals = symdict.maps
+        entry = self._globalsMap.get(id(f_globals))
+        if entry is None or entry[0] is not f_globals or \
+                entry[1] != len(f_globals) or \
+                any(f_globals.get(n) is not v for n, v in entry[2]):
+            items = [(n, v) for n, v in f_globals.items()
+                     if isinstance(v, (_Signal, list, Array, StructType))]
+            entry = self._globalsMap[id(f_globals)] = \
+                (f_globals, len(f_globals), items, set(n for n, v in items))
+        filtered = entry[3]
+        items = list(refs.items())
+        items.extend(item for item in f_locals.items() if item[0] not in refs)
+        items.extend((n, v) for n, v in entry[2]
+                     if n not in refs and n not in f_locals)
+        items.extend((n, f_globals[n]) for n in code.co_names
+                     if n in f_globals and n not in filtered and
+                     n not in refs and n not in f_locals and
+                     isinstance(f_globals[n],
+                                (_Signal, list, Array, StructType)))
+        return items
+
+    def _addInstance(self, func, funcname, arg, f_globals, f_locals, code):
+        """ Record the instance for a function that returned generators """
+        specs = {}  # collections.OrderedDict() #{}
+        for hdl in _userCodeMap:
+            spec = "__%s__" % hdl
+            if spec in f_locals and f_locals[spec]:
+                specs[spec] = f_locals[spec]
+            spec = "%s_code" % hdl
+            if func and hasattr(func, spec) and getattr(func, spec):
+                specs[spec] = getattr(func, spec)
+            spec = "%s_instance" % hdl
+            if func and hasattr(func, spec) and getattr(func, spec):
+                specs[spec] = getattr(func, spec)
+        if _isBlock(func):
+            # the hdl specs are set on the block, the rest uses the function
+            func = func.__wrapped__
+        if specs:
+            _addUserCode(specs, arg, funcname, func, f_globals, f_locals, code)
+        # building hierarchy only makes sense if there are generators
+        if arg:
+            sigdict = {}  # collections.OrderedDict() #{}
+            memdict = {}  # collections.OrderedDict() #{}
+            argdict = {}  # collections.OrderedDict() #{}
+            if func:
+                arglist = inspect.getargspec(func).args
+            else:
+                arglist = []
+            # a view instead of a copy of the globals; _resolveRefs adds
+            # the resolved attribute references to the first dict
+            symdict = _ChainedDict({}, f_locals, f_globals)
+            cellvars = []
+            # All nested functions will be in co_consts
+            if func:
+                local_gens = []
+                consts = code.co_consts
+                for item in _flatten(arg):
+                    if isinstance(item, Clock):
+                        # a clock has no generator function
+                        continue
+                    genfunc = _genfunc(item)
+                    if genfunc.__code__ in consts:
+                        local_gens.append(item)
+                if local_gens:
+                    cellvarlist = _getCellVars(symdict, local_gens)
+                    cellvars.extend(cellvarlist)
+                    # TODO: must re-work this to let 'interfaces' work
+                    # as before
+                    objlist = _resolveRefs(symdict, local_gens)
+                    cellvars.extend(objlist)
+
+            # the last one passing by is the top module ...
+#             for n, v in nsymdict.items():
+            for n, v in self._symbols(symdict, code):
+                # extract signals and memories
+                # also keep track of whether they are used in generators
+                # only include objects that are used in generators
+                # #                             if not n in cellvars:
+                # #                                 continue
+                if isinstance(v, _Signal):
+                    trace.log('level {} Signal {} {!r}, used: {}, driven: {}, read: {}', self.level, n, v, v._used, v.driven, v._read)
+                    sigdict[n] = v
+                    if n in cellvars:
+                        v._markUsed()
+
+                elif isinstance(v, list):
+                    trace.log('level {} list {} {}', self.level, n, v)
+                    if len(v) > 0:
+                        levels, sizes, totalelements, element = m1Dinfo(v)
+                        if isinstance(element, (_Signal, Array, StructType)):
+                            m = _makeMemInfo(v, levels, sizes, totalelements, element)
+                            memdict[n] = m
+                            if n in cellvars:
+                                m._used = True
+
+                            if isinstance(element, (Array)):
+                                if isinstance(v[0], list):
+                                    raise ValueError('don\'t handle nested lists', repr(v))
+                                else:
+                                    # instantiate every element separately
+                                    for i, a in enumerate(v):
+                                        m = _makeMemInfo(a, len(a.shape), a.shape, a.size, element)
+                                        m.name = n + '({})'.format(str(i))
+                                        memdict[m.name] = m
+                                        trace.print('\t', m.name, m)
+#                                         for item in m.mem:
+#                                             trace.print('\t', m.driven)
+                                        if m.name in cellvars:
+                                            m._used = True
+#                         else:
+#                             trace.print(repr(element))
+
+                elif isinstance(v, Array):
+                    trace.log('level {} Array {} {!r} {} {}', self.level, n, v, v.driven, v._read)
+                    # only enter 'top' Arrays, i.e. not Arrays that are
+                    # a member of StructType(s)
+                    if '.' not in n:
+                        # we have all information handy in the Array
+                        # object
+                        m = _makeMemInfo(v, v.levels, v.shape, v.size, v.element)
+                        memdict[n] = m
+                        if n in cellvars:
+                            m._used = True
+                            m._driven = v.driven
+
+                elif isinstance(v, StructType):
+                    trace.log('_HierExtr {} StructType {} {}', self.level, n, v)
+                    # only enter 'top' StructTypes, i.e. not the nested
+                    # StructType(s)
+                    if '.' not in n:
+                        # should also be entered in the memdict
+                        m = _makeMemInfo(v, 1, 1, 1, v)
+                        memdict[n] = m
+                        if n in cellvars:
+                            m._used = True
+                            m._driven = v.driven
+
+                # save any other variable in argdict
+                if (n in arglist) and (n not in sigdict) and (n not in memdict):
+                    argdict[n] = v
+            del symdict
+
+            subs = []
+            for n, sub in f_locals.items():
+                for elt in _inferArgs(arg):
+                    if elt is sub:
+                        subs.append((n, sub))
+
+            inst = _Instance(self.level, arg, subs, sigdict, memdict, func, argdict, funcname)
+            self.hierarchy.append(inst)
+
 
 def _inferArgs(arg):
     #     tracejb('_inferArgs')
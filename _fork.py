@@ -0,0 +1,121 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the fork support of Simulation.
+
+A suspended simulation is forked into child processes with os.fork, so
+that each child continues from the same state. The results of the
+children are pickled and sent back to the parent over a pipe.
+"""
+from __future__ import absolute_import
+
+
+import os
+import sys
+import pickle
+import traceback
+from collections import namedtuple
+
+from myhdl import SimulationError
+from myhdl import _simulator
+
+
+class _error:
+    pass
+
+
+_error.NoFork = "Forking a simulation requires os.fork"
+_error.Cosim = "A simulation with a cosimulation can't be forked"
+_error.Finished = "Simulation has already finished"
+_error.ChildFailed = "Child process terminated without result"
+
+
+ForkResult = namedtuple('ForkResult',
+                        'index returncode time value exception')
+
+
+def _child(sim, index, setup, duration, wfd):
+    returncode = value = exception = None
+    try:
+        if setup is not None:
+            value = setup(index)
+        returncode = sim.run(duration, quiet=1)
+    except Exception:
+        exception = traceback.format_exc()
+    result = ForkResult(index, returncode, _simulator._time, value, exception)
+    try:
+        data = pickle.dumps(tuple(result), pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        result = result._replace(value=None,
+                                 exception=traceback.format_exc())
+        data = pickle.dumps(tuple(result), pickle.HIGHEST_PROTOCOL)
+    f = os.fdopen(wfd, 'wb')
+    f.write(data)
+    f.close()
+
+
+def _read(fd):
+    f = os.fdopen(fd, 'rb')
+    data = f.read()
+    f.close()
+    return data
+
+
+def fork(sim, n, setup=None, duration=None):
+    if not hasattr(os, 'fork'):
+        raise SimulationError(_error.NoFork)
+    if sim._cosim:
+        raise SimulationError(_error.Cosim)
+    if sim._finished:
+        raise SimulationError(_error.Finished)
+    # don't let the children write buffered output of the parent
+    sys.stdout.flush()
+    sys.stderr.flush()
+    if _simulator._tracing:
+        _simulator._tf.flush()
+
+    children = []
+    for index in range(n):
+        rfd, wfd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(rfd)
+            status = 1
+            try:
+                # the trace file belongs to the parent
+                _simulator._tracing = 0
+                _child(sim, index, setup, duration, wfd)
+                status = 0
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(status)
+        os.close(wfd)
+        children.append((pid, rfd))
+
+    results = []
+    for index, (pid, rfd) in enumerate(children):
+        data = _read(rfd)
+        status = os.waitpid(pid, 0)[1]
+        if data:
+            results.append(ForkResult(*pickle.loads(data)))
+        else:
+            msg = "%s: status %s" % (_error.ChildFailed, status)
+            results.append(ForkResult(index, None, None, None, msg))
+    return results
@@ -1,33 +1,14 @@
 from __future__ import absolute_import
-import ast
-import itertools
-from types import FunctionType
 
-from myhdl._util import _flatten
-from myhdl._enum import EnumType
-from myhdl._Signal import SignalType
+from myhdl._util import _flatten, _genfunc
+from myhdl._codecache import _getCodeInfo
 
 
-class Data():
-    pass
-
 def _getCellVars(symdict, arg):
     gens = _flatten(arg)
-    data = Data()
-    data.symdict = symdict
-    v = _GetCellVars(data)
+    objset = set()
     for gen in gens:
-        v.visit(gen.ast)
-    return list(data.objset)
-
-class _GetCellVars(ast.NodeVisitor):
-    def __init__(self, data):
-        self.data = data
-        self.data.objset = set() 
-
-    def visit_Name(self, node):
-
-        if node.id in self.data.symdict:
-            self.data.objset.add(node.id)
-
-        self.generic_visit(node)
+        # the names in the AST are cached per code object
+        names = _getCodeInfo(_genfunc(gen)).names
+        objset.update(n for n in names if n in symdict)
+    return list(objset)
@@ -21,11 +21,13 @@
 from __future__ import absolute_import
 
 
+import sys
 from types import FunctionType
 
 from myhdl import InstanceError
 from myhdl._util import _isGenFunc, _makeAST
 from myhdl._Waiter import _inferWaiter
+from myhdl._block import _noteFrame
 
 class _error:
     pass
@@ -45,6 +47,7 @@ def instance(genFunc):
 class _Instantiator(object):
     
     def __init__(self, genFunc):
+        _noteFrame(sys._getframe(1))
         self.genfunc = genFunc
         self.gen = genFunc()
         
@@ -0,0 +1,73 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the memory initialization files.
+
+A memory file holds one word per line in hexadecimal, as read by
+$readmemh in Verilog and by hread in VHDL. The converters write the
+large tables of a design to such files; readmemh reads them back, so
+that a simulation can start from the same contents.
+"""
+from __future__ import absolute_import
+
+
+def _romWidth(values):
+    """ Return the number of bits of a table of integers, and its sign """
+    lo, hi = min(values), max(values)
+    if lo < 0:
+        return max(hi.bit_length(), (~lo).bit_length()) + 1, True
+    return max(hi.bit_length(), 1), False
+
+
+def _memText(values, nrbits):
+    """ Return the text of a memory file, in two's complement """
+    mask = (1 << nrbits) - 1
+    digits = (nrbits + 3) // 4
+    return ''.join('%0*x\n' % (digits, v & mask) for v in values)
+
+
+def readmemh(filename, nrbits=0):
+    """ Return the words of a memory file as a tuple of ints.
+
+    filename -- the memory file, with a hexadecimal word per line
+    Optional parameter:
+    nrbits -- the word width; words with their sign bit set are then
+              read as negative numbers
+
+    Comments (//) and underscores are skipped, and an @address line
+    continues at that address, as in $readmemh.
+    """
+    words = []
+    address = 0
+    with open(filename) as f:
+        for line in f:
+            for item in line.split('//')[0].replace('_', '').split():
+                if item.startswith('@'):
+                    address = int(item[1:], 16)
+                    continue
+                w = int(item, 16)
+                if nrbits and w >> (nrbits - 1):
+                    w -= 1 << nrbits
+                if address < len(words):
+                    words[address] = w
+                else:
+                    words.extend([0] * (address - len(words)))
+                    words.append(w)
+                address += 1
+    return tuple(words)
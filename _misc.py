@@ -27,15 +27,16 @@ downrange -- function that returns a downward range
 from __future__ import absolute_import, print_function
 
 
-# import sys
+import sys
 import inspect
 
 from myhdl._Cosimulation import Cosimulation
+from myhdl._clock import Clock
 from myhdl._instance import _Instantiator
 
 
 def _isGenSeq(obj):
-    if isinstance(obj, (Cosimulation, _Instantiator)):
+    if isinstance(obj, (Cosimulation, _Instantiator, Clock)):
         return True
 #     if not isinstance(obj, (Array, list, tuple, set)):
     if not isinstance(obj, (list, tuple, set)):
@@ -78,8 +79,7 @@ def checkrtl(v):
 def rtlinstances():
     #     pass
     ''' search for the rtl in 'class' modules '''
-    f = inspect.currentframe()
-    d = inspect.getouterframes(f)[1][0].f_locals
+    d = sys._getframe(1).f_locals
     l = []
     dvalues = d.values()
     print('d.values()', dvalues)
@@ -103,8 +103,9 @@ def rtlinstances():
 
 
 def instances():
-    f = inspect.currentframe()
-    d = inspect.getouterframes(f)[1][0].f_locals
+    # the caller's frame; inspect.getouterframes would read the source of
+    # every frame on the stack
+    d = sys._getframe(1).f_locals
     l = []
     dvalues = d.values()
 #     print('d.values()', dvalues)
@@ -0,0 +1,205 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the stimulus playback of a simulation.
+
+A playback drives signals with the rows of a file of test vectors. The
+file is memory-mapped, and a row is unpacked with a single struct call
+when it is applied, so the vectors are not parsed, and not all loaded.
+
+The file is either a .npy file with a one- or two-dimensional array of
+integers or booleans, or a raw binary file of little-endian rows.
+"""
+from __future__ import absolute_import
+
+
+import ast
+import mmap
+import struct
+
+from myhdl import SimulationError
+from myhdl import _simulator
+from myhdl._simulator import _siglist, _futureEvents
+from myhdl._Signal import _Signal, _WaiterList
+from myhdl._capture import _expand
+from myhdl._compat import string_types
+
+
+class _error:
+    pass
+
+
+_error.TriggerType = "Playback trigger should be an edge, a signal or None"
+_error.Format = "Playback file format not supported"
+_error.Size = "Playback file size is not a multiple of the row size"
+_error.Columns = "Playback file has a wrong number of columns"
+_error.Time = "Playback times should not decrease"
+
+
+_npyMagic = b'\x93NUMPY'
+
+# struct codes of the .npy integer and boolean types, by kind and size
+_npyCodes = {('b', 1): '?',
+             ('i', 1): 'b', ('u', 1): 'B',
+             ('i', 2): 'h', ('u', 2): 'H',
+             ('i', 4): 'i', ('u', 4): 'I',
+             ('i', 8): 'q', ('u', 8): 'Q'}
+
+
+def _code(sig):
+    """ Return the struct code of the smallest word that holds a signal """
+    if isinstance(sig._val, bool):
+        return 'B'
+    nrbits = sig._nrbits
+    signed = sig._min is not None and sig._min < 0
+    for size, code in ((8, 'b'), (16, 'h'), (32, 'i')):
+        if nrbits and nrbits <= size:
+            return code if signed else code.upper()
+    return 'q' if signed else 'Q'
+
+
+def _npyHeader(mm, path):
+    """ Return the row format, the number of columns and the data offset
+    of a .npy file
+    """
+    major = ord(mm[6:7])
+    if major == 1:
+        size, = struct.unpack_from('<H', mm, 8)
+        offset = 10 + size
+    else:
+        size, = struct.unpack_from('<I', mm, 8)
+        offset = 12 + size
+    header = ast.literal_eval(mm[offset - size:offset].decode('latin1'))
+    descr, shape = header['descr'], header['shape']
+    if not isinstance(descr, string_types) or len(shape) not in (1, 2) or \
+            (header['fortran_order'] and len(shape) == 2 and shape[1] > 1):
+        raise SimulationError(_error.Format, path)
+    code = _npyCodes.get((descr[1], int(descr[2:])))
+    if code is None:
+        raise SimulationError(_error.Format, "%s: %s" % (path, descr))
+    ncols = shape[1] if len(shape) == 2 else 1
+    order = '>' if descr[0] == '>' else '<'
+    return order + code * ncols, ncols, offset
+
+
+class Playback(object):
+
+    """ The rows of a file of test vectors, applied to signals.
+
+    With a trigger, a row is applied each time the trigger fires, as a
+    process that waits on the trigger would. Without a trigger, the
+    first column of each row is a time, relative to the start of the
+    playback, at which the row is applied.
+
+    len(playback) -- the number of rows
+    playback.index -- the number of rows applied
+    """
+
+    def __init__(self, signals, path, on=None, fmt=None):
+        sigs = []
+        for i, obj in enumerate(signals):
+            sigs.extend(s for name, s in _expand(str(i), obj))
+        if isinstance(on, _Signal):
+            on = on._eventWaiters
+        if on is not None and not isinstance(on, _WaiterList):
+            raise SimulationError(_error.TriggerType, repr(on))
+        self._sigs = sigs
+        ncols = len(sigs) + (on is None)
+        self._file = f = open(path, 'rb')
+        try:
+            self._mm = mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file
+            self._mm = mm = b''
+        if mm[:6] == _npyMagic:
+            fmt, n, offset = _npyHeader(mm, path)
+            if n != ncols:
+                raise SimulationError(_error.Columns,
+                                      "%s: %d, expected %d" % (path, n, ncols))
+        else:
+            if fmt is None:
+                fmt = '<' + 'Q' * (on is None) + \
+                    ''.join(_code(s) for s in sigs)
+            offset = 0
+        self._row = row = struct.Struct(fmt)
+        if len(row.unpack_from(b'\0' * row.size)) != ncols:
+            raise SimulationError(_error.Columns, "%s: %s" % (path, fmt))
+        size = len(mm) - offset
+        if size % row.size:
+            raise SimulationError(_error.Size, "%s: %d bytes, rows of %d" %
+                                  (path, size, row.size))
+        self._offset = offset
+        self._len = size // row.size
+        self.index = 0
+        self._trigger = on
+        # a waiter that is not a process
+        self.generator = None
+        self.hasRun = 0
+        if not self._len:
+            self.close()
+        elif on is None:
+            self._start = _simulator._time
+            self._schedule()
+        else:
+            on.append(self)
+
+    def _apply(self):
+        """ Apply the next row """
+        values = self._row.unpack_from(self._mm,
+                                       self._offset + self.index * self._row.size)
+        self.index += 1
+        sigs = self._sigs
+        for s, v in zip(sigs, values[len(values) - len(sigs):]):
+            s._setNextVal(v)
+        _siglist.extend(sigs)
+
+    def next(self, waiters, actives, exc):
+        self._apply()
+        if self.index < self._len:
+            self._trigger.append(self)
+        else:
+            self.close()
+
+    def _schedule(self):
+        t, = self._row.unpack_from(self._mm,
+                                   self._offset + self.index * self._row.size)[:1]
+        t += self._start
+        if t < _simulator._time:
+            raise SimulationError(_error.Time, "row %d" % self.index)
+        _futureEvents.append((t, self))
+
+    def apply(self):
+        # a future event
+        self._apply()
+        if self.index < self._len:
+            self._schedule()
+        else:
+            self.close()
+        return []
+
+    def close(self):
+        """ Stop the playback, and close the file """
+        if self._trigger is not None and self in self._trigger:
+            self._trigger.remove(self)
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __len__(self):
+        return self._len
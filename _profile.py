@@ -0,0 +1,184 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the simulation profile.
+
+The profile counts the activations of each process of a simulation,
+and the wall time spent in them. It is filled by Simulation.run, when
+passed as its profile argument.
+"""
+from __future__ import absolute_import
+
+
+import sys
+from timeit import default_timer
+
+from myhdl._extractHierarchy import _HierExtr
+from myhdl._instance import _Instantiator
+from myhdl._simulator import _signals
+
+
+def _hierarchy(name, dut, *args, **kwargs):
+    """ Elaborate a design, and return its top, and the paths of its
+    instantiators and of its levels, as (object, path) tuples
+    """
+    sys.setprofile(None)
+    h = _HierExtr(name, dut, *args, **kwargs)
+    paths = {}
+    insts = []
+    levels = []
+
+    def addPath(base, name, obj):
+        paths[id(obj)] = path = base + (name,)
+        if isinstance(obj, _Instantiator):
+            insts.append((obj, path))
+        elif isinstance(obj, (tuple, list)):
+            for i, item in enumerate(obj):
+                addPath(base, '%s%d' % (name, i), item)
+
+    top = h.hierarchy[0]
+    paths[id(top.obj)] = (top.name,)
+    for inst in h.hierarchy:
+        levels.append((inst, paths[id(inst.obj)]))
+        for sn, so in inst.subs:
+            sn = sn[:-3] if sn[-3:] == 'rtl' else sn
+            addPath(paths[id(inst.obj)], sn, so)
+    return h.top, insts, levels
+
+
+class SimulationProfile(object):
+
+    """ Activations and wall time of the processes of a simulation.
+
+    Calling the profile with a design function and its arguments
+    elaborates the design, and returns its instances; the processes of
+    the design are then reported by their names in the hierarchy. Other
+    processes are reported by the name of their function.
+    """
+
+    def __init__(self):
+        self.name = None
+        self.processes = {}
+        self._insts = []
+        self._shadows = []
+
+    def __call__(self, dut, *args, **kwargs):
+        name = dut.__name__ if self.name is None else str(self.name)
+        top, insts, levels = _hierarchy(name, dut, *args, **kwargs)
+        self._insts.extend(insts)
+        for inst, path in levels:
+            for sn, so in inst.sigdict.items():
+                if hasattr(so, '_waiter'):
+                    self._shadows.append((so, path + (sn,)))
+        return top
+
+    def _names(self, arglist):
+        """ Return the names of the generators of a simulation, by id """
+        names = {}
+        for obj in arglist:
+            if isinstance(obj, _Instantiator):
+                func = getattr(obj, 'func', obj.genfunc)
+                names[id(obj.gen)] = (func.__name__,)
+        for sig in _signals:
+            if hasattr(sig, '_waiter'):
+                names[id(sig._waiter.generator)] = \
+                    ('%s(shadow)' % (sig._name or type(sig).__name__),)
+        for obj, path in self._insts:
+            names[id(obj.gen)] = path
+        for sig, path in self._shadows:
+            names[id(sig._waiter.generator)] = path
+        return names
+
+    def _run(self, waiters, actives, exc, names):
+        """ Run the waiters of a delta cycle, as Simulation.run does, and
+        return their number
+        """
+        processes = self.processes
+        timer = default_timer
+        resumed = 0
+        while waiters:
+            waiter = waiters.pop()
+            resumed += 1
+            start = timer()
+            try:
+                waiter.next(waiters, actives, exc)
+                n = 1
+            except StopIteration:
+                n = 0
+            t = timer() - start
+            gen = waiter.generator
+            if gen is None:
+                # the end of the run, a capture or a playback
+                continue
+            p = processes.get(id(gen))
+            if p is None:
+                path = names.get(id(gen)) or (getattr(gen, '__name__', '?'),)
+                p = processes[id(gen)] = [path, 0, 0.0]
+            p[1] += n
+            p[2] += t
+        return resumed
+
+    def stats(self):
+        """ Return (path, activations, seconds) per process, slowest first """
+        stats = {}
+        for path, n, t in self.processes.values():
+            s = stats.setdefault(path, [0, 0.0])
+            s[0] += n
+            s[1] += t
+        return sorted(((path, n, t) for path, (n, t) in stats.items()),
+                      key=lambda s: (-s[2], s[0]))
+
+    def rollup(self):
+        """ Return (path, activations, seconds) per level of the hierarchy,
+        with the processes below it rolled up
+        """
+        levels = {}
+        for path, n, t in self.stats():
+            for i in range(1, len(path)):
+                s = levels.setdefault(path[:i], [0, 0.0])
+                s[0] += n
+                s[1] += t
+        return sorted(((path, n, t) for path, (n, t) in levels.items()),
+                      key=lambda s: (-s[2], s[0]))
+
+    def writeCollapsed(self, path):
+        """ Write the profile in the collapsed stack format of flame graphs,
+        in microseconds
+        """
+        with open(path, 'w') as f:
+            for p, n, t in self.stats():
+                f.write('%s %d\n' % (';'.join(p), int(round(t * 1e6))))
+
+    def __str__(self, nrprocs=20):
+        stats = self.stats()
+        total = sum(t for p, n, t in stats)
+        lines = ["Simulation profile: %d processes, %.3fs" %
+                 (len(stats), total)]
+        lines.append("  %10s %10s %10s  %s" %
+                     ('calls', 'seconds', 'us/call', 'process'))
+        for p, n, t in stats[:nrprocs]:
+            lines.append("  %10d %10.4f %10.2f  %s" %
+                         (n, t, 1e6 * t / n if n else 0.0, '.'.join(p)))
+        lines.append("  %10s %10s %10s  %s" %
+                     ('calls', 'seconds', '%', 'hierarchy'))
+        for p, n, t in self.rollup():
+            lines.append("  %10d %10.4f %10.1f  %s" %
+                         (n, t, 100 * t / total if total else 0.0,
+                          '.'.join(p)))
+        return '\n'.join(lines)
@@ -2,7 +2,7 @@ from __future__ import absolute_import, print_function
 import ast
 from types import FunctionType
 
-from myhdl._util import _flatten
+from myhdl._util import _flatten, _genfunc
 from myhdl._enum import EnumType
 from myhdl._Signal import SignalType
 from myhdl import ExtractHierarchyError
@@ -14,6 +14,9 @@ class _error:
     pass
 _error.NameCollision = " Top Level Signal Name: {} conflicts with generated Signal Name for Interface Member: {}"
 
+# attributes that are never resolved to a name
+_reserved = ('next', 'posedge', 'negedge', 'max', 'min', 'val', 'signed')
+
 
 class Data():
     pass
@@ -26,9 +29,47 @@ def _resolveRefs(symdict, arg):
     data.symdict = symdict
     v = _AttrRefTransformer(data)
     for gen in gens:
-        v.visit(gen.ast)
+        _transformCached(v, _getCodeInfo(_genfunc(gen)), 'attrrefs')
     return data.objlist
 
+
+def _transformCached(v, info, purpose):
+    ''' run the _AttrRefTransformer v on the code described by info
+
+        the transformation of an earlier instance with the same signature is
+        replayed on v.data when possible, otherwise the AST is built and
+        visited (and returned), recording the transformation for later use
+    '''
+    key = (purpose, info.signature(v.data.symdict))
+    record = info.results.get(key)
+    if record is not None and _replayAttrRefs(v, record):
+        return None
+    tree = info.parse()
+    v.record = []
+    v.visit(tree)
+    info.results[key] = v.record
+    v.record = None
+    return tree
+
+
+def _replayAttrRefs(v, record):
+    ''' apply a recorded transformation to the symdict and objlist of v
+        returns False, leaving everything untouched, on a name collision
+    '''
+    symdict = v.data.symdict
+    name_map = v.name_map
+    added = set()
+    for orig_name, new_name, _, _ in record:
+        if orig_name not in name_map and orig_name not in added:
+            if new_name in symdict:
+                return False
+            added.add(orig_name)
+    for orig_name, new_name, base, attr in record:
+        new_name = name_map.setdefault(orig_name, new_name)
+        symdict[new_name] = getattr(symdict[base], attr)
+        v.data.objlist.append(new_name)
+    return True
+
 # TODO: Refactor this into two separate nodetransformers, since _resolveRefs
 # needs only the names, not the objects
 
@@ -56,11 +97,11 @@ class _AttrRefTransformer(ast.NodeTransformer):
 #         self.myhdl_types = (EnumType, SignalType, Array, Struct)
         self.myhdl_types = (EnumType, SignalType)
         self.name_map = {}
+        self.record = None
 
     def visit_Attribute(self, node):
         self.generic_visit(node)
-        reserved = ('next', 'posedge', 'negedge', 'max', 'min', 'val', 'signed')
-        if node.attr in reserved:
+        if node.attr in _reserved:
             return node
 
         # Don't handle subscripts for now.
@@ -119,6 +160,8 @@ class _AttrRefTransformer(ast.NodeTransformer):
         new_name = self.name_map[orig_name]
         self.data.symdict[new_name] = attrobj
         self.data.objlist.append(new_name)
+        if self.record is not None:
+            self.record.append((orig_name, new_name, node.value.id, node.attr))
 #         print( orig_name, new_name, attrobj )
 
         new_node = ast.Name(id=new_name, ctx=node.value.ctx)
@@ -129,3 +172,7 @@ class _AttrRefTransformer(ast.NodeTransformer):
         for n in nodes:
             self.visit(n)
         return node
+
+
+# avoid problems with recursive imports
+from myhdl._codecache import _getCodeInfo
@@ -0,0 +1,166 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the statistics of a simulation.
+
+The counters are kept by Simulation.run per delta cycle and per
+timestep, not per event, so that they are cheap enough to be always on.
+The future events are not counted where they are scheduled: the events
+scheduled during a run are the events that were due, and the change in
+the number of pending events.
+"""
+from __future__ import absolute_import, print_function
+
+
+import json
+import sys
+import time
+
+
+class SimulationStats(object):
+
+    """ Counters of a simulation, in the stats attribute of a Simulation.
+
+    Attributes:
+    timesteps -- number of timesteps
+    deltas -- number of delta cycles
+    histogram -- number of completed timesteps by their number of delta
+                 cycles
+    updates -- number of signal updates
+    resumed -- number of waiters resumed
+    events -- number of future events scheduled during the runs
+    peak_events -- peak number of pending future events
+    simulated -- simulated time
+    seconds -- wall time of the runs
+    interval -- if set, print the counters every interval seconds
+                during a run
+    filename -- if set, write the counters as JSON to this file at the
+                end of each run
+    """
+
+    def __init__(self):
+        self.deltas = 0
+        self.histogram = {}
+        self.updates = 0
+        self.resumed = 0
+        self.events = 0
+        self.peak_events = 0
+        self.simulated = 0
+        self.seconds = 0.0
+        self.interval = None
+        self.filename = None
+        self._stepStart = 0
+        self._events = 0
+        self._due = 0
+        self._pending = 0
+        self._start = None
+        self._startTime = 0
+        self._print = None
+
+    @property
+    def timesteps(self):
+        return sum(self._histogram().values())
+
+    @property
+    def rate(self):
+        """ Simulated time per wall second """
+        return self.simulated / self.seconds if self.seconds else 0.0
+
+    def _begin(self, t, pending):
+        self._start = time.time()
+        self._startTime = t
+        self._events = self.events
+        self._due = 0
+        self._pending = pending
+        if self.interval:
+            self._print = self._start + self.interval
+
+    def _step(self, pending):
+        """ Start a new timestep, with this many future events pending """
+        h = self.histogram
+        n = self.deltas - self._stepStart
+        h[n] = h.get(n, 0) + 1
+        self._stepStart = self.deltas
+        self._count(pending)
+        if pending > self.peak_events:
+            self.peak_events = pending
+        if self._print is not None and time.time() >= self._print:
+            self._print += self.interval
+            print(self._line(), file=sys.stderr)
+
+    def _count(self, pending):
+        self.events = self._events + self._due + pending - self._pending
+
+    def _end(self, t, pending):
+        self._count(pending)
+        self.seconds += time.time() - self._start
+        self.simulated += t - self._startTime
+        self._startTime = t
+        self._print = None
+        if self.filename:
+            self.write(self.filename)
+
+    def _line(self):
+        seconds = self.seconds + time.time() - self._start
+        return ("%d timesteps, %d deltas, %d updates, %d resumed, "
+                "%d events, %.1fs" % (self.timesteps, self.deltas,
+                                      self.updates, self.resumed,
+                                      self.events, seconds))
+
+    def _histogram(self):
+        histogram = dict(self.histogram)
+        n = self.deltas - self._stepStart
+        if n:
+            # the timestep in progress
+            histogram[n] = histogram.get(n, 0) + 1
+        return histogram
+
+    def asDict(self):
+        histogram = self._histogram()
+        return {'timesteps': self.timesteps,
+                'deltas': self.deltas,
+                'deltas_per_timestep': dict((str(k), v) for k, v in
+                                            sorted(histogram.items())),
+                'updates': self.updates,
+                'resumed': self.resumed,
+                'events': self.events,
+                'peak_events': self.peak_events,
+                'simulated': self.simulated,
+                'seconds': self.seconds,
+                'simulated_per_second': self.rate}
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.asDict(), f, indent=2, sort_keys=True)
+
+    def __str__(self):
+        d = self.asDict()
+        lines = ["Simulation stats: %d timesteps, %d delta cycles, "
+                 "%.3fs, %.4g time units/s" %
+                 (d['timesteps'], d['deltas'], d['seconds'],
+                  d['simulated_per_second'])]
+        lines.append("  %d signal updates, %d waiters resumed, "
+                     "%d future events, peak %d pending" %
+                     (d['updates'], d['resumed'], d['events'],
+                      d['peak_events']))
+        lines.append("  delta cycles per timestep: %s" %
+                     ', '.join('%s: %s' % (k, v) for k, v in
+                               sorted(d['deltas_per_timestep'].items(),
+                                      key=lambda i: int(i[0]))))
+        return '\n'.join(lines)
@@ -96,6 +96,7 @@ class Array(object):
     __slots__ = ('_array', '_next', '_init', '_val', '_name', '_dtype', '_nrbits',
                  '_driven', '_read', '_isshadow', '_used', '_initialised', '_isSignal',
                  'element', 'levels', 'shape', 'sizes', 'size', '_setNextVal', 'attributes',
+                 '_homogeneous',
                  )
 
     def __init__(self, shape, dtype, vector=None, attributes=None):
@@ -125,6 +126,8 @@ class Array(object):
         self.size = 0
         self._isshadow = False
         self.attributes = attributes
+        # all elements are made from dtype
+        self._homogeneous = False
         if isinstance(shape, list) and isinstance(dtype, Array):
             # wrapping a slice of an Array (a slice is a 'naked' list)
             # can copy a few attributes
@@ -134,6 +137,7 @@ class Array(object):
             self._driven = dtype._driven
             self._isshadow = dtype._isshadow
             self._name = dtype._name  # ? wonder, wonder ?
+            self._homogeneous = dtype._homogeneous
             # dtype refers to the parent Array and thus hasn't got the sizes,
             # levels, ... information, so 'inspect' the shape
             self.levels, self.shape, self.size, _ = m1Dinfo(shape)
@@ -161,6 +165,7 @@ class Array(object):
                         self._dtype = dtype
 
                     self._initialised = True
+                    self._homogeneous = True
                     if len(self.shape) == 1:
                         a = []
                         for i in range(self.shape[0]):
@@ -226,6 +231,7 @@ class Array(object):
                     self.levels = narray.levels
                     self.size = narray.size
                     self._driven = narray._driven
+                    self._homogeneous = narray._homogeneous
 
                 else:
                     # element remembers what the caller gave us
@@ -239,6 +245,7 @@ class Array(object):
                     if vector is None:
                         # all elements will be initialised to the value
                         # specified in 'dtype'
+                        self._homogeneous = True
                         self.levels = len(shape)
                         self.shape = shape
                         if len(self.shape) == 1:
@@ -615,7 +622,7 @@ class Array(object):
                         return True
                 return False
 
-        trace.print('Array.driven:', repr(self))  # , self._driven, ldriven(self))
+        trace.log('Array.driven: {!r}', self)  # , self._driven, ldriven(self))
         r = self._driven or ldriven(self)
 #         print(r)
         return r
@@ -792,11 +799,11 @@ class Array(object):
         ''' replace the elements of an Array by SliceSignals from an intbv '''
         # this the start
         trace.push(message='Array.fromintbv')
-        trace.print('start:', repr(self))
+        trace.log('start: {!r}', self)
         assert len(vector) == self.nbits, '{}.fromintbv() needs same number of bits for source {} and destination{}' \
                                             .format(repr(self), len(vector), self.nbits)
         self._fromintbv(vector, self.nbits if BIGENDIAN else 0, BIGENDIAN)
-        trace.print('end:', repr(self))
+        trace.log('end: {!r}', self)
         trace.pop()
         return self
 
@@ -819,7 +826,7 @@ class Array(object):
                     elif isinstance(a.element, StructType):
                         for i in range(a.shape[0]):
                             a._array[i]._fromintbv(vector, _o, True)
-                            trace.print(repr(a._array[i]))
+                            trace.log('{!r}', a._array[i])
                             _o -= a.element.nbits
 
                 else:
@@ -835,7 +842,7 @@ class Array(object):
                     elif isinstance(a.element, StructType):
                         for i in range(a.shape[0]):
                             a._array[i]._fromintbv(vector, _o, False)
-                            trace.print(repr(a._array[i]))
+                            trace.log('{!r}', a._array[i])
                             _o += a.element.nbits
 
                 else:
@@ -1037,7 +1044,7 @@ class StructType(object):
     def fromintbv(self, vector, BIGENDIAN=False):
         ''' split a (large) intbv into a StructType '''
         trace.push(message='StructType: fromintbv')
-        trace.print('start: {} {}'.format(repr(self), repr(vector)))
+        trace.log('start: {!r} {!r}', self, vector)
         if self.sequencelist is None:
             raise ValueError('Need a sequencelist to correctly assign StructType members\n{}'.format(repr(self)))
 
@@ -1045,7 +1052,7 @@ class StructType(object):
 
         self._fromintbv(vector, self.nbits - 1 if BIGENDIAN else 0, BIGENDIAN)
 
-        trace.print('end:', repr(self))
+        trace.log('end: {!r}', self)
         trace.pop()
 
     def _fromintbv(self, vector, idx=0, BIGENDIAN=False):
@@ -1059,7 +1066,7 @@ class StructType(object):
                             # take care of unsigned/signed
                             vars(self)[key] = vector(idx, idx - obj._nrbits)
                             idx -= obj._nrbits
-                            trace.print(repr(vars(self)[key]))
+                            trace.log('{!r}', vars(self)[key])
                         else:
                             # a bool
                             vars(self)[key] = vector(idx)
@@ -1089,7 +1096,7 @@ class StructType(object):
                             # take care of unsigned/signed
                             vars(self)[key] = vector(idx + obj._nrbits, idx)
                             idx += obj._nrbits
-                            trace.print(repr(vars(self)[key]))
+                            trace.log('{!r}', vars(self)[key])
                         else:
                             # a bool
                             vars(self)[key] = vector(idx)
@@ -1220,12 +1227,12 @@ class StructType(object):
 
     def ref(self):
         ''' returns a condensed name representing the contents of the StructType, starting with the __class__ name'''
-        trace.print(repr(self))
+        trace.log('{!r}', self)
         retval = 'r_{}'.format(self.__class__.__name__)
         # should be in order of the sequencelist, if any
         if self.sequencelist:
             for key in self.sequencelist:
-                trace.print(repr(key))
+                trace.log('{!r}', key)
                 if hasattr(self, key):
                     obj = vars(self)[key]
                     if isinstance(obj, _Signal):
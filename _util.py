@@ -24,7 +24,6 @@ from __future__ import absolute_import
 from __future__ import print_function
 
 
-import ast
 import sys
 import os
 import inspect
@@ -72,13 +71,61 @@ def _dedent(s):
     return untokenize(result)
     
 
+class _ChainedDict(object):
+    """ A view of several dicts, searched in order.
+
+    Updates go to the first dict, so that the others are not copied.
+    The names in hidden are not looked up beyond the first dict.
+    """
+    __slots__ = ['maps', 'hidden']
+
+    def __init__(self, *maps, **kwargs):
+        self.maps = maps
+        self.hidden = kwargs.get('hidden', ())
+
+    def __getitem__(self, key):
+        maps = self.maps
+        if key in maps[0]:
+            return maps[0][key]
+        if key not in self.hidden:
+            for m in maps[1:]:
+                if key in m:
+                    return m[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self.maps[0][key] = value
+
+    def __contains__(self, key):
+        maps = self.maps
+        if key in maps[0]:
+            return True
+        if key not in self.hidden:
+            for m in maps[1:]:
+                if key in m:
+                    return True
+        return False
+
+    has_key = __contains__
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def copy(self):
+        d = {}
+        for m in reversed(self.maps[1:]):
+            d.update(m)
+        for n in self.hidden:
+            d.pop(n, None)
+        d.update(self.maps[0])
+        return d
+
+
 def _makeAST(f):
-    s = inspect.getsource(f)
-    s = _dedent(s)
-    tree = ast.parse(s)
-    tree.sourcefile = inspect.getsourcefile(f)
-    tree.lineoffset = inspect.getsourcelines(f)[1]-1
-    return tree
+    from myhdl._codecache import _getCodeInfo
+    return _getCodeInfo(f).parse()
 
     
 def _genfunc(gen):
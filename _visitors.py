@@ -1,8 +1,34 @@
 import ast
+from copy import copy
 
 from myhdl import intbv
 from myhdl._Signal import _Signal, _isListOfSigs
 from myhdl._structured import Array, StructType
+from myhdl._codecache import _getCodeInfo
+from myhdl._resolverefs import _AttrRefTransformer, _replayAttrRefs
+
+
+def _getSigNames(blk):
+    ''' return the _SigNameVisitor results for the function of an
+        @always_comb or @always_seq block, resolving the attribute
+        references into blk.symdict on the way
+    '''
+    info = _getCodeInfo(blk.func)
+    key = ('signames', info.signature(blk.symdict))
+    v = _AttrRefTransformer(blk)
+    cached = info.results.get(key)
+    if cached is not None and _replayAttrRefs(v, cached[0]):
+        results = cached[1]
+    else:
+        tree = info.parse()
+        v.record = []
+        v.visit(tree)
+        s = _SigNameVisitor(blk.symdict)
+        s.visit(tree)
+        results = s.results
+        info.results[key] = (v.record, results)
+    # hand out copies, as the caller may modify them
+    return dict((k, copy(r)) for k, r in results.items())
 
 
 class _SigNameVisitor(ast.NodeVisitor):
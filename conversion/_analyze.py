@@ -43,8 +43,9 @@ from myhdl.conversion._misc import (_error, _access, _kind,
                                     _get_argnames)
 from myhdl._extractHierarchy import _isMem, _getMemInfo, _UserCode
 from myhdl._Signal import _Signal, _WaiterList
-from myhdl._ShadowSignal import _ShadowSignal, _SliceSignal, _IndexSignal, _CloneSignal, _TristateDriver, _ReverseSignal
+from myhdl._ShadowSignal import _ShadowSignal, _SliceSignal, _IndexSignal, _CloneSignal, _TristateDriver, _ReverseSignal, ConcatSignal
 from myhdl._util import _isTupleOfInts, _dedent, _flatten, _makeAST
+from myhdl._block import _isBlock
 from myhdl._resolverefs import _AttrRefTransformer
 from myhdl._compat import builtins, integer_types, PY2
 from myhdl._misc import m1Dinfo
@@ -74,12 +75,56 @@ def _makeName(n, prefixes):
     return name
 
 
+# the elements of the homogeneous Arrays that are not named yet
+_lazyElements = {}
+
+
+class _LazyNames(object):
+
+    """ The names of the elements of a homogeneous Array of signals """
+
+    __slots__ = ('mem', 'name', 'openp', 'closep', 'named')
+
+    def __init__(self, mem, name, openp, closep):
+        self.mem = mem
+        self.name = name
+        self.openp = openp
+        self.closep = closep
+        self.named = False
+
+    def expand(self):
+        """ Name all elements, when one is referenced on its own """
+        if not self.named:
+            self.named = True
+            _nameElements(self.mem, self.name, self.openp, self.closep)
+
+
+def _sigName(s):
+    """ Return the name of a signal, naming the elements of its Array if needed """
+    if s._name is None:
+        lazy = _lazyElements.get(id(s))
+        if lazy is not None:
+            lazy.expand()
+    return s._name
+
+
+def _arrayName(s):
+    """ Return the name of the Array of an element that is not named yet """
+    lazy = _lazyElements.get(id(s))
+    if lazy is not None:
+        return lazy.name
+    return None
+
+
 def _analyzeSigs(hierarchy, hdl='Verilog'):
     trace.push(False, '_analyzeSigs')
     curlevel = 0
     siglist = []
     memlist = []
     prefixes = []
+    # the signals that shadow signals refer to
+    sources = set()
+    _lazyElements.clear()
 
 #     openp, closep = '[', ']'
 #     if hdl == 'VHDL':
@@ -104,7 +149,11 @@ def _analyzeSigs(hierarchy, hdl='Verilog'):
         prefixes.append(name)
         trace.print(prefixes)
         for n, s in sigdict.items():
-            trace.print('_analyzeSigs level {}: {} {} {}'.format(level, s._name, n, repr(s)))
+            trace.log('_analyzeSigs level {}: {} {} {!r}', level, s._name, n, s)
+            if isinstance(s, ConcatSignal):
+                sources.update(id(a) for a in s._sigargs)
+            elif isinstance(s, _ShadowSignal):
+                sources.add(id(getattr(s, '_sig', None)))
             if s._name is not None:
                 #                 if s._namelevel >= level:
                 #                     #                     trace.print(s._namelevel, level, s._name, _makeName(n, prefixes, namedict))
@@ -143,7 +192,7 @@ def _analyzeSigs(hierarchy, hdl='Verilog'):
                 continue
 #             m.name = _makeName(n, prefixes, namedict)
             m.name = _makeName(n, prefixes)
-            trace.print('_analyzeSigs level {}: {} {} {}'.format(level, m.name, n, repr(m)))
+            trace.log('_analyzeSigs level {}: {} {} {!r}', level, m.name, n, m)
             if isinstance(m.mem, (Array, StructType)):
                 m.mem._name = m.name
 #             print(m)
@@ -159,20 +208,27 @@ def _analyzeSigs(hierarchy, hdl='Verilog'):
             continue
         # m is a m1D list
         trace.push(message="expanding {}".format(m.name))
-        expandsignalnames(m.mem, m.name, 0, 0, openp, closep)
+        expandsignalnames(m.mem, m.name, 0, 0, openp, closep, sources)
         trace.pop()
 
     trace.pop()
     return siglist, memlist
 
 
-def expandsignalnames(memobj, name, memindex, level, openp, closep):
-    trace.print(repr(memobj), name, memindex, level)
-    if isinstance(memobj, (list, Array)):
+def expandsignalnames(memobj, name, memindex, level, openp, closep, sources=()):
+    trace.log('{!r} {} {} {}', memobj, name, memindex, level)
+    if isinstance(memobj, Array) and memobj._homogeneous and \
+            isinstance(memobj.element, _Signal):
+        # the elements need no checks, and most of them are only
+        # referenced through the Array
+        _nameElements(memobj, name, openp, closep,
+                      _LazyNames(memobj, name, openp, closep), sources)
+
+    elif isinstance(memobj, (list, Array)):
         if isinstance(memobj[0], (list, Array)):
             for i, mmm in enumerate(memobj):
                 nextname = '{}{}{}{}' .format(name, openp, i, closep)
-                expandsignalnames(mmm, nextname, memindex, level, openp, closep)
+                expandsignalnames(mmm, nextname, memindex, level, openp, closep, sources)
         else:
             # lowest (= last) level of m1D
             if isinstance(memobj, list):
@@ -193,17 +249,39 @@ def expandsignalnames(memobj, name, memindex, level, openp, closep):
             elif isinstance(obj, StructType):
                 nextname = ''.join((name, '.', key))
                 obj._name = nextname
-                expandsignalnames(obj, nextname, memindex, 0, openp, closep)
+                expandsignalnames(obj, nextname, memindex, 0, openp, closep, sources)
 
             elif isinstance(obj, Array):
                 nextname = ''.join((name, '.', key))
                 obj._name = nextname
-                expandsignalnames(obj, nextname, memindex, level + 1, openp, closep)
+                expandsignalnames(obj, nextname, memindex, level + 1, openp, closep, sources)
 
     else:
         raise ValueError("Unhandled obj: {}".format(repr(obj)))
 
 
+def _nameElements(mem, name, openp, closep, lazy=None, sources=()):
+    """ Name the elements of a homogeneous Array of signals.
+
+    With lazy, only the elements that are referenced on their own are
+    named now, and the other ones when they are first needed.
+    """
+    items = mem._array if isinstance(mem, Array) else mem
+    if isinstance(items[0], (list, Array)):
+        for i, sub in enumerate(items):
+            nextname = '{}{}{}{}'.format(name, openp, i, closep)
+            _nameElements(sub, nextname, openp, closep, lazy, sources)
+    else:
+        for i, s in enumerate(items):
+            if lazy is None or s._name is not None or s._used or \
+                    s._slicesigs or id(s) in sources:
+                s._name = "%s%s%s%s" % (name, openp, i, closep)
+                s._used = False
+                s._inList = True
+            else:
+                _lazyElements[id(s)] = lazy
+
+
 def makesname(i, s, signame, elobj, openp, closep):
     if i is None:
         s._name = "%s.%s" % (signame, openp)
@@ -513,7 +591,7 @@ defaultConvSpec = ConvSpec(**re_ConvSpec.match(r"%s").groupdict())
 
 def _getNritems(obj):
     """Return the number of items in an objects' type"""
-    trace.print('_getNritems', repr(obj))
+    trace.log('_getNritems {!r}', obj)
 #     logjbinspect(obj, 'obj', True)
     if isinstance(obj, _Signal):
         obj = obj._init
@@ -538,6 +616,7 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
         tree.kind = None
         tree.hasYield = 0
         tree.hasRom = False
+        tree.roms = OrderedDict()
         tree.hasLos = False
         tree.hasPrint = False
         self.tree = tree
@@ -615,7 +694,7 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
         obj = node.value.obj
 #         trace.print('_analyze: _AnalyzeVisitor: getAttr:', repr(obj), node.attr)
         if isinstance(obj, _Signal):
-            trace.print(repr(obj), node.attr)
+            trace.log('{!r} {}', obj, node.attr)
             if node.attr == 'posedge':
                 node.obj = obj.posedge
             elif node.attr == 'negedge':
@@ -632,7 +711,7 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
             elif node.attr == 'unsigned':
                 node.obj = myhdl.intbv.unsigned
             else:
-                trace.print('Not handled? ', repr(node), repr(node.value), repr(obj), node.attr)
+                trace.log('Not handled?  {!r} {!r} {!r} {}', node, node.value, obj, node.attr)
                 trace.print('vars(node)', vars(node))
                 trace.print('vars(node.value)', vars(node.value))
 #                 node.obj = obj.val
@@ -655,11 +734,11 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
                 _enumTypeSet.add(obj)
 
         elif isinstance(obj, Array):
-            trace.print(repr(obj))
+            trace.log('{!r}', obj)
             node.obj = obj.element
 
         elif isinstance(obj, StructType):
-            trace.print(repr(obj))
+            trace.log('{!r}', obj)
             vargs = vars(obj)
             for k in vargs:
                 if node.attr == k:
@@ -675,10 +754,10 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
 
         else:
             # assume it is an indexed class
-            trace.print(repr(getattr(obj, node.attr)))
+            trace.log('{!r}', getattr(obj, node.attr))
             node.obj = getattr(obj, node.attr)
 
-        trace.print('result node.obj:', repr(node.obj))
+        trace.log('result node.obj: {!r}', node.obj)
 
         if node.obj is None:  # attribute lookup failed
             self.raiseError(node, _error.UnsupportedAttribute, node.attr)
@@ -688,7 +767,7 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
     def visit_Assign(self, node):
         trace.push(message='visit_Assign')
         target, value = node.targets[0], node.value
-        trace.print('target: {} value: {}'.format(target, value))
+        trace.log('target: {} value: {}', target, value)
 
         self.access = _access.OUTPUT
         trace.push(None, 'lhs')
@@ -1030,7 +1109,7 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
         else:
             # emit a warning
             pass
-        trace.print('IsCase: {}, IsFullCase: {}'.format(node.isCase, node.isFullCase))
+        trace.log('IsCase: {}, IsFullCase: {}', node.isCase, node.isFullCase)
 
         trace.pop()
 
@@ -1134,7 +1213,7 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
                 pass
             else:
                 self.raiseError(node, _error.NotSupported, "Augmented signal assignment")
-            trace.print('sigdict', n, repr(node.obj), self.access)
+            trace.log('sigdict {} {!r} {}', n, node.obj, self.access)
 
         if n in self.tree.vardict:
             obj = self.tree.vardict[n]
@@ -1144,14 +1223,15 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
                     obj = int(-1)
                     self.tree.vardict[n] = obj
             node.obj = obj
-            trace.print('vardict', n, repr(node.obj), self.access)
+            trace.log('vardict {} {!r} {}', n, node.obj, self.access)
 
         elif n in self.tree.symdict:
             node.obj = self.tree.symdict[n]
-            trace.print('symdict', n, repr(node.obj), _isMem(node.obj), self.access)
+            trace.log('symdict {} {!r} {} {}', n, node.obj, _isMem(node.obj), self.access)
             if _isTupleOfInts(node.obj):
                 node.obj = _Rom(node.obj)
                 self.tree.hasRom = True
+                self.tree.roms[n] = node.obj.rom
 
             elif _isMem(node.obj):
                 m = _getMemInfo(node.obj)
@@ -1167,13 +1247,13 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
                 else:
                     assert False, "unexpected mem access %s %s" % (n, self.access)
                 self.tree.hasLos = True
-                trace.print(repr(m))
+                trace.log('{!r}', m)
 
             elif isinstance(node.obj, int):
                 node.value = node.obj
 
             else:
-                trace.print('symdict unhandled', n, repr(node.obj))
+                trace.log('symdict unhandled {} {!r}', n, node.obj)
 
             if n in self.tree.nonlocaldict:
                 # hack: put nonlocal intbv's in the vardict
@@ -1182,7 +1262,7 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
 
         elif n in builtins.__dict__:
             node.obj = builtins.__dict__[n]
-            trace.print('builtins', n, repr(node.obj), self.access)
+            trace.log('builtins {} {!r} {}', n, node.obj, self.access)
 
         else:
             self.raiseError(node, _error.UnboundLocal, n)
@@ -1261,10 +1341,10 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def accessSlice(self, node):
         trace.push(message='accessSlice')
-        trace.print(repr(node))
+        trace.log('{!r}', node)
         self.visit(node.value)
         node.obj = self.getObj(node.value)
-        trace.print(repr(node), repr(node.obj))
+        trace.log('{!r} {!r}', node, node.obj)
         self.access = _access.INPUT
         lower, upper = node.slice.lower, node.slice.upper
         if lower:
@@ -1318,7 +1398,7 @@ class _AnalyzeVisitor(ast.NodeVisitor, _ConversionMixin):
             node.obj = bool()
         else:
             node.obj = bool()  # XXX default
-        trace.print(node, node.value, repr(node.value.obj), repr(node.obj))
+        trace.log('{} {} {!r} {!r}', node, node.value, node.value.obj, node.obj)
         trace.pop()
 
     def visit_Tuple(self, node):
@@ -1397,11 +1477,12 @@ class _AnalyzeBlockVisitor(_AnalyzeVisitor):
         self.generic_visit(node)
         for n in self.tree.outputs:
             s = self.tree.sigdict[n]
-            trace.print('n, s:', repr(n), repr(s), s.driven)
-            for item in self.tree.sigdict.keys():
-                trace.print(' item:', repr(item), repr(self.tree.sigdict[item]), self.tree.sigdict[item].driven, id(self.tree.sigdict[item]))
+            trace.log('n, s: {!r} {!r} {}', n, s, s.driven)
+            if trace.enabled:
+                for item in self.tree.sigdict.keys():
+                    trace.log(' item: {!r} {!r} {} {}', item, self.tree.sigdict[item], self.tree.sigdict[item].driven, id(self.tree.sigdict[item]))
             if s.driven:
-                var2 = [x for x in globals().values() if id(x) == id(self.tree.sigdict[item])]
+                var2 = [x for x in globals().values() if id(x) == id(s)]
                 self.raiseError(node, _error.SigMultipleDriven, '{}: {} {} <> {}'.format(node.name, n, self.tree.inputs, var2))
             s.driven = "reg"
         for n in self.tree.inputs:
@@ -1598,6 +1679,8 @@ def expandinterface(v, name, obj):
 def _analyzeTopFunc(top_inst, func, *args, **kwargs):
     trace.push(False, '_analyzeTopFunc')
     trace.print('_analyzeTopFunc')
+    if _isBlock(func):
+        func = func.__wrapped__
     tree = _makeAST(func)
     v = _AnalyzeTopFuncVisitor(func, tree, *args, **kwargs)
     v.visit(tree)
@@ -0,0 +1,449 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the incremental conversion support.
+
+The text emitted for a generator only depends on its source, on what the
+names in it refer to (the names, types and sizes of signals and variables),
+and on a few converter settings. The emitted text is cached under a hash of
+all that, so that unchanged generators don't have to be converted again.
+The cache is only used by conversions with a conversion_cache file, that
+persists it between runs; other conversions start from an empty cache.
+
+Output files are only written when their contents changed, ignoring the
+date in the file header, so that downstream builds are not invalidated.
+"""
+from __future__ import absolute_import
+
+
+import hashlib
+import json
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import warnings
+from types import FunctionType, MethodType, ModuleType
+
+from myhdl._compat import to_bytes, integer_types, string_types, class_types
+from myhdl._intbv import intbv
+from myhdl._enum import EnumType, EnumItemType
+from myhdl._Signal import _Signal, _WaiterList
+from myhdl._codecache import _getCodeInfo
+from myhdl._extractHierarchy import _isMem, _getMemInfo
+from myhdl.conversion._misc import _genLabel
+
+
+_emitCache = {}
+
+
+class _Entry(object):
+
+    __slots__ = ('text', 'functext', 'funcdefs', 'labelstart', 'nrlabels',
+                 'warnings')
+
+    def __init__(self, text, functext, funcdefs, labelstart, nrlabels,
+                 warnings):
+        self.text = text
+        self.functext = functext
+        self.funcdefs = funcdefs
+        self.labelstart = labelstart
+        self.nrlabels = nrlabels
+        self.warnings = warnings
+
+
+_treeAttrs = ('kind', 'name', 'senslist', 'reset', 'sigregs', 'varregs',
+              'argnames', 'inputs', 'outputs', 'outmems', 'hasLos',
+              'hasPrint', 'hasReturn', 'hasRom', 'hasYield')
+
+
+_memAttrs = ('name', 'depth', '_used', '_driven', '_read', 'levels',
+             '_sizes', '_typedef')
+
+
+def _valSig(val):
+    if isinstance(val, intbv):
+        return (type(val).__name__, val._nrbits, val._min, val._max, val._val)
+    if isinstance(val, EnumItemType):
+        return ('enumitem', val._type.__dict__['_name'],
+                tuple(val._type.__dict__['_names']), val._name)
+    return (type(val).__name__, repr(val))
+
+
+def _sigSig(s):
+    return (type(s).__name__, s._name, getattr(s._type, '__name__', None),
+            s._nrbits, s._min, s._max, s._driven, s._read, s._used,
+            s._inList, getattr(s, '_left', None), getattr(s, '_right', None),
+            _valSig(s._init))
+
+
+_simpleTypes = (bool, float, type(None)) + integer_types + string_types
+
+
+def _objSig(obj, seen):
+    """ Return a summary of an object that is stable between runs """
+    if isinstance(obj, _simpleTypes):
+        return (type(obj).__name__, obj)
+    if isinstance(obj, _Signal):
+        return _sigSig(obj)
+    if isinstance(obj, (intbv, EnumItemType)):
+        return _valSig(obj)
+    if isinstance(obj, EnumType):
+        d = obj.__dict__
+        return ('enum', d['_name'], tuple(d['_names']), d['_nrbits'],
+                d['_encoding'], tuple(sorted(d['_codedict'].items())))
+    if isinstance(obj, _WaiterList):
+        return (type(obj).__name__, _objSig(getattr(obj, 'sig', None), seen))
+    if isinstance(obj, (set, frozenset)):
+        return ('set', tuple(sorted(repr(_objSig(o, seen)) for o in obj)))
+    if id(obj) in seen:
+        return ('seen', type(obj).__name__)
+    seen.add(id(obj))
+    if isinstance(obj, (list, tuple)):
+        sig = [type(obj).__name__, tuple(_objSig(o, seen) for o in obj)]
+        if _isMem(obj):
+            m = _getMemInfo(obj)
+            sig.extend(_objSig(getattr(m, a, None), seen) for a in _memAttrs)
+        return tuple(sig)
+    if isinstance(obj, dict):
+        return ('dict', tuple(sorted((repr(k), _objSig(v, seen))
+                                     for k, v in obj.items())))
+    if isinstance(obj, MethodType):
+        return ('method', _objSig(obj.__func__, seen))
+    if isinstance(obj, FunctionType):
+        info = _getCodeInfo(obj)
+        cells = [c.cell_contents for c in obj.__closure__ or ()]
+        refs = [_objSig(obj.__globals__.get(n), seen) for n in info.names]
+        return ('function', info.digest, tuple(refs), _objSig(cells, seen))
+    if isinstance(obj, ModuleType):
+        return ('module', obj.__name__)
+    if isinstance(obj, class_types):
+        return ('class', obj.__module__, obj.__name__)
+    if hasattr(obj, '__dict__'):
+        sig = [type(obj).__name__]
+        if _isMem(obj):
+            m = _getMemInfo(obj)
+            sig.extend(_objSig(getattr(m, a, None), seen) for a in _memAttrs)
+        attrs = sorted(vars(obj).items())
+        sig.append(tuple((k, _objSig(v, seen)) for k, v in attrs))
+        return tuple(sig)
+    return (type(obj).__name__, repr(obj))
+
+
+_myhdlIds = None
+
+
+def _isUserFunction(obj):
+    """ Return True for functions that are converted to HDL functions """
+    global _myhdlIds
+    if not isinstance(obj, (FunctionType, MethodType)):
+        return False
+    if _myhdlIds is None:
+        import myhdl
+        _myhdlIds = set(id(o) for o in myhdl.__dict__.values())
+    return id(obj) not in _myhdlIds
+
+
+def _treeSignature(tree):
+    """ Return a summary of what the text emitted for tree depends on.
+
+    Also returns whether the text is pure, i.e. doesn't depend on the
+    functions that are already emitted and on the label counter. That's
+    the case when the tree calls no functions.
+    """
+    seen = set()
+    sig = [tree.digest]
+    for a in _treeAttrs:
+        sig.append(_objSig(getattr(tree, a, None), seen))
+    # the names in the source, and those of resolved attribute references
+    names = set(tree.symnames)
+    names.update(getattr(tree, 'objlist', ()))
+    vardict = getattr(tree, 'vardict', {})
+    symdict = tree.symdict
+    pure = True
+    for n in sorted(names):
+        if n not in vardict:
+            obj = symdict.get(n)
+            if pure and _isUserFunction(obj):
+                pure = False
+            sig.append((n, _objSig(obj, seen)))
+    sig.append(_objSig(vardict, seen))
+    return sig, pure
+
+
+def _emitKey(hdl, Visitor, tree, context, funcdefs):
+    """ Return the cache key of a generator, and whether it is pure """
+    sig, pure = _treeSignature(tree)
+    sig = [hdl, Visitor.__name__, context] + sig
+    if not pure:
+        sig.append(tuple(funcdefs))
+    return hashlib.sha1(to_bytes(repr(sig))).hexdigest(), pure
+
+
+def _emit(key, emit, funcdefs):
+    """ Return (text, functext, reused) for a generator.
+
+    key -- the key from _emitKey
+    emit -- function that writes the text, and returns (text, functext)
+    funcdefs -- list of the functions already emitted, updated in place
+
+    """
+    entry = _emitCache.get(key)
+    if entry is not None and entry.labelstart is not None and \
+            entry.labelstart != _genLabel.i:
+        # the emitted text contains generated labels
+        entry = None
+    reused = entry is not None
+    if entry is None:
+        labelstart = _genLabel.i
+        nrfuncs = len(funcdefs)
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            text, functext = emit()
+        nrlabels = _genLabel.i - labelstart
+        entry = _Entry(text, functext, tuple(funcdefs[nrfuncs:]),
+                       labelstart if nrlabels else None, nrlabels,
+                       [(str(w.message), w.category) for w in caught])
+        _emitCache[key] = entry
+    else:
+        funcdefs.extend(entry.funcdefs)
+        _genLabel.i += entry.nrlabels
+    for message, category in entry.warnings:
+        warnings.warn(message, category)
+    return entry.text, entry.functext, reused
+
+
+# a pool is only worth its start-up time for larger designs
+_minParallel = 256
+_parallelJob = None
+
+
+def _forkContext():
+    """ Return a multiprocessing context that forks its workers, or None
+
+    The workers get their job from the _parallelJob global, which they
+    only see when they are forked, whatever the default start method.
+    """
+    if not hasattr(os, 'fork'):
+        return None
+    getContext = getattr(multiprocessing, 'get_context', None)
+    if getContext is None:
+        # Python 2 always forks
+        return multiprocessing
+    try:
+        return getContext('fork')
+    except ValueError:
+        return None
+
+
+def _emitParallel(hdl, gens, context, emitTree, workers):
+    """ Emit the pure generators on a pool of processes.
+
+    hdl -- 'VHDL' or 'Verilog'
+    gens -- list of (index, tree, Visitor) tuples
+    context -- the converter settings for _emitKey
+    emitTree -- function that annotates and converts a tree
+    workers -- number of processes; None selects the number of cpus for
+               designs with many generators, and 1 disables the pool
+
+    The workers are forked, so that they share the analyzed trees with the
+    parent; where processes can't be forked, nothing is done in parallel.
+    The results are put in the cache, and a dict of index to key is
+    returned for the generators that were handled. The other ones, that
+    call functions, are left to the serial path, so that the output
+    doesn't depend on the number of workers.
+    """
+    global _parallelJob
+    if workers is None:
+        if len(gens) < _minParallel:
+            return {}
+        workers = multiprocessing.cpu_count()
+    if workers <= 1 or not gens:
+        return {}
+    forking = _forkContext()
+    if forking is None:
+        return {}
+    # a few chunks per worker, to balance the load
+    size = max(1, len(gens) // (4 * workers))
+    chunks = [(i, min(i + size, len(gens))) for i in range(0, len(gens), size)]
+    _parallelJob = (hdl, gens, context, emitTree)
+    pool = forking.Pool(workers)
+    try:
+        results = pool.map(_emitChunk, chunks)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+        _parallelJob = None
+    keys = {}
+    for chunk in results:
+        for index, key, entry in chunk:
+            keys[index] = key
+            if entry is not None:
+                _emitCache[key] = _Entry(*entry)
+    return keys
+
+
+def _emitChunk(bounds):
+    """ Emit a chunk of the generators, in a worker process """
+    hdl, gens, context, emitTree = _parallelJob
+    result = []
+    for index, tree, Visitor in gens[bounds[0]:bounds[1]]:
+        key, pure = _emitKey(hdl, Visitor, tree, context, ())
+        if not pure:
+            continue
+        if key in _emitCache:
+            result.append((index, key, None))
+            continue
+        labelstart = _genLabel.i
+        try:
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                text, functext = emitTree(tree, Visitor)
+        except Exception:
+            # leave it to the serial path, that reports the error
+            continue
+        if functext or _genLabel.i != labelstart:
+            continue
+        caught = [(str(w.message), w.category) for w in caught]
+        result.append((index, key, (text, functext, (), None, 0, caught)))
+    return result
+
+
+def saveConversionCache(filename):
+    """ Write the conversion cache to a file """
+    data = dict((k, (e.text, e.functext, e.funcdefs, e.labelstart,
+                     e.nrlabels, e.warnings))
+                for k, e in _emitCache.items())
+    with open(filename, 'wb') as f:
+        pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+
+
+def loadConversionCache(filename):
+    """ Prime the conversion cache from a file, if it exists """
+    if not os.path.isfile(filename):
+        return
+    with open(filename, 'rb') as f:
+        data = pickle.load(f)
+    for k, v in data.items():
+        _emitCache[k] = _Entry(*v)
+
+
+def clearConversionCache():
+    _emitCache.clear()
+
+
+_dateLines = ('-- Date:', '// Date:')
+
+
+def _undated(f):
+    return (l for l in f if not l.startswith(_dateLines))
+
+
+def _sameText(path, other):
+    """ Return True if two files only differ in their header date """
+    with open(path, 'r') as f, open(other, 'r') as g:
+        lines, others = _undated(f), _undated(g)
+        for line in lines:
+            if line != next(others, None):
+                return False
+        return next(others, None) is None
+
+
+def _umask():
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def _replace(src, dst):
+    if hasattr(os, 'replace'):
+        os.replace(src, dst)
+    else:
+        # os.rename doesn't replace a file on Windows
+        if os.name == 'nt' and os.path.exists(dst):
+            os.remove(dst)
+        os.rename(src, dst)
+
+
+def _writeIfChanged(path, chunks):
+    """ Write text to path, unless only the header date would change.
+
+    chunks -- the text, or an iterable of its parts
+
+    The text is streamed to a temporary file in the directory of path,
+    that replaces the file if it changed.
+    Returns True if the file was written.
+    """
+    if isinstance(chunks, string_types):
+        chunks = [chunks]
+    fd, tpath = tempfile.mkstemp(suffix='.tmp',
+                                 dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        if os.path.isfile(path):
+            if _sameText(path, tpath):
+                os.remove(tpath)
+                return False
+            shutil.copymode(path, tpath)
+        else:
+            os.chmod(tpath, 0o666 & ~_umask())
+        _replace(tpath, path)
+    except BaseException:
+        if os.path.exists(tpath):
+            os.remove(tpath)
+        raise
+    return True
+
+
+class _Manifest(object):
+
+    """ Record of what a conversion regenerated """
+
+    def __init__(self, name, hdl):
+        self.name = name
+        self.hdl = hdl
+        self.files = []
+        self.processes = []
+
+    def addFile(self, path, written):
+        self.files.append({'path': path,
+                           'status': 'written' if written else 'unchanged'})
+
+    def addProcess(self, name, key, reused):
+        self.processes.append({'name': name,
+                               'key': key,
+                               'status': 'reused' if reused else 'regenerated'})
+
+    def write(self, path):
+        regenerated = [p['name'] for p in self.processes
+                       if p['status'] == 'regenerated']
+        data = {'name': self.name,
+                'hdl': self.hdl,
+                'files': self.files,
+                'processes': self.processes,
+                'regenerated': regenerated,
+                }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2, sort_keys=True)
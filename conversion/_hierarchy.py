@@ -0,0 +1,244 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the hierarchical output support of the converters.
+
+In hierarchical mode, the subblocks of the top level are converted to
+entities (modules) of their own, and instantiated in the top level.
+Subblocks that are made by the same function, with the same parameters
+and the same port types, share one entity.
+
+A subblock can only be converted on its own if it communicates through
+its arguments, and if all of these are plain signals or parameters.
+Other subblocks are flattened into the top level, as before.
+"""
+from __future__ import absolute_import
+
+
+import inspect
+
+from myhdl._Signal import _Signal
+from myhdl._ShadowSignal import _ShadowSignal
+from myhdl._structured import Array, StructType
+from myhdl._extractHierarchy import (_UserVhdlCode, _UserVerilogCode,
+                                     _userCodeMap, _memInfoMap)
+from myhdl.conversion._convcache import _valSig, _objSig
+
+
+class _Block(object):
+
+    """ A subblock that is converted on its own """
+
+    __slots__ = ('index', 'name', 'entity', 'ports')
+
+    def __init__(self, index, name, entity, ports):
+        self.index = index
+        self.name = name
+        self.entity = entity
+        self.ports = ports
+
+
+class _Entities(object):
+
+    """ The entities made in a hierarchical conversion, by key """
+
+    __slots__ = ('keys', 'names')
+
+    def __init__(self, name):
+        self.keys = {}
+        self.names = set([name])
+
+
+def _portSig(s):
+    return (type(s).__name__, getattr(s._type, '__name__', None),
+            s._nrbits, s._min, s._max, _valSig(s._init))
+
+
+def _blockArgs(inst, hdl, memsigs):
+    """ Return the arguments and the key of a subblock, or None """
+    func = inst.func
+    if func is None or id(inst.obj) in _userCodeMap[hdl]:
+        return None
+    spec = inspect.getargspec(func)
+    if spec.varargs or spec.keywords:
+        return None
+    args, key = [], [func]
+    for n in spec.args:
+        if n in inst.sigdict:
+            s = inst.sigdict[n]
+            if isinstance(s, _ShadowSignal) or id(s) in memsigs:
+                return None
+            key.append((n, _portSig(s)))
+        elif n in inst.argdict:
+            s = inst.argdict[n]
+            key.append((n, _objSig(s, set())))
+        else:
+            return None
+        args.append(s)
+    return args, tuple(key)
+
+
+def _memSignals(mem):
+    """ Return the signals in a list, Array or StructType """
+    if isinstance(mem, _Signal):
+        return [mem]
+    if isinstance(mem, list):
+        items = mem
+    elif isinstance(mem, Array):
+        items = mem._flatten()
+    elif isinstance(mem, StructType):
+        items = list(vars(mem).values())
+    else:
+        return []
+    sigs = []
+    for item in items:
+        sigs.extend(_memSignals(item))
+    return sigs
+
+
+def _subBlocks(hierarchy):
+    """ Return the indices of the subblocks of the top level, in order """
+    # the hierarchy lists the subblocks of an instance last to first
+    return [i for i, inst in reversed(list(enumerate(hierarchy)))
+            if inst.level == 2]
+
+
+def _convertBlocks(convertor, h, name, hdl, manifest):
+    """ Convert the subblocks of the top level that can be instantiated.
+
+    The conversions reset the signals of the design, so the design has
+    to be elaborated again before the top level is converted. The files
+    of the subblocks are added to the manifest of the top level.
+    """
+    entities = convertor._entities
+    if entities is None:
+        entities = _Entities(name)
+    memsigs = set()
+    if hdl == 'verilog':
+        # Verilog can't connect the words of a memory to a port
+        for m in list(_memInfoMap.values()):
+            if isinstance(m.mem, list):
+                memsigs.update(id(s) for s in _memSignals(m.mem))
+    blocks = []
+    for i in _subBlocks(h.hierarchy):
+        inst = h.hierarchy[i]
+        found = _blockArgs(inst, hdl, memsigs)
+        if found is None:
+            continue
+        args, key = found
+        if key not in entities.keys:
+            entity = base = inst.func.__name__
+            n = 0
+            while entity in entities.names:
+                n += 1
+                entity = '%s_%s' % (base, n)
+            entities.names.add(entity)
+            sub = convertor.copy(name=entity, manifest=None, report=None,
+                                 _entities=entities)
+            if hasattr(sub, 'no_testbench'):
+                sub.no_testbench = True
+            sub(inst.func, *args)
+            manifest.files.extend(sub._manifest.files)
+            entities.keys[key] = (entity, sub._portdirs)
+        entity, portdirs = entities.keys[key]
+        blocks.append(_Block(i, inst.name, entity, portdirs))
+    return blocks
+
+
+def _instantiateBlocks(h, blocks, Instance, convertor):
+    """ Replace the subblocks in a new elaboration by their instances """
+    hierarchy = h.hierarchy
+    ports = {}
+    for b in blocks:
+        inst = hierarchy[b.index]
+        ports[b.index] = [(n, inst.sigdict[n]) for n, _, _ in b.ports]
+        for (n, driven, read), (_, s) in zip(b.ports, ports[b.index]):
+            # an output port that the subblock reads is still an output
+            if driven:
+                s._driven = 'wire'
+            elif read:
+                s._markRead()
+            s._markUsed()
+        _userCodeMap[Instance.hdl][id(inst.obj)] = \
+            Instance(b.name, b.entity, ports[b.index], convertor)
+    # leave out the instantiated subblocks and everything below them
+    pruned = []
+    level = None
+    for i, inst in enumerate(hierarchy):
+        if level is not None and inst.level > level:
+            continue
+        level = inst.level if i in ports else None
+        if level is None:
+            pruned.append(inst)
+    h.hierarchy = pruned
+    # the ports that were only named in a subblock are named in the top
+    # level, as in a flat conversion
+    named = set()
+    for inst in pruned:
+        named.update(id(s) for s in inst.sigdict.values())
+        for m in inst.memdict.values():
+            named.update(id(s) for s in _memSignals(m.mem))
+    for b in blocks:
+        for n, s in ports[b.index]:
+            if id(s) not in named:
+                named.add(id(s))
+                pruned[0].sigdict['%s_%s' % (b.name, n)] = s
+
+
+class _VhdlBlockInstance(_UserVhdlCode):
+
+    hdl = 'vhdl'
+
+    def __init__(self, label, entity, ports, convertor):
+        self.code = label
+        self.funcname = entity
+        self.namespace = ports
+        self.func = None
+        self.sourcefile = self.sourceline = None
+        self.library = convertor.library
+        self.architecture = convertor.architecture
+
+    def __str__(self):
+        s = "\n%s: entity %s.%s(%s)\n" % (self.code, self.library,
+                                        self.funcname, self.architecture)
+        if self.namespace:
+            s += "    port map (\n"
+            s += ",\n".join("        %s => %s" % (n, sig._name)
+                            for n, sig in self.namespace)
+            s += "\n    );\n\n"
+        return s
+
+
+class _VerilogBlockInstance(_UserVerilogCode):
+
+    hdl = 'verilog'
+
+    def __init__(self, label, entity, ports, convertor):
+        self.code = label
+        self.funcname = entity
+        self.namespace = ports
+        self.func = None
+        self.sourcefile = self.sourceline = None
+
+    def __str__(self):
+        s = "%s %s (\n" % (self.funcname, self.code)
+        s += ",\n".join("    .%s(%s)" % (n, sig._name)
+                        for n, sig in self.namespace)
+        s += "\n);\n\n"
+        return s
@@ -0,0 +1,103 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the memory initialization files of the converters.
+
+When the initfile_threshold attribute of a convertor is set, the tables
+with at least that many words are written to memory files next to the
+output, and loaded from there by the converted code, instead of being
+written out as case statements and aggregates. The tables are the
+tuple-of-int ROMs, and the initial values of one-dimensional memories
+of intbv signals.
+"""
+from __future__ import absolute_import
+
+
+import os
+
+from myhdl._intbv import intbv
+from myhdl._Signal import _Signal
+from myhdl._memfile import _memText
+from myhdl._structured import Array
+from myhdl.conversion._convcache import _writeIfChanged
+
+
+def _isLarge(size, threshold):
+    return threshold is not None and size >= threshold
+
+
+def _romName(tree, name):
+    """ Return the name of the constant that holds a ROM of a generator """
+    return '%s_%s' % (tree.name, name)
+
+
+def _largeRoms(genlist, threshold):
+    """ Return the names and the contents of the ROMs that go to files """
+    roms = []
+    for tree in genlist:
+        for name, rom in getattr(tree, 'roms', {}).items():
+            if _isLarge(len(rom), threshold):
+                roms.append((_romName(tree, name), rom))
+    return roms
+
+
+def _memValues(m, threshold):
+    """ Return the initial values and the first word of a memory that goes
+    to a file, or None
+    """
+    if isinstance(m.mem, Array):
+        if len(m.mem.shape) != 1:
+            return None
+        items = m.mem._flatten()
+    elif isinstance(m.mem, list):
+        items = m.mem
+    else:
+        return None
+    if not _isLarge(len(items), threshold):
+        return None
+    if not all(isinstance(s, _Signal) and isinstance(s._val, intbv)
+               for s in items):
+        return None
+    values = [int(s._val) for s in items]
+    if values.count(values[0]) == len(values):
+        # a single aggregate will do
+        return None
+    return values, items[0]
+
+
+class _InitFiles(object):
+
+    """ The memory files of a conversion """
+
+    def __init__(self, prefix, directory):
+        self.prefix = prefix
+        self.directory = directory
+        self.files = []
+        self.lines = []
+
+    def add(self, name, values, nrbits):
+        """ Add a file for a table, and return its file name """
+        filename = '%s_%s.hex' % (self.prefix, name)
+        path = os.path.join(self.directory, filename)
+        self.files.append((path, _memText(values, nrbits)))
+        return filename
+
+    def write(self, manifest):
+        for path, text in self.files:
+            manifest.addFile(path, _writeIfChanged(path, text))
@@ -167,11 +167,20 @@ class _ConversionMixin(object):
             self.visit(n)
 
 
-def _LabelGenerator():
-    i = 1
-    while 1:
-        yield "MYHDL%s" % i
-        i += 1
+class _LabelGenerator(object):
+
+    def __init__(self):
+        # number of labels generated so far
+        self.i = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self.i += 1
+        return "MYHDL%s" % self.i
+
+    next = __next__
 
 
 _genLabel = _LabelGenerator()
@@ -206,6 +215,7 @@ class _UniqueSuffixGenerator(object):
 _genUniqueSuffix = _UniqueSuffixGenerator()
 
 
+
 # check if expression is constant
 def _isConstant(tree, symdict):
     v = _namesVisitor()
@@ -0,0 +1,154 @@
+#  This file is part of the myhdl library, a Python package for using
+#  Python as a Hardware Description Language.
+#
+#  Copyright (C) 2003-2016 Jan Decaluwe
+#
+#  The myhdl library is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU Lesser General Public License as
+#  published by the Free Software Foundation; either version 2.1 of the
+#  License, or (at your option) any later version.
+#
+#  This library is distributed in the hope that it will be useful, but
+#  WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+#  Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public
+#  License along with this library; if not, write to the Free Software
+#  Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA 02111-1307 USA
+
+""" Module with the conversion report.
+
+The report records for each phase of a conversion its wall time, the
+change of the resident memory over the phase, the peak resident memory
+of the process so far and the number of Python objects at its end, and
+the time spent on each generator. It is only made when the report attribute of
+the convertor is set.
+"""
+from __future__ import absolute_import, print_function
+
+
+import gc
+import json
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def _memory():
+    """ Return the resident memory of the process in kB, if known """
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (IOError, OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def _peakMemory():
+    """ Return the peak resident memory of the process so far in kB, if
+    known
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak //= 1024
+    return peak
+
+
+class _Report(object):
+
+    """ Record of the phases of a conversion """
+
+    def __init__(self, name, hdl):
+        self.name = name
+        self.hdl = hdl
+        self.phases = []
+        self.processes = []
+        self.annotateTime = 0.0
+        self._phase = None
+        self._start = None
+        self._memory = None
+
+    def phase(self, name):
+        """ End the current phase, and start the next one """
+        self.end()
+        self._phase = name
+        self._start = time.time()
+        self._memory = _memory()
+
+    def end(self):
+        if self._phase is None:
+            return
+        seconds = time.time() - self._start
+        memory = _memory()
+        if memory is not None and self._memory is not None:
+            memory -= self._memory
+        else:
+            memory = None
+        self.phases.append({'phase': self._phase,
+                            'seconds': seconds,
+                            'memory_change_kb': memory,
+                            'process_peak_memory_kb': _peakMemory(),
+                            'objects': len(gc.get_objects())})
+        self._phase = None
+
+    def addProcess(self, name, seconds, annotate, reused):
+        self.processes.append({'name': name,
+                               'seconds': seconds,
+                               'annotate_seconds': annotate,
+                               'reused': reused})
+
+    def asDict(self):
+        return {'name': self.name,
+                'hdl': self.hdl,
+                'seconds': sum(p['seconds'] for p in self.phases),
+                'annotate_seconds': self.annotateTime,
+                'phases': self.phases,
+                'processes': self.processes}
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.asDict(), f, indent=2, sort_keys=True)
+
+    def __str__(self, nrprocs=10):
+        d = self.asDict()
+        lines = ["Conversion report for %s (%s): %.3fs" %
+                 (self.name, self.hdl, d['seconds'])]
+        lines.append("  %-24s %10s %14s %16s %10s" %
+                     ('phase', 'seconds', 'RSS change kB',
+                      'process peak kB', 'objects'))
+        for p in self.phases:
+            lines.append("  %-24s %10.3f %14s %16s %10d" %
+                         (p['phase'], p['seconds'], p['memory_change_kb'],
+                          p['process_peak_memory_kb'], p['objects']))
+        lines.append("  %d processes, %.3fs in type annotation" %
+                     (len(self.processes), self.annotateTime))
+        slowest = sorted(self.processes, key=lambda p: -p['seconds'])
+        for p in slowest[:nrprocs]:
+            lines.append("    %-30s %8.4fs%s" %
+                         (p['name'], p['seconds'],
+                          ' (reused)' if p['reused'] else ''))
+        return '\n'.join(lines)
+
+
+class _NoReport(object):
+
+    """ Stand-in when no report is asked for """
+
+    annotateTime = 0.0
+
+    def phase(self, name):
+        pass
+
+    def end(self):
+        pass
+
+    def addProcess(self, name, seconds, annotate, reused):
+        pass
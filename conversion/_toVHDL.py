@@ -29,6 +29,8 @@ import os
 import re
 
 import inspect
+import operator
+import time
 from datetime import datetime
 # import compiler
 # from compiler import ast as astNode
@@ -49,12 +51,24 @@ from myhdl._instance import _Instantiator
 from myhdl.conversion._misc import (_error, _kind, _context,
                                     _ConversionMixin, _Label, _genUniqueSuffix, _isConstant)
 from myhdl.conversion._analyze import (_analyzeSigs, _analyzeGens, _analyzeTopFunc,
-                                       _Ram, _Rom, _enumTypeSet)
+                                       _Ram, _Rom, _enumTypeSet,
+                                       _sigName, _arrayName)
 from myhdl._Signal import _Signal, _WaiterList
 from myhdl.conversion._toVHDLPackage import _package
+from myhdl.conversion._report import _Report, _NoReport
+from myhdl.conversion._hierarchy import (_convertBlocks, _instantiateBlocks,
+                                         _VhdlBlockInstance)
+from myhdl.conversion._convcache import (_emitKey, _emit, _emitParallel,
+                                         _writeIfChanged, _Manifest,
+                                         loadConversionCache,
+                                         saveConversionCache,
+                                         clearConversionCache)
 # from myhdl._util import  _flatten
 from myhdl._compat import integer_types, class_types, StringIO
 from myhdl._ShadowSignal import _TristateSignal, _TristateDriver
+from myhdl._memfile import _romWidth
+from myhdl.conversion._initfiles import (_InitFiles, _isLarge, _romName,
+                                         _largeRoms, _memValues)
 from myhdl._misc import m1Dinfo
 from myhdl._structured import Array, StructType
 # from myhdl._ShadowSignal import ConcatSignal
@@ -168,7 +182,17 @@ class _ToVHDLConvertor(object):
                  "architecture",
                  "std_logic_ports",
                  "no_initial_values",
-                 "structured_ports"
+                 "structured_ports",
+                 "conversion_cache",
+                 "manifest",
+                 "workers",
+                 "hierarchical",
+                 "report",
+                 "initfile_threshold",
+                 "lean",
+                 "_entities",
+                 "_portdirs",
+                 "_manifest"
                  )
 
     def __init__(self):
@@ -185,6 +209,26 @@ class _ToVHDLConvertor(object):
         self.std_logic_ports = False
         self.no_initial_values = False
         self.structured_ports = False
+        self.conversion_cache = None
+        self.manifest = None
+        self.workers = None
+        self.hierarchical = False
+        self.report = None
+        self.initfile_threshold = None
+        self.lean = False
+        self._entities = None
+        self._portdirs = None
+        self._manifest = None
+
+    def copy(self, **attrs):
+        """ Return a convertor with the same attributes, updated by attrs """
+        convertor = type(self)()
+        for attr in self.__slots__:
+            if hasattr(self, attr):
+                setattr(convertor, attr, getattr(self, attr))
+        for attr, value in attrs.items():
+            setattr(convertor, attr, value)
+        return convertor
 
     def __call__(self, func, *args, **kwargs):
         global _converting
@@ -208,18 +252,35 @@ class _ToVHDLConvertor(object):
             name = str(self.name)
 
         print('Calling toVHDL for {}'.format(name))
+        report = _Report(name, 'VHDL') if self.report else _NoReport()
+        manifest = _Manifest(name, 'VHDL')
 
         # 1 Hierarchy
+        report.phase('hierarchy extraction')
         try:
             h = _HierExtr(name, func, *args, **kwargs)
         finally:
             _converting = 0
 
-        trace.push(message='h.hierarchy')
-        for item in h.hierarchy:
-            trace.print('\t', repr(item))
-        trace.print()
-        trace.pop()
+        if self.hierarchical:
+            report.phase('subblocks')
+            blocks = _convertBlocks(self, h, name, 'vhdl', manifest)
+            if blocks:
+                report.phase('hierarchy extraction 2')
+                # the subblock conversions reset the design, elaborate again
+                _converting = 1
+                try:
+                    h = _HierExtr(name, func, *args, **kwargs)
+                finally:
+                    _converting = 0
+                _instantiateBlocks(h, blocks, _VhdlBlockInstance, self)
+
+        if trace.enabled:
+            trace.push(message='h.hierarchy')
+            for item in h.hierarchy:
+                trace.log('\t {!r}', item)
+            trace.print()
+            trace.pop()
 
         if self.directory is None:
             directory = ''
@@ -229,16 +290,12 @@ class _ToVHDLConvertor(object):
         useClauses = self.use_clauses
 
         vpath = os.path.join(directory, name + ".vhd")
-        tpath = os.path.join(directory, name + ".tmp")
-        tfile = open(tpath, 'w')
         ppath = os.path.join(directory, "pck_myhdl_%s.vhd" % _shortversion)
-        pfile = None
-        # write MyHDL package always during development, as it may change
-#        pfile = None
-#        if not os.path.isfile(ppath):
-#            pfile = open(ppath, 'w')
-        if not self.no_myhdl_package:
-            pfile = open(ppath, 'w')
+        if self.conversion_cache:
+            cpath = os.path.join(directory, self.conversion_cache)
+            loadConversionCache(cpath)
+        else:
+            clearConversionCache()
 
         ### initialise properly ###
         _genUniqueSuffix.reset()
@@ -246,34 +303,40 @@ class _ToVHDLConvertor(object):
         _enumPortTypeSet.clear()
 
         # 2 Analyse Generators
+        report.phase('analyzeGens')
         trace.push(message='Analyse Generators')
         arglist = _flatten(h.top)
         _checkArgs(arglist)
-        genlist = _analyzeGens(arglist, h.absnames)
+        # the generators are labeled relative to the top level
+        dummyprefixes = (name + '_', name.lower() + '_')
+        absnames = dict((k, _stripPrefixes(v, dummyprefixes))
+                        for k, v in h.absnames.items())
+        genlist = _analyzeGens(arglist, absnames)
         trace.print('Analysed Generators')
         trace.print('genlist', genlist)
         trace.pop()
 
         # 3 analyse the signals
+        report.phase('analyzeSigs')
         trace.push(message='Analyse Signals')
         siglist, memlist = _analyzeSigs(h.hierarchy, hdl='VHDL')
 #         trace.print('siglist', siglist)
 #         trace.print('memlist', memlist)
-        trace.print('Analysed Signals')
-        trace.print('siglist')
-        for sig in siglist:
-            trace.print('\t', repr(sig))
-        trace.print('memlist')
-        for mem in memlist:
-            trace.print('\t', repr(mem))
+        if trace.enabled:
+            trace.print('Analysed Signals')
+            trace.print('siglist')
+            for sig in siglist:
+                trace.log('\t {!r}', sig)
+            trace.print('memlist')
+            for mem in memlist:
+                trace.log('\t {!r}', mem)
         trace.pop()
 
-        # 4 Annotate the types
-        trace.push(message='_annotateTypes')
-        _annotateTypes(genlist)
-        trace.pop()
+        # 4 the types are annotated in _convertGens, for the generators
+        #   that are not in the conversion cache
 
         # 5 infer interface
+        report.phase('analyzeTopFunc')
         trace.push(message='Infer Interface')
         top_inst = h.hierarchy[0]
         intf = _analyzeTopFunc(top_inst, func, *args, **kwargs)
@@ -284,7 +347,7 @@ class _ToVHDLConvertor(object):
         portlist = []
         for portname in intf.argnames:
             port = intf.argdict[portname]
-            trace.print('{} read {}, driven {}'.format(repr(port), port._read, port.driven))
+            trace.log('{!r} read {}, driven {}', port, port._read, port.driven)
             if isinstance(port, StructType):
                 pass
             elif isinstance(port, Array):
@@ -316,12 +379,11 @@ class _ToVHDLConvertor(object):
         self._convert_filter(h, intf, siglist, memlist, genlist)
 
         # write the MyHDL package, if required
-        if pfile:
-            #             _writeFileHeader(pfile, ppath)
-            _writeFileHeader(pfile)
-            print(_package, file=pfile)
-            pfile.close()
+        if not self.no_myhdl_package:
+            ptext = _package + '\n'
+            manifest.addFile(ppath, _writeIfChanged(ppath, ptext))
 
+        report.phase('entity')
         packagedefs.clear()
         # from here start writing to the output file
         fileheaderlines = _writeFileHeader(vpath)
@@ -349,18 +411,25 @@ class _ToVHDLConvertor(object):
 #                 memlist.remove(m)
                 m._used = False
 
+        report.phase('type definitions')
         updatedrivenread(memlist, portlist)
         typedefines = _writeTypeDefs(memlist)
         funclines = _writeFuncDecls()
-        constantlines = _writeConstants(memlist)
-        siglines = _writeSigDecls(intf, siglist, memlist)
+        initfiles = _InitFiles(name, directory)
+        _writeRomDecls(genlist, initfiles)
+        constantlines = _writeConstants(memlist, initfiles)
+        report.phase('signal declarations')
+        siglines = _writeSigDecls(intf, siglist, memlist, initfiles)
         vlines = []
         _writeCompDecls(vlines, compDecls)
         # the converted 'generators'
-        _convertGens(genlist, siglist, memlist, vlines)
+        report.phase('convertGens')
+        _convertGens(genlist, siglist, memlist, vlines, manifest, self.workers,
+                     report)
         _writeModuleFooter(vlines, arch)
 
-        tfile.write(''.join(fileheaderlines))
+        report.phase('output')
+        chunks = fileheaderlines
         # add local package if required
         if len(packagedefs.names):
             packagelines = []
@@ -373,52 +442,36 @@ class _ToVHDLConvertor(object):
             packagedefs.write(packagelines)
             pkgend = '\nend pkg_{};\n\n'.format(name)
             packagelines.append(pkgend)
-            tfile.write(''.join(packagelines))
+            chunks.extend(packagelines)
 
             usepkg = '\tuse {}.pkg_{}.all;\n\n'.format(lib, name)
             headerlines.append(usepkg)
-#
-#         sl = []
-#         for line in siglines:
-#             #             print(line, end='')
-#             sl.append(line.replace(name + '_', ''))
-# #         for line in sl:
-# #             print(line, end='')
-        tfile.write(''.join(headerlines + entitylines + typedefines + funclines + constantlines))
-        tfile.write(''.join(sortalign(siglines, sort=True) + vlines))
-        tfile.close()
-        # tbfile.close()
-
-        # postedit the .vhd file
-        dummyprefixes = [name + '_',
-                         name.lower() + '_']
-        fi = open(tpath, 'r')
-        fo = open(vpath, 'w')
-        # edit ...
-        # read the temporary VHDL file
-        # splitting into lines
-        filines = fi.read().split('\n')
-        for line in filines:
-            skip = False
-            for sw in suppressedWarnings:
-                if sw._name in line:
-                    skip = True
-                    break
-            # selectively write the lines to the output
-            if not skip:
-                # ideally should do this while giving the names
-                for dp in dummyprefixes:
-                    line = line.replace(dp, '')
-#                 line = line.replace('    ', '\t')
-                fo.write(line + '\n')
-
-        fi.close()
-        os.remove(tpath)
-        fo.close()
-#         else:
-#             if os.path.exists( vpath ):
-#                 os.remove( vpath )
-#             os.rename( tpath, vpath )
+        chunks.extend(headerlines + entitylines + typedefines + funclines
+                      + initfiles.lines + constantlines)
+        chunks.extend(sortalign(siglines, sort=True))
+        chunks.extend(vlines)
+        chunks.append('\n')
+        if suppressedWarnings:
+            chunks = _dropSuppressed(chunks, suppressedWarnings)
+        manifest.addFile(vpath, _writeIfChanged(vpath, chunks))
+        del vlines[:]
+        initfiles.write(manifest)
+        if self.conversion_cache:
+            saveConversionCache(cpath)
+        if self.manifest:
+            manifest.write(os.path.join(directory, self.manifest))
+        report.end()
+        if self.report:
+            print(report)
+            if self.report is not True:
+                report.write(os.path.join(directory, self.report))
+
+        # the port directions, for the instantiation in a hierarchical parent
+        self._portdirs = [(n, intf.argdict[n]._driven, intf.argdict[n]._read)
+                          for n in intf.argnames
+                          if isinstance(intf.argdict[n], _Signal)]
+
+        self._manifest = manifest
 
         ### clean-up properly ###
         self._cleanup(siglist)
@@ -505,6 +558,43 @@ portConversions = []
 suppressedWarnings = []
 constantlist = []
 
+# a name, with its record fields and constant indices
+_nameRe = re.compile(r'\w+(?:\.\w+|\(\w+\))*')
+_selectorRe = re.compile(r'[.(]')
+
+
+def _stripPrefixes(name, prefixes):
+    for p in prefixes:
+        name = name.replace(p, '')
+    return name
+
+
+def _usesName(line, names):
+    """ Return True if line uses one of names, possibly indexed """
+    for name in _nameRe.findall(line):
+        if name in names:
+            return True
+        for m in _selectorRe.finditer(name):
+            if name[:m.start()] in names:
+                return True
+    return False
+
+
+def _dropSuppressed(chunks, sigs):
+    """ Yield the lines of chunks that don't use a signal with a
+    suppressed warning
+    """
+    names = set(s._name for s in sigs)
+    rest = ''
+    for chunk in chunks:
+        lines = (rest + chunk).split('\n')
+        rest = lines.pop()
+        for line in lines:
+            if not _usesName(line, names):
+                yield line + '\n'
+    if not _usesName(rest, names):
+        yield rest
+
 
 def _writeModuleHeader(intf, needPck, lib, useClauses):
     lines = []
@@ -641,7 +731,7 @@ def _writeEntity(intf, needPck, lib, arch, useClauses, doc, stdLogicPorts, sigli
 
 
 def addStructuredPortEntry(stdLogicPorts, pl, portname, portsig):
-    trace.print('addStructuredPortEntry', stdLogicPorts, portname, repr(portsig), portsig.driven, portsig.read)
+    trace.log('addStructuredPortEntry {} {} {!r} {} {}', stdLogicPorts, portname, portsig, portsig.driven, portsig.read)
     r = _getRangeString(portsig)
     pt = st = _getTypeString(portsig)
     if stdLogicPorts:
@@ -751,7 +841,61 @@ def _writeFuncDecls():
     return []
 
 
-def _writeConstants(memlist):
+def _initThreshold():
+    """ Return the size from which tables are loaded from files, if any """
+    # hread into a std_logic_vector is new in VHDL-2008
+    if toVHDL.standard == '2008':
+        return toVHDL.initfile_threshold
+    return None
+
+
+def _initFunction(name, typedef, nrbits, tipe):
+    """ Return a function that reads a memory file into a table """
+    return ''.join((
+        "\timpure function init_{}(fn : string) return {} is\n".format(name, typedef),
+        "\t\tfile f : text open read_mode is fn;\n",
+        "\t\tvariable l : line;\n",
+        "\t\tvariable v : std_logic_vector({} downto 0);\n".format(nrbits - 1),
+        "\t\tvariable r : {};\n".format(typedef),
+        "\tbegin\n",
+        "\t\tfor i in r'range loop\n",
+        "\t\t\treadline(f, l);\n",
+        "\t\t\thread(l, v);\n",
+        "\t\t\tr(i) := {}(v);\n".format(tipe),
+        "\t\tend loop;\n",
+        "\t\treturn r;\n",
+        "\tend function init_{};\n\n".format(name)))
+
+
+def _initCall(m, initfiles):
+    """ Return the initial value of a memory that is loaded from a file,
+    or None
+    """
+    found = _memValues(m, _initThreshold())
+    if found is None:
+        return None
+    values, s = found
+    filename = initfiles.add(m.name, values, s._nrbits)
+    initfiles.lines.append(_initFunction(m.name, m._typedef, s._nrbits,
+                                         _getTypeString(s)))
+    return 'init_{}("{}")'.format(m.name, filename)
+
+
+def _writeRomDecls(genlist, initfiles):
+    """ Declare the large ROMs as constants, loaded from files """
+    for name, rom in _largeRoms(genlist, _initThreshold()):
+        nrbits, signed = _romWidth(rom)
+        tipe = 'signed' if signed else 'unsigned'
+        typedef = 't_' + name
+        filename = initfiles.add(name, rom, nrbits)
+        initfiles.lines.append("\ttype {} is array(0 to {}-1) of {}({} downto 0);\n"
+                               .format(typedef, len(rom), tipe, nrbits - 1))
+        initfiles.lines.append(_initFunction(name, typedef, nrbits, tipe))
+        initfiles.lines.append('\tconstant {} : {} := init_{}("{}");\n\n'
+                               .format(name, typedef, name, filename))
+
+
+def _writeConstants(memlist, initfiles):
     trace.push(message='_writeConstants')
     lines = []
     lines.append("\n")
@@ -766,7 +910,10 @@ def _writeConstants(memlist):
         # not driven, but _read
         # drill down into the list
 #         print(m)
-        cl.append("\tconstant {} : {} := ( {} );\n" .format(m.name, m._typedef, expandconstant(m.mem)))
+        init = _initCall(m, initfiles)
+        if init is None:
+            init = '( {} )'.format(expandconstant(m.mem))
+        cl.append("\tconstant {} : {} := {};\n" .format(m.name, m._typedef, init))
         constantlist.append(m.name)
     for l in sortalign(cl, sort=True):
         lines.append(l)
@@ -830,42 +977,46 @@ def expandconstant(c):
         return s[:-2]
 
 
+def _initialValue(s):
+    """ Return the VHDL initial value of a signal in an Array """
+    if isinstance(s._val, bool):
+        return '\'1\'' if s._val else '\'0\''
+    if s._val:
+        return 'b"{}"'.format(bin(s._val, s._nrbits, True))
+    return '(others => \'0\')'
+
+
 def expandarray(c):
+    if isinstance(c, Array) and c._homogeneous and isinstance(c.element, _Signal):
+        items = c._flatten()
+        first = items[0]._val
+        if all(isinstance(s, _Signal) and s._val == first for s in items):
+            # all elements start with the same value
+            v = _initialValue(items[0])
+            for _ in c.shape[1:]:
+                v = '(others => {})'.format(v)
+            return 'others => ' + v
+    return _expandarray(c)
+
+
+def _expandarray(c):
     if isinstance(c[0], (list, Array)):
         size = c.shape[0] if isinstance(c, Array) else len(c)
-        s = ''
-        for i in range(size):
-            s = ''.join((s, '(', expandarray(c[i]), ')'))
-            if i != size - 1:
-                s = ''.join((s, ',\n'))
-        return s
+        return ',\n'.join('({})'.format(_expandarray(c[i]))
+                           for i in range(size))
     else:
         # lowest (= last) level of m1D
         size = c.shape[0] if isinstance(c, Array) else len(c)
-        s = ''
         if isinstance(c[0], StructType):
-            for i in range(size):
-                s = ''.join((s, '{}, '.format(c[i].initial('vhdl'))))
-        elif isinstance(c[0]._val, bool):
-            if size > 1:
-                for i in range(size):
-                    s = ''.join(
-                        (s, '{}, '.format('\'1\'' if c[i]._val else '\'0\'')))
-            else:
-                s = ''.join((s, '{}, '.format('"1"' if c[0]._val else '"0"')))
+            items = [c[i].initial('vhdl') for i in range(size)]
+        elif isinstance(c[0]._val, bool) and size == 1:
+            items = ['"1"' if c[0]._val else '"0"']
         else:
-            # intbv
-            for i in range(size):
-                if c[i]._val:
-                    s = ''.join(
-                        (s, 'b"{}", '.format(bin(c[i]._val, c[i]._nrbits, True))))
-                else:
-                    s = ''.join((s, '(others => \'0\'), '))
+            items = [_initialValue(c[i]) for i in range(size)]
 
 # TODO:  cut long lines
 
-        # remove trailing ', '
-        return s[:-2]
+        return ', '.join(items)
 
 
 def addstructuredtypedef(obj, targetlist, otherlist=None):
@@ -957,11 +1108,13 @@ def updatedrivenread(memlist, portlist):
             pass
         else:
             # infer attributes for the case of named signals in a list
-            trace.print('inferring {:30} {:4} {:4} {}'.format(m.name, m.driven, m._read, repr(m.mem)))
+            if trace.enabled:
+                trace.log('inferring {:30} {:4} {:4} {!r}', m.name, m.driven, m._read, m.mem)
             trace.push(message='inferattrs')
             inferattrs(m, m.mem)
             trace.pop()
-            trace.print('\tinferred: driven: {:4} read: {:4}'.format(m.driven, m._read))
+            if trace.enabled:
+                trace.log('\tinferred: driven: {:4} read: {:4}', m.driven, m._read)
     trace.pop()
 
 
@@ -1029,7 +1182,7 @@ def _writeTypeDefs(memlist):
     return lines
 
 
-def _writeSigDecls(intf, siglist, memlist):
+def _writeSigDecls(intf, siglist, memlist, initfiles):
     lines = []
     trace.push(message='_writeSigDecls')
     del constwires[:]
@@ -1095,11 +1248,14 @@ def _writeSigDecls(intf, siglist, memlist):
         if isinstance(m.mem, Array):
             if m.mem.attributes is None:
                 if m.mem._initialised or not toVHDL.no_initial_values:
-                    sl.append("\tsignal {} : {} := ({});" .format(m.name, m._typedef, expandarray(m.mem)))
+                    init = _initCall(m, initfiles)
+                    if init is None:
+                        init = '({})'.format(expandarray(m.mem))
+                    sl.append("\tsignal {} : {} := {};" .format(m.name, m._typedef, init))
                 else:
                     sl.append("\tsignal {} : {};" .format(m.name, m._typedef))
             else:
-                trace.print('{} has attributes: {}'.format(m.mem, m.mem.attributes))
+                trace.log('{} has attributes: {}', m.mem, m.mem.attributes)
                 sl.append("\tshared variable {} : {};" .format(m.name, m._typedef))
 
         elif isinstance(m.mem, list):
@@ -1119,8 +1275,11 @@ def _writeSigDecls(intf, siglist, memlist):
             #             else:
                 # the full works
             if not toVHDL.no_initial_values:
-                sl.append("\tsignal {} : {} := ({});" .format(
-                    m.name, m._typedef, expandarray(m.mem)))
+                init = _initCall(m, initfiles)
+                if init is None:
+                    init = '({})'.format(expandarray(m.mem))
+                sl.append("\tsignal {} : {} := {};" .format(
+                    m.name, m._typedef, init))
             else:
                 sl.append("\tsignal {} : {};" .format(m.name, m._typedef))
 
@@ -1200,7 +1359,8 @@ def sortalign(sl, sort=False, port=False, sep=':'):
 
 
 def inferattrs(m, mem, level=0):
-    trace.print('{} {} {} {} {}'.format(level, m, mem, m.driven, m._read))
+    if trace.enabled:
+        trace.log('{} {} {} {} {}', level, m, mem, m.driven, m._read)
     level += 1
     if isinstance(mem, StructType):
         refs = vars(mem)
@@ -1217,7 +1377,8 @@ def inferattrs(m, mem, level=0):
                 inferattrs(m, s, level)
             else:
                 continue
-            trace.print('{} testing {} driven: {} read: {} -> {} {}'.format('\t' * level, s, s.driven, s._read, m.driven, m._read))
+            if trace.enabled:
+                trace.log('{} testing {} driven: {} read: {} -> {} {}', '\t' * level, s, s.driven, s._read, m.driven, m._read)
 
     elif isinstance(mem[0], (list, Array)):
         trace.print(mem)
@@ -1227,13 +1388,19 @@ def inferattrs(m, mem, level=0):
 
     else:
         # lowest (= last) level of m1D
+        # the driven property of an Array looks at all elements, so
+        # get it once
+        driven = m.driven
         for s in mem:
-            if hasattr(m, 'driven') and hasattr(s, 'driven'):
-                if not m.driven and s.driven:
-                    m._driven = s.driven
+            if hasattr(s, 'driven'):
+                if not driven and s.driven:
+                    m._driven = driven = s.driven
                 if not m._read and s._read:
                     m._read = s._read
-                trace.print('{} testing {} driven: {} read: {} -> {} {}'.format('\t' * level, s, s.driven, s._read, m.driven, m._read))
+                if trace.enabled:
+                    trace.log('{} testing {} driven: {} read: {} -> {} {}', '\t' * level, s, s.driven, s._read, m.driven, m._read)
+                elif driven and m._read:
+                    break
 
 
 def _writeCompDecls(lines, compDecls):
@@ -1296,35 +1463,64 @@ def _getTypeString(s):
     return r
 
 
-def _convertGens(genlist, siglist, memlist, lines):
+def _getVisitor(tree):
+    if tree.kind == _kind.ALWAYS:
+        return _ConvertAlwaysVisitor
+    elif tree.kind == _kind.INITIAL:
+        return _ConvertInitialVisitor
+    elif tree.kind == _kind.SIMPLE_ALWAYS_COMB:
+        return _ConvertSimpleAlwaysCombVisitor
+    elif tree.kind == _kind.ALWAYS_DECO:
+        return _ConvertAlwaysDecoVisitor
+    elif tree.kind == _kind.ALWAYS_SEQ:
+        return _ConvertAlwaysSeqVisitor
+    else:  # ALWAYS_COMB
+        return _ConvertAlwaysCombVisitor
+
+
+def _emitTree(tree, Visitor, report=None):
+    """ Annotate and convert a generator, return its text and functions """
+    t = time.time()
+    if toVHDL.lean:
+        _FoldConstants(tree).visit(tree)
+    _annotateTypes([tree])
+    if report is not None:
+        report.annotateTime += time.time() - t
+    tbuf, fbuf = StringIO(), StringIO()
+    v = Visitor(tree, tbuf, fbuf)
+    v.visit(tree)
+    return tbuf.getvalue(), fbuf.getvalue()
+
+
+def _convertGens(genlist, siglist, memlist, lines, manifest, workers=None,
+                 report=_NoReport()):
     trace.push(message='_convertGens')
     blockBuf = StringIO()
     funcBuf = StringIO()
-    for tree in genlist:
+    context = (toVHDL.standard, toVHDL.std_logic_ports,
+               toVHDL.no_initial_values, toVHDL.structured_ports,
+               toVHDL.initfile_threshold, toVHDL.lean)
+    gens = [(i, tree, _getVisitor(tree)) for i, tree in enumerate(genlist)
+            if not isinstance(tree, _UserVhdlCode)]
+    keys = _emitParallel('VHDL', gens, context, _emitTree, workers)
+    for i, tree in enumerate(genlist):
         if isinstance(tree, _UserVhdlCode):
             blockBuf.write(str(tree))
             continue
-        if tree.kind == _kind.ALWAYS:
-            trace.push(message='_ConvertAlwaysVisitor')
-            Visitor = _ConvertAlwaysVisitor
-        elif tree.kind == _kind.INITIAL:
-            trace.push(message='_ConvertInitialVisitor')
-            Visitor = _ConvertInitialVisitor
-        elif tree.kind == _kind.SIMPLE_ALWAYS_COMB:
-            trace.push(message='_ConvertSimpleAlwaysCombVisitor')
-            Visitor = _ConvertSimpleAlwaysCombVisitor
-        elif tree.kind == _kind.ALWAYS_DECO:
-            trace.push(message='_ConvertAlwaysDecoVisitor')
-            Visitor = _ConvertAlwaysDecoVisitor
-        elif tree.kind == _kind.ALWAYS_SEQ:
-            trace.push(message='_ConvertAlwaysSeqVisitor')
-            Visitor = _ConvertAlwaysSeqVisitor
-        else:  # ALWAYS_COMB
-            trace.push(message='_ConvertAlwaysCombVisitor')
-            Visitor = _ConvertAlwaysCombVisitor
-        v = Visitor(tree, blockBuf, funcBuf)
-        v.visit(tree)
-        trace.pop()
+        Visitor = _getVisitor(tree)
+        trace.push(message=Visitor.__name__)
+        t, annotate = time.time(), report.annotateTime
+        key = keys.get(i)
+        if key is None:
+            key, _ = _emitKey('VHDL', Visitor, tree, context, functiondefs)
+        text, functext, reused = _emit(key,
+                                       lambda: _emitTree(tree, Visitor, report),
+                                       functiondefs)
+        blockBuf.write(text)
+        funcBuf.write(functext)
+        manifest.addProcess(tree.name, key, reused)
+        report.addProcess(tree.name, time.time() - t,
+                          report.annotateTime - annotate, reused)
         trace.pop()
 
     lines.append(funcBuf.getvalue())
@@ -1357,7 +1553,7 @@ def _convertGens(genlist, siglist, memlist, lines):
 #             print("hasattr(s, 'toVHDL')", id(s), repr(s))
             if s._read:
                 if s._name is None:
-                    trace.print('signal target name missing for {}'.format(repr(s)))
+                    trace.log('signal target name missing for {!r}', s)
 #                 if isinstance(s, ConcatSignal):
 #                     trace.print('_convertGens is ConcatSignal: ', repr(s))
 #                     r = '    {} <= ({});'.format(s._name, s.elements('VHDL'))
@@ -1477,7 +1673,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
         return 'b"%s"' % bin(item, len(var), True)
 
     def inferCast(self, vhd, ori):
-        trace.print('inferCast', repr(vhd), repr(ori),)
+        trace.log('inferCast {!r} {!r}', vhd, ori)
         pre, suf = "", ""
         if isinstance(vhd, vhd_int):
             if isinstance(ori, vhd_array):
@@ -1553,7 +1749,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
 
 
         elif isinstance(vhd, vhd_array):
-            trace.print('vhd_array', repr(vhd))
+            trace.log('vhd_array {!r}', vhd)
             if isinstance(vhd.vhdtype, vhd_unsigned):
                 pass
             elif isinstance(vhd.vhdtype, vhd_signed):
@@ -1569,6 +1765,14 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
         trace.print(pre, suf)
         return pre, suf
 
+    def inferNameCast(self, vhd, ori):
+        """ Return the cast of a name, or of a parenthesized expression """
+        if toVHDL.lean and isinstance(vhd, vhd_boolean) and \
+                isinstance(ori, vhd_std_logic):
+            # compare, as for the ports, rather than call bool()
+            return "(", " = '1')"
+        return self.inferCast(vhd, ori)
+
     def writeIntSize(self, n):
         # write size for large integers (beyond 32 bits signed)
         # with some safety margin
@@ -1632,11 +1836,17 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
         if self.tree.hasPrint:
             self.writeline()
             self.write("variable L: line;")
+        ranges = _intRanges(self.tree) if toVHDL.lean else {}
         for name, obj in self.tree.vardict.items():
             if isinstance(obj, _loopInt):
                 continue  # hack for loop vars
             self.writeline()
-            self.writeDeclaration(obj, name, kind="variable")
+            if name in ranges:
+                lo, hi = ranges[name]
+                self.write("variable %s: %s range %s to %s;" %
+                           (name, 'natural' if lo >= 0 else 'integer', lo, hi))
+            else:
+                self.writeDeclaration(obj, name, kind="variable")
 
     def indent(self):
         #         self.ind += ' ' * 4
@@ -1757,14 +1967,24 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
         self.write(suf)
 
     def visit_BoolOp(self, node):
-        if isinstance(node.vhd, vhd_std_logic):
-            self.write("stdl")
+        pre, suf = "", ""
+        if isinstance(node.vhdOri, vhd_std_logic):
+            # the lean mode operates on the std_logic operands
+            if isinstance(node.vhd, (vhd_std_logic, vhd_boolean)):
+                pre, suf = self.inferNameCast(node.vhd, node.vhdOri)
+            else:
+                for n in node.values:
+                    n.vhd = vhd_boolean()
+        elif isinstance(node.vhd, vhd_std_logic):
+            pre = "stdl"
+        self.write(pre)
         self.write("(")
         self.visit(node.values[0])
         for n in node.values[1:]:
             self.write(" %s " % opmap[type(node.op)])
             self.visit(n)
         self.write(")")
+        self.write(suf)
 
     def visit_UnaryOp(self, node):
 
@@ -1777,7 +1997,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
             self.visit(node.operand)
             return
 
-        pre, suf = self.inferCast(node.vhd, node.vhdOri)
+        pre, suf = self.inferNameCast(node.vhd, node.vhdOri)
         self.write(pre)
         self.write("(")
         self.write(opmap[type(node.op)])
@@ -1787,7 +2007,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def visit_Attribute(self, node):
         trace.push(message='visit_Attribute')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         if isinstance(node.ctx, ast.Store):
             self.setAttr(node)
         else:
@@ -1795,7 +2015,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
         if node.attr in ('next', 'posedge', 'negedge'):
             pass
         else:
-            trace.print('? {}'.format(node.attr))
+            trace.log('? {}', node.attr)
             if not isinstance(node.value.obj, EnumType):
                 if hasattr(node.value, 'id'):
                     self.write('{}.{}'.format(node.value.id, node.attr))
@@ -1894,6 +2114,34 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
         self.write("severity error;")
         self.dedent()
 
+    def writeRomRead(self, lhs, node, rom):
+        """ Read a word of a ROM that is loaded from a file """
+        self.visit(lhs)
+        if self.SigAss:
+            self.write(' <= ')
+            self.SigAss = False
+        else:
+            self.write(' := ')
+        pre, suf = '', ''
+        if isinstance(lhs.vhd, vhd_std_logic):
+            suf = '(0)'
+        elif isinstance(lhs.vhd, vhd_int):
+            pre, suf = 'to_integer(', ')'
+        else:
+            pre, suf = 'resize(', ', %s)' % lhs.vhd.size
+            signed = _romWidth(rom)[1]
+            if isinstance(lhs.vhd, vhd_signed):
+                if not signed:
+                    pre, suf = 'signed(' + pre, suf + ')'
+            elif isinstance(lhs.vhd, vhd_unsigned):
+                if signed:
+                    pre, suf = 'unsigned(' + pre, suf + ')'
+            else:
+                pre, suf = 'std_logic_vector(' + pre, suf + ')'
+        self.write('%s%s(' % (pre, _romName(self.tree, node.value.id)))
+        self.visit(node.slice)
+        self.write(')%s;' % suf)
+
     def visit_Assign(self, node):
         trace.push(message='visit_Assign')
         lhs = node.targets[0]
@@ -1905,6 +2153,11 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
                 isinstance(node.value.slice, ast.Index) and \
                 isinstance(node.value.value.obj, _Rom):
             rom = node.value.value.obj.rom
+            if _isLarge(len(rom), _initThreshold()) and \
+                    isinstance(lhs.vhd, (vhd_std_logic, vhd_int, vhd_vector)):
+                self.writeRomRead(lhs, node.value, rom)
+                trace.pop()
+                return
             self.write("case ")
             self.visit(node.value.slice)
             self.write(" is")
@@ -2432,7 +2685,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
             s = n
             obj = self.tree.vardict[n]
             ori = inferVhdlObj(obj)
-            pre, suf = self.inferCast(node.vhd, ori)
+            pre, suf = self.inferNameCast(node.vhd, ori)
             s = "%s%s%s" % (pre, s, suf)
 
         elif n in self.tree.argnames:
@@ -2445,7 +2698,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
                 s = n
 
         elif n in self.tree.symdict:
-            trace.print('{} in self.tree.symdict'.format(n))
+            trace.log('{} in self.tree.symdict', n)
             obj = self.tree.symdict[n]
             s = n
             if isinstance(obj, bool):
@@ -2454,7 +2707,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
                 else:
                     s = "%s" % obj
             elif isinstance(obj, integer_types):
-                trace.print('{} is int'.format(obj))
+                trace.log('{} is int', obj)
                 if isinstance(node.vhd, vhd_int):
                     #                     trace.print('self.tree.symdict, integer_types', n, type(node.vhd), node.vhd)
                     s = self.IntRepr(obj)
@@ -2479,13 +2732,13 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
             elif isinstance(obj, _Signal):
                 s = str(obj)
                 ori = inferVhdlObj(obj)
-                pre, suf = self.inferCast(node.vhd, ori)
+                pre, suf = self.inferNameCast(node.vhd, ori)
                 s = "%s%s%s" % (pre, s, suf)
 
             elif _isMem(obj):
                 m = _getMemInfo(obj)
                 assert m.name
-                trace.print('_isMem', repr(obj), m.name)
+                trace.log('_isMem {!r} {}', obj, m.name)
                 s = m.name
 
             elif isinstance(obj, EnumItemType):
@@ -2655,7 +2908,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def accessIndex(self, node):
         trace.push(message='accessIndex')
-        trace.print(repr(node))
+        trace.log('{!r}', node)
         #         pre, suf = '', ''
         #         if not isinstance(node.value, Array):
         pre, suf = self.inferCast(node.vhd, node.vhdOri)
@@ -2663,7 +2916,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
         # if we are accessing an element out of a list of constants we can
         # short-circuit here
         if isinstance(node.value.obj, (list)) and isinstance(node.value.obj[0], int):
-            trace.print(repr(node.value.obj), repr(node.slice.value), vars(node.slice.value))
+            trace.log('{!r} {!r} {}', node.value.obj, node.slice.value, vars(node.slice.value))
             if hasattr(node.slice.value, 'value'):
                 self.write(
                     '({:-d})'.format(node.value.obj[node.slice.value.value]))
@@ -2706,7 +2959,7 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
             trace.print('Assigning a tuple?', node, node.elts)
             self.write('(')
             for i, elt in enumerate(node.elts):
-                trace.print(repr(elt))
+                trace.log('{!r}', elt)
                 self.visit(elt)
                 if i < len(node.elts) - 1:
                     self.write(' & ')
@@ -2757,6 +3010,8 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
         for e in senslist:
             if not isinstance(e, bt):
                 self.raiseError(ifnode, "base type error in sensitivity list")
+            if bt is _Signal:
+                _sigName(e)
         if len(senslist) >= 2 and bt == _WaiterList:
             # ifnode = node.code.nodes[0]
             assert isinstance(ifnode, ast.If)
@@ -2880,10 +3135,14 @@ class _ConvertAlwaysCombVisitor(_ConvertVisitor):
             r = []
             for item in senslist:
                 #                 trace.print( repr( item._name ))
-                if item._name is not None:
+                sname = item._name
+                if sname is None:
+                    # an element of an Array that is not named on its own
+                    sname = _arrayName(item)
+                if sname is not None:
                     # split off the base name (before the index ()
                     # and/or weed the .attr
-                    name, _, _ = item._name.split('(', 1)[0].partition('.')
+                    name, _, _ = sname.split('(', 1)[0].partition('.')
                     if name not in r:
                         # note that the list now contains names and not
                         # Signals, but we are interested in the strings anyway
@@ -3060,7 +3319,7 @@ class _ConvertAlwaysSeqVisitor(_ConvertVisitor):
             self.indent()
             for s in sigregs:
                 self.writeline()
-                self.write("%s <= %s;" % (s, _convertInitVal(s, s._init)))
+                self.write("%s <= %s;" % (_sigName(s), _convertInitVal(s, s._init)))
             for v in varregs:
                 n, reg, init = v
                 self.writeline()
@@ -3111,7 +3370,7 @@ class _ConvertFunctionVisitor(_ConvertVisitor):
                 obj, name, dir="in", constr=False, endchar="")
 
     def visit_FunctionDef(self, node):
-        trace.print(repr(node))
+        trace.log('{!r}', node)
         if self.tree.name not in functiondefs:
             functiondefs.append(self.tree.name)
             self.write("\tfunction %s" % self.tree.name)
@@ -3134,7 +3393,7 @@ class _ConvertFunctionVisitor(_ConvertVisitor):
             self.writeline()
             self.write("begin")
             self.indent()
-            trace.print('visiting node.body', repr(node.body))
+            trace.log('visiting node.body {!r}', node.body)
             self.visit_stmt(node.body)
             self.dedent()
             self.writeline()
@@ -3360,7 +3619,7 @@ def inferVhdlObj(obj, attr=None):
         vhd = vhd_enum(None)
 
     elif isinstance(obj, (list, Array)):
-        trace.print('inferVhdlObj: list/Array: {}, attr: {}'.format(repr(obj), attr))
+        trace.log('inferVhdlObj: list/Array: {!r}, attr: {}', obj, attr)
         #         trace.print('inferring', obj)
         if isinstance(obj, list):
             #             trace.print(obj)
@@ -3383,12 +3642,12 @@ def inferVhdlObj(obj, attr=None):
 
         else:
             # defaulting?
-            trace.print('Not handling {}, {}'.format(obj, element))
+            trace.log('Not handling {}, {}', obj, element)
             pass
-        trace.print('inferVhdlObj returning: {}'.format(repr(vhd)))
+        trace.log('inferVhdlObj returning: {!r}', vhd)
 
     elif isinstance(obj, StructType):
-        trace.print('inferVhdlObj: StructType: {}, attr: {}'.format(repr(obj), repr(attr)))
+        trace.log('inferVhdlObj: StructType: {!r}, attr: {!r}', obj, attr)
         # need the member name?
         if attr is not None:
             refs = vars(obj)
@@ -3403,16 +3662,29 @@ def inferVhdlObj(obj, attr=None):
                 vhd = vhd_std_logic()
             else:
                 # defaulting?
-                trace.print('inferVhdlObj, StructType: defaulting {}'.format(element))
+                trace.log('inferVhdlObj, StructType: defaulting {}', element)
                 pass
         else:
-            trace.print('inferVhdlObj, StructType: attr is None {}'.format(obj))
+            trace.log('inferVhdlObj, StructType: attr is None {}', obj)
             pass
-        trace.print('inferVhdlObj returning: {}'.format(repr(vhd)))
+        trace.log('inferVhdlObj returning: {!r}', vhd)
 
     return vhd
 
 
+def _isStdLogic(node):
+    """ Tell if an operand is std_logic, and not a constant that is
+    written as a literal of ambiguous type
+    """
+    if isinstance(node, (ast.Num, getattr(ast, 'NameConstant', ast.Num))):
+        return False
+    if isinstance(node, ast.Name) and \
+            (node.id in ('True', 'False', 'None') or
+             isinstance(getattr(node, 'obj', None), bool)):
+        return False
+    return isinstance(node.vhd, vhd_std_logic)
+
+
 def maybeNegative(vhd):
     if isinstance(vhd, vhd_signed):
         return True
@@ -3424,7 +3696,7 @@ def maybeNegative(vhd):
 class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def __init__(self, tree):
-        trace.print('_AnnotateTypesVisitor {}'.format(tree))
+        trace.log('_AnnotateTypesVisitor {}', tree)
         self.tree = tree
         trace.print(ast.dump(tree))
 
@@ -3440,15 +3712,15 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
     # a placeholder to follow the AST
     def visit_Assign(self, node):
         trace.push(message='visit_Assign')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         self.generic_visit(node)
         trace.pop()
 
     def visit_Attribute(self, node):
         trace.push(message='visit_Attribute')
-        trace.print('{} {}'.format(node, node.attr))
+        trace.log('{} {}', node, node.attr)
         if hasattr(node, 'starget'):
-            trace.print('already has starget chain?: {} <> {}'.format(node.starget, node.attr))
+            trace.log('already has starget chain?: {} <> {}', node.starget, node.attr)
             if node.starget[1] is not None:
                 node.value.starget = node.starget
             else:
@@ -3458,10 +3730,10 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
             # StructType):
             if node.attr in ('next',):
                 # start a target chain
-                trace.print('starting starget chain: {}'.format(repr(node.value.obj)))
+                trace.log('starting starget chain: {!r}', node.value.obj)
                 node.value.starget = (node.value.obj, None)
             else:
-                trace.print('continuing starget chain: {} {}'.format(node.attr, node.obj))
+                trace.log('continuing starget chain: {} {}', node.attr, node.obj)
                 node.value.attr = node.attr
                 node.value.starget = (node.obj, node.attr)
 
@@ -3473,14 +3745,14 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def visit_Assert(self, node):
         trace.push(message='visit_Assert')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         self.visit(node.test)
         node.test.vhd = vhd_boolean()
         trace.pop()
 
     def visit_AugAssign(self, node):
         trace.push(message='visit_AugAssign')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         self.visit(node.target)
         self.visit(node.value)
         if isinstance(node.op, (ast.BitOr, ast.BitAnd, ast.BitXor)):
@@ -3543,7 +3815,7 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def visit_Compare(self, node):
         trace.push(message='visit_Compare')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         node.vhd = vhd_boolean()
         self.generic_visit(node)
         left, _, right = node.left, node.ops[0], node.comparators[0]
@@ -3557,12 +3829,12 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
         trace.pop()
 
     def visit_Str(self, node):
-        trace.print('visit_Attribute {}'.format(node))
+        trace.log('visit_Attribute {}', node)
         node.vhd = vhd_string()
         node.vhdOri = copy(node.vhd)
 
     def visit_Num(self, node):
-        trace.print('visit_Num {}'.format(node))
+        trace.log('visit_Num {}', node)
         if node.n < 0:
             node.vhd = vhd_int()
         else:
@@ -3571,7 +3843,7 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def visit_For(self, node):
         trace.push(message='visit_For')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         var = node.target.id
         # make it possible to detect loop variable
         self.tree.vardict[var] = _loopInt(-1)
@@ -3579,13 +3851,13 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
         trace.pop()
 
     def visit_NameConstant(self, node):
-        trace.print('visit_NameConstant {}'.format(node))
+        trace.log('visit_NameConstant {}', node)
         node.vhd = inferVhdlObj(node.value)
         node.vhdOri = copy(node.vhd)
 
     def visit_Name(self, node):
         trace.push(message='visit_Name')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         # is a terminal
         if node.id in self.tree.vardict:
             node.obj = self.tree.vardict[node.id]
@@ -3600,7 +3872,7 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def visit_BinOp(self, node):
         trace.push(message='visit_BinOp')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         self.generic_visit(node)
 #         if isinstance(node.op, ast.BitXor):
 #             trace.print('visit_BinOp', repr(node.left), repr(node.op), repr(node.right))
@@ -3617,19 +3889,19 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
         trace.pop()
 
     def inferShiftType(self, node):
-        trace.print('inferShiftType {}'.format(node))
+        trace.log('inferShiftType {}', node)
         node.vhd = copy(node.left.vhd)
         node.right.vhd = vhd_nat()
         node.vhdOri = copy(node.vhd)
 
     def inferBitOpType(self, node):
-        trace.print('inferBitOpType {}'.format(node))
+        trace.log('inferBitOpType {}', node)
         obj = maxType(node.left.vhd, node.right.vhd)
         node.vhd = node.left.vhd = node.right.vhd = obj
         node.vhdOri = copy(node.vhd)
 
     def inferBinOpType(self, node):
-        trace.print('inferBinOpType {}'.format(node))
+        trace.log('inferBinOpType {}', node)
         left, op, right = node.left, node.op, node.right
 #         trace.print( 'inferBinOpType 1', left.vhd, right.vhd)
         if isinstance(left.vhd, (vhd_boolean, vhd_std_logic)):
@@ -3698,17 +3970,20 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def visit_BoolOp(self, node):
         trace.push(message='visit_Attribute')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         self.generic_visit(node)
-        for n in node.values:
-            n.vhd = vhd_boolean()
-        node.vhd = vhd_boolean()
+        if toVHDL.lean and all(_isStdLogic(n) for n in node.values):
+            node.vhd = vhd_std_logic()
+        else:
+            for n in node.values:
+                n.vhd = vhd_boolean()
+            node.vhd = vhd_boolean()
         node.vhdOri = copy(node.vhd)
         trace.pop()
 
     def visit_If(self, node):
         trace.push(message='visit_If')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         if node.ignore:
             return
         self.generic_visit(node)
@@ -3719,7 +3994,7 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def visit_IfExp(self, node):
         trace.push(message='visit_IfExp')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         self.generic_visit(node)  # this will visit the 3 ast.Name objects
         node.test.vhd = vhd_boolean()
         trace.pop()
@@ -3728,7 +4003,7 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
         pass  # do nothing
 
     def visit_Subscript(self, node):
-        trace.print('visit_Subscript {}'.format(node))
+        trace.log('visit_Subscript {}', node)
         #         for item in inspect.getmembers( node ):
         #             if not item[0].startswith('__') and not item[0].endswith('__') :
         #                 trace.print( '    ', item )
@@ -3740,7 +4015,7 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
     def accessSlice(self, node):
         trace.push(message='accessSlice')
         trace.print(node.lineno)
-        trace.print(node, repr(node.obj))
+        trace.log('{} {!r}', node, node.obj)
         self.generic_visit(node)
 #         trace.print(node, node.obj)
         if isinstance(node.obj, intbv) or (isinstance(node.obj, _Signal) and isinstance(node.obj._val, intbv)):
@@ -3763,7 +4038,7 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
 
         elif isinstance(node.obj, Array):
             #             node.vhd = None
-            trace.print('accessSlice Array:', repr(node.obj))
+            trace.log('accessSlice Array: {!r}', node.obj)
             #             trace.print(repr(node.value))
             #             upper = node.value.vhd.size
             #             t = type(node.value.vhd)
@@ -3806,9 +4081,9 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
     def accessIndex(self, node):
         trace.push(False, message='accessIndex')
         trace.print(node.lineno)
-        trace.print('vars: {}'.format(vars(node)))
+        trace.log('vars: {}', vars(node))
         if hasattr(node, 'starget'):
-            trace.print('starget:', repr(node.starget))
+            trace.log('starget: {!r}', node.starget)
         #         trace.print('accessIndex 1 {}'.format(node))
         self.generic_visit(node)
         node.vhd = vhd_std_logic()  # XXX default
@@ -3821,7 +4096,7 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
 
         elif isinstance(obj, Array):
             if isinstance(obj.element, StructType):
-                trace.print('accessIndex 2 {}'.format(node))
+                trace.log('accessIndex 2 {}', node)
                 # there may be an attribute involved
                 if hasattr(node, 'starget'):
                     node.vhd = inferVhdlObj(obj.element, node.starget[1])
@@ -3848,7 +4123,7 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def visit_UnaryOp(self, node):
         trace.push(message='visit_UnaryOp')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         self.visit(node.operand)
         node.vhd = copy(node.operand.vhd)
         if isinstance(node.op, ast.Not):
@@ -3857,7 +4132,10 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
             #                node.vhd = vhd_std_logic()
             #            else:
             #                node.vhd = node.operand.vhd = vhd_boolean()
-            node.vhd = node.operand.vhd = vhd_boolean()
+            if toVHDL.lean and _isStdLogic(node.operand):
+                node.vhd = vhd_std_logic()
+            else:
+                node.vhd = node.operand.vhd = vhd_boolean()
         elif isinstance(node.op, ast.USub):
             if isinstance(node.vhd, vhd_unsigned):
                 node.vhd = vhd_signed(node.vhd.size + 1)
@@ -3868,7 +4146,7 @@ class _AnnotateTypesVisitor(ast.NodeVisitor, _ConversionMixin):
 
     def visit_While(self, node):
         trace.push(message='visit_While')
-        trace.print('{}'.format(node))
+        trace.log('{}', node)
         self.generic_visit(node)
         node.test.vhd = vhd_boolean()
         trace.pop()
@@ -3880,3 +4158,134 @@ def _annotateTypes(genlist):
             continue
         v = _AnnotateTypesVisitor(tree)
         v.visit(tree)
+
+
+def _constant(node, tree):
+    """ Return the value of an integer constant, or None """
+    if isinstance(node, ast.Num):
+        n = node.n
+    elif isinstance(node, ast.Name) and node.id in tree.symdict and \
+            node.id not in tree.vardict and node.id not in tree.argnames:
+        n = tree.symdict[node.id]
+    else:
+        return None
+    if isinstance(n, integer_types) and not isinstance(n, bool):
+        return n
+    return None
+
+
+class _FoldConstants(ast.NodeTransformer):
+
+    """ Replace the operations on integer constants by their value """
+
+    ops = {ast.Add: operator.add,
+           ast.Sub: operator.sub,
+           ast.Mult: operator.mul,
+           ast.FloorDiv: operator.floordiv,
+           ast.Mod: operator.mod,
+           ast.LShift: operator.lshift,
+           ast.RShift: operator.rshift,
+           ast.BitAnd: operator.and_,
+           ast.BitOr: operator.or_,
+           ast.BitXor: operator.xor}
+
+    def __init__(self, tree):
+        self.tree = tree
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        op = self.ops.get(type(node.op))
+        left = _constant(node.left, self.tree)
+        right = _constant(node.right, self.tree)
+        if op is None or left is None or right is None:
+            return node
+        if isinstance(node.op, (ast.FloorDiv, ast.Mod)):
+            # VHDL rounds and takes the sign differently
+            if left < 0 or right <= 0:
+                return node
+        elif isinstance(node.op, (ast.LShift, ast.RShift)):
+            if not 0 <= right < 32:
+                return node
+        n = op(left, right)
+        if abs(n) >= 2 ** 31:
+            return node
+        num = ast.copy_location(ast.Num(n=n), node)
+        # as in the analyzer
+        num.value = n
+        num.obj = bool(n) if n in (0, 1) else n
+        return num
+
+
+def _intRange(node, tree):
+    """ Return the range of the values of an expression, or None """
+    n = _constant(node, tree)
+    if n is not None:
+        return n, n
+    obj = getattr(node, 'obj', None)
+    if isinstance(node, ast.Subscript):
+        obj = getattr(node.value, 'obj', None)
+        if isinstance(obj, _Rom):
+            return min(obj.rom), max(obj.rom)
+        return None
+    if isinstance(node, ast.Name):
+        if isinstance(obj, _Signal):
+            obj = obj._val
+        if isinstance(obj, intbv) and obj._min is not None and \
+                obj._max is not None:
+            return obj._min, obj._max - 1
+        return None
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and \
+            node.func.id == 'int' and len(node.args) == 1:
+        return _intRange(node.args[0], tree)
+    if isinstance(node, ast.BinOp):
+        return _opRange(node.op, node.right, tree)
+    if isinstance(node, ast.IfExp):
+        body = _intRange(node.body, tree)
+        orelse = _intRange(node.orelse, tree)
+        if body is None or orelse is None:
+            return None
+        return min(body[0], orelse[0]), max(body[1], orelse[1])
+    return None
+
+
+def _opRange(op, right, tree):
+    """ Return the range of an operation that bounds its result, or None """
+    n = _constant(right, tree)
+    if n is None:
+        return None
+    if isinstance(op, ast.Mod) and n > 0:
+        return 0, n - 1
+    if isinstance(op, ast.BitAnd) and n >= 0:
+        return 0, n
+    return None
+
+
+def _intRanges(tree):
+    """ Return the ranges of the integer variables that only get values
+    from a known range
+    """
+    ranges = {}
+    unbounded = set(tree.argnames)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign):
+            targets, r = node.targets, _intRange(node.value, tree)
+        elif isinstance(node, ast.AugAssign):
+            targets, r = [node.target], _opRange(node.op, node.value, tree)
+        elif isinstance(node, ast.For):
+            targets, r = [node.target], None
+        else:
+            continue
+        for t in targets:
+            if not isinstance(t, ast.Name):
+                continue
+            if r is None:
+                unbounded.add(t.id)
+            elif t.id in ranges:
+                lo, hi = ranges[t.id]
+                ranges[t.id] = min(lo, r[0]), max(hi, r[1])
+            else:
+                ranges[t.id] = r
+    return dict((n, r) for n, r in ranges.items()
+                if n not in unbounded and n in tree.vardict and
+                isinstance(tree.vardict[n], integer_types) and
+                not isinstance(tree.vardict[n], (bool, _loopInt)))
@@ -29,6 +29,7 @@ import math
 import os
 
 import inspect
+import time
 from datetime import datetime
 import ast
 import string
@@ -48,10 +49,21 @@ from myhdl._instance import _Instantiator
 from myhdl.conversion._misc import (_error, _kind, _context,
                                     _ConversionMixin, _Label, _genUniqueSuffix, _isConstant)
 from myhdl.conversion._analyze import (_analyzeSigs, _analyzeGens, _analyzeTopFunc,
-                                       _Ram, _Rom)
+                                       _Ram, _Rom, _sigName)
 from myhdl._Signal import _Signal
 from myhdl._ShadowSignal import _TristateSignal, _TristateDriver
 from myhdl._structured import Array, StructType
+from myhdl.conversion._report import _Report, _NoReport
+from myhdl.conversion._hierarchy import (_convertBlocks, _instantiateBlocks,
+                                         _VerilogBlockInstance)
+from myhdl.conversion._convcache import (_emitKey, _emit, _emitParallel,
+                                         _writeIfChanged, _Manifest,
+                                         loadConversionCache,
+                                         saveConversionCache,
+                                         clearConversionCache)
+from myhdl.conversion._initfiles import (_InitFiles, _isLarge, _romName,
+                                         _largeRoms, _memValues)
+from myhdl._memfile import _romWidth
 
 
 
@@ -100,7 +112,16 @@ class _ToVerilogConvertor(object):
                  "no_testbench",
                  "portmap",
                  "trace",
-                 "no_initial_values"
+                 "no_initial_values",
+                 "conversion_cache",
+                 "manifest",
+                 "workers",
+                 "hierarchical",
+                 "report",
+                 "initfile_threshold",
+                 "_entities",
+                 "_portdirs",
+                 "_manifest"
                  )
 
     def __init__(self):
@@ -116,6 +137,25 @@ class _ToVerilogConvertor(object):
         self.no_testbench = False
         self.trace = False
         self.no_initial_values = True
+        self.conversion_cache = None
+        self.manifest = None
+        self.workers = None
+        self.hierarchical = False
+        self.report = None
+        self.initfile_threshold = None
+        self._entities = None
+        self._portdirs = None
+        self._manifest = None
+
+    def copy(self, **attrs):
+        """ Return a convertor with the same attributes, updated by attrs """
+        convertor = type(self)()
+        for attr in self.__slots__:
+            if hasattr(self, attr):
+                setattr(convertor, attr, getattr(self, attr))
+        for attr, value in attrs.items():
+            setattr(convertor, attr, value)
+        return convertor
 
     def __call__(self, func, *args, **kwargs):
         global _converting
@@ -137,11 +177,28 @@ class _ToVerilogConvertor(object):
             name = func.__name__
         else:
             name = str(self.name)
+        report = _Report(name, 'Verilog') if self.report else _NoReport()
+        manifest = _Manifest(name, 'Verilog')
+
+        report.phase('hierarchy extraction')
         try:
             h = _HierExtr(name, func, *args, **kwargs)
         finally:
             _converting = 0
 
+        if self.hierarchical:
+            report.phase('subblocks')
+            blocks = _convertBlocks(self, h, name, 'verilog', manifest)
+            if blocks:
+                report.phase('hierarchy extraction 2')
+                # the subblock conversions reset the design, elaborate again
+                _converting = 1
+                try:
+                    h = _HierExtr(name, func, *args, **kwargs)
+                finally:
+                    _converting = 0
+                _instantiateBlocks(h, blocks, _VerilogBlockInstance, self)
+
         if self.directory is None:
             directory = ''
         else:
@@ -149,7 +206,12 @@ class _ToVerilogConvertor(object):
 
         vfilename = name + (".sv" if self.standard >= 'SV2005' else ".v")
         vpath = os.path.join(directory, vfilename)
-        vfile = open(vpath, 'w')
+        vfile = StringIO()
+        if self.conversion_cache:
+            cpath = os.path.join(directory, self.conversion_cache)
+            loadConversionCache(cpath)
+        else:
+            clearConversionCache()
 
         ### initialize properly ###
         _genUniqueSuffix.reset()
@@ -157,9 +219,13 @@ class _ToVerilogConvertor(object):
         arglist = _flatten(h.top)
         # print h.top
         _checkArgs(arglist)
+        report.phase('analyzeGens')
         genlist = _analyzeGens(arglist, h.absnames)
+        report.phase('analyzeSigs')
         siglist, memlist = _analyzeSigs(h.hierarchy)
-        _annotateTypes(genlist)
+        # the types are annotated in _convertGens, for the generators
+        # that are not in the conversion cache
+        report.phase('analyzeTopFunc')
         top_inst = h.hierarchy[0]
         intf = _analyzeTopFunc(top_inst, func, *args, **kwargs)
         intf.name = name
@@ -167,22 +233,41 @@ class _ToVerilogConvertor(object):
 
         self._convert_filter(h, intf, siglist, memlist, genlist)
 
+        report.phase('module header')
         _writeFileHeader(vfile, vpath, self.timescale)
         _writeModuleHeader(vfile, intf, doc)
-        _writeConstants(vfile, memlist)
-        _writeSigDecls(vfile, intf, siglist, memlist)
-        _convertGens(genlist, vfile)
+        initfiles = _InitFiles(name, directory)
+        _writeRomDecls(vfile, genlist, initfiles)
+        _writeConstants(vfile, memlist, initfiles)
+        report.phase('signal declarations')
+        _writeSigDecls(vfile, intf, siglist, memlist, initfiles)
+        report.phase('convertGens')
+        _convertGens(genlist, vfile, manifest, self.workers, report)
         _writeModuleFooter(vfile)
 
+        report.phase('output')
+        manifest.addFile(vpath, _writeIfChanged(vpath, vfile.getvalue()))
         vfile.close()
+        initfiles.write(manifest)
 
         # don't write testbench if module has no ports
-        if len(intf.argnames) > 0 and not toVerilog.no_testbench:
+        if len(intf.argnames) > 0 and not self.no_testbench:
             tbpath = os.path.join(directory, "tb_" + vfilename)
-            tbfile = open(tbpath, 'w')
+            tbfile = StringIO()
             _writeTestBench(tbfile, intf, self.trace)
+            manifest.addFile(tbpath, _writeIfChanged(tbpath, tbfile.getvalue()))
             tbfile.close()
 
+        if self.conversion_cache:
+            saveConversionCache(cpath)
+        if self.manifest:
+            manifest.write(os.path.join(directory, self.manifest))
+        report.end()
+        if self.report:
+            print(report)
+            if self.report is not True:
+                report.write(os.path.join(directory, self.report))
+
         # build portmap for cosimulation
         portmap = {}
         for n, s in intf.argdict.items():
@@ -190,6 +275,13 @@ class _ToVerilogConvertor(object):
             else: portmap[n] = s
         self.portmap = portmap
 
+        # the port directions, for the instantiation in a hierarchical parent
+        self._portdirs = [(n, intf.argdict[n]._driven, intf.argdict[n]._read)
+                          for n in intf.argnames
+                          if isinstance(intf.argdict[n], _Signal)]
+
+        self._manifest = manifest
+
         ### clean-up properly ###
         self._cleanup(siglist)
 
@@ -367,9 +459,36 @@ def sortalign(cl, sort=False):
     # a dummy function for now
     return cl
 
-def _writeConstants(f, memlist):
+def _memFile(m, k, initfiles):
+    """ Return the declaration of a memory that is loaded from a file,
+    or None
+    """
+    found = _memValues(m, toVerilog.initfile_threshold)
+    if found is None:
+        return None
+    values, s = found
+    filename = initfiles.add(m.name, values, s._nrbits)
+    return '{} {}{}{} [0:{}-1];\ninitial $readmemh("{}", {});\n'.format(
+        k, _getSignString(s), _getRangeString(s), m.name, m.depth,
+        filename, m.name)
+
+
+def _writeRomDecls(f, genlist, initfiles):
+    """ Declare the large ROMs as memories, loaded from files """
+    k = 'logic' if toVerilog.standard >= 'SV2005' else 'reg'
+    for name, rom in _largeRoms(genlist, toVerilog.initfile_threshold):
+        nrbits, signed = _romWidth(rom)
+        filename = initfiles.add(name, rom, nrbits)
+        print('{} {}[{}:0] {} [0:{}-1];'.format(k, 'signed ' if signed else '',
+                                                nrbits - 1, name, len(rom)),
+              file=f)
+        print('initial $readmemh("{}", {});'.format(filename, name), file=f)
+
+
+def _writeConstants(f, memlist, initfiles):
     f.write("\n")
     cl = []
+    ml = []
     for m in memlist:
         if not m._used:
             continue
@@ -379,7 +498,11 @@ def _writeConstants(f, memlist):
 
         if m._driven or not m._read:
             continue
-        if toVerilog.standard >= 'SV2005' :
+        decl = _memFile(m, 'logic' if toVerilog.standard >= 'SV2005' else 'reg',
+                        initfiles)
+        if decl is not None:
+            ml.append(decl)
+        elif toVerilog.standard >= 'SV2005' :
             # make packed arrays, they look much nicer ...
             r = _getRangeString(m.elObj)
             p = _getSignString(m.elObj)
@@ -396,6 +519,8 @@ def _writeConstants(f, memlist):
 
     for l in sortalign(cl, sort=True):
         f.write(l)
+    for l in ml:
+        f.write(l)
     f.write("\n")
 
 def expandconstant(c):
@@ -416,6 +541,8 @@ def expandconstant(c):
         for i in range(size):
 #             s +=  ' "{}"'.format( bin( c[i] , c[i]._nrbits ))
 #             s += "{}'h{}".format(c[i]._nrbits, hex( c[i]) )
+            if isinstance(c[i], _Signal):
+                _sigName(c[i])
             s += " {}".format(c[i])  # using 'plain' integers
             if i != size - 1:
                 s += ','
@@ -424,19 +551,15 @@ def expandconstant(c):
 def expandarray(c):
     if isinstance(c[0], (list, Array)):
         size = c.shape[0] if isinstance(c, Array) else len(c)
-        s = ''
-        for i in range(size):
-            s = ''.join((s, '\'{ ', expandarray(c[i]), ' }'))
-            if i != size - 1:
-                s = ''.join((s, ',\n'))
-        return s
+        return ',\n'.join(''.join(('\'{ ', expandarray(c[i]), ' }'))
+                           for i in range(size))
     else:
         # lowest (= last) level of m1D
         if isinstance(c, Array):
             size = c.shape[0]
         else:
             size = len(c)
-        s = ''
+        items = []
         cnt = 0
         for i in range(size):
             if cnt < 3 :
@@ -448,12 +571,12 @@ def expandarray(c):
                                     bin(c[i]._val, c[i]._nrbits),
                                      ', ' if i != size - 1 else '',
                                      '\n' if cnt == 0 else '')
-            s = ''.join((s, item))
+            items.append(item)
 
-        return s
+        return ''.join(items)
 
 
-def _writeSigDecls(f, intf, siglist, memlist):
+def _writeSigDecls(f, intf, siglist, memlist, initfiles):
     constwires = []
     for s in siglist:
         if not s._used:
@@ -510,7 +633,13 @@ def _writeSigDecls(f, intf, siglist, memlist):
             else:
                 k = m._driven
 
-        if toVerilog.standard >= 'SV2005' and toVerilog.packedarrays:
+        decl = None
+        if m._driven == 'reg' and not toVerilog.no_initial_values:
+            decl = _memFile(m, k, initfiles)
+        if decl is not None:
+            f.write(decl)
+
+        elif toVerilog.standard >= 'SV2005' and toVerilog.packedarrays:
             # make packed arrays, they look much nicer ...
 #             print(m._sizes)
             line = "{} {}".format(k, p)
@@ -617,27 +746,60 @@ def _getSignString(s):
         return ''
 
 
-def _convertGens(genlist, vfile):
+def _getVisitor(tree):
+    if tree.kind == _kind.ALWAYS:
+        return _ConvertAlwaysVisitor
+    elif tree.kind == _kind.INITIAL:
+        return _ConvertInitialVisitor
+    elif tree.kind == _kind.SIMPLE_ALWAYS_COMB:
+        return _ConvertSimpleAlwaysCombVisitor
+    elif tree.kind == _kind.ALWAYS_DECO:
+        return _ConvertAlwaysDecoVisitor
+    elif tree.kind == _kind.ALWAYS_SEQ:
+        return _ConvertAlwaysSeqVisitor
+    else:  # ALWAYS_COMB
+        return _ConvertAlwaysCombVisitor
+
+
+def _emitTree(tree, Visitor, report=None):
+    """ Annotate and convert a generator, return its text and functions """
+    t = time.time()
+    _annotateTypes([tree])
+    if report is not None:
+        report.annotateTime += time.time() - t
+    tbuf, fbuf = StringIO(), StringIO()
+    v = Visitor(tree, tbuf, fbuf)
+    v.visit(tree)
+    return tbuf.getvalue(), fbuf.getvalue()
+
+
+def _convertGens(genlist, vfile, manifest, workers=None, report=_NoReport()):
     blockBuf = StringIO()
     funcBuf = StringIO()
-    for tree in genlist:
+    context = (toVerilog.standard, toVerilog.prefer_blocking_assignments,
+               toVerilog.radix, toVerilog.packedarrays,
+               toVerilog.no_initial_values, toVerilog.initfile_threshold)
+    funcdefs = []
+    gens = [(i, tree, _getVisitor(tree)) for i, tree in enumerate(genlist)
+            if not isinstance(tree, _UserVerilogCode)]
+    keys = _emitParallel('Verilog', gens, context, _emitTree, workers)
+    for i, tree in enumerate(genlist):
         if isinstance(tree, _UserVerilogCode):
             blockBuf.write(str(tree))
             continue
-        if tree.kind == _kind.ALWAYS:
-            Visitor = _ConvertAlwaysVisitor
-        elif tree.kind == _kind.INITIAL:
-            Visitor = _ConvertInitialVisitor
-        elif tree.kind == _kind.SIMPLE_ALWAYS_COMB:
-            Visitor = _ConvertSimpleAlwaysCombVisitor
-        elif tree.kind == _kind.ALWAYS_DECO:
-            Visitor = _ConvertAlwaysDecoVisitor
-        elif tree.kind == _kind.ALWAYS_SEQ:
-            Visitor = _ConvertAlwaysSeqVisitor
-        else:  # ALWAYS_COMB
-            Visitor = _ConvertAlwaysCombVisitor
-        v = Visitor(tree, blockBuf, funcBuf)
-        v.visit(tree)
+        Visitor = _getVisitor(tree)
+        t, annotate = time.time(), report.annotateTime
+        key = keys.get(i)
+        if key is None:
+            key, _ = _emitKey('Verilog', Visitor, tree, context, funcdefs)
+        text, functext, reused = _emit(key,
+                                       lambda: _emitTree(tree, Visitor, report),
+                                       funcdefs)
+        blockBuf.write(text)
+        funcBuf.write(functext)
+        manifest.addProcess(tree.name, key, reused)
+        report.addProcess(tree.name, time.time() - t,
+                          report.annotateTime - annotate, reused)
     vfile.write(funcBuf.getvalue()); funcBuf.close()
     vfile.write(blockBuf.getvalue()); blockBuf.close()
 
@@ -786,6 +948,9 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
         if toVerilog.standard == '1995':
             sep = ' or '
         self.write("@(")
+        for e in senslist:
+            if isinstance(e, _Signal):
+                _sigName(e)
         for e in senslist[:-1]:
             self.write(e._toVerilog())
             self.write(sep)
@@ -898,6 +1063,18 @@ class _ConvertVisitor(ast.NodeVisitor, _ConversionMixin):
                 isinstance(node.value.slice, ast.Index) and\
                 isinstance(node.value.value.obj, _Rom):
             rom = node.value.value.obj.rom
+            if _isLarge(len(rom), toVerilog.initfile_threshold):
+                # a memory, loaded from a file
+                self.visit(node.targets[0])
+                if self.isSigAss:
+                    self.write(' <= ')
+                    self.isSigAss = False
+                else:
+                    self.write(' = ')
+                self.write(_romName(self.tree, node.value.value.id) + '[')
+                self.visit(node.value.slice)
+                self.write('];')
+                return
 #            self.write("// synthesis parallel_case full_case")
 #            self.writeline()
             self.write("case (")
@@ -1603,7 +1780,7 @@ class _ConvertAlwaysSeqVisitor(_ConvertVisitor):
             self.indent()
             for s in sigregs:
                 self.writeline()
-                self.write("%s <= %s;" % (s, _convertInitVal(s, s._init)))
+                self.write("%s <= %s;" % (_sigName(s), _convertInitVal(s, s._init)))
             for v in varregs:
                 n, reg, init = v
                 self.writeline()
@@ -2,13 +2,17 @@ from __future__ import absolute_import
 from __future__ import print_function
 import sys
 import os
-import tempfile
+import shutil
 import subprocess
 import difflib
+import threading
+import time
 
 from collections import namedtuple
 
 import myhdl
+from myhdl import StopSimulation
+from myhdl._compat import queue, string_types
 from myhdl._Simulation import Simulation
 from myhdl.conversion._toVHDL import toVHDL
 from myhdl.conversion._toVerilog import toVerilog
@@ -91,64 +95,220 @@ registerSimulator(
     )
 
 
+result = namedtuple('result', 'name passed time')
+
+
+def _prepare(hdlsim, cwd=None):
+    """ Create the work libraries that a simulator expects """
+    work = lambda n: os.path.join(cwd or '', n)
+    if hdlsim.hdl == "VHDL":
+        if not os.path.exists(work("work")):
+            os.mkdir(work("work"))
+    if hdlsim.name in ('vlog', 'vcom'):
+        if not os.path.exists(work("work_vsim")):
+            try:
+                subprocess.call("vlib work_vlog", shell=True, cwd=cwd)
+                subprocess.call("vlib work_vcom", shell=True, cwd=cwd)
+                subprocess.call("vmap work_vlog work_vlog", shell=True, cwd=cwd)
+                subprocess.call("vmap work_vcom work_vcom", shell=True, cwd=cwd)
+            except:
+                pass
+
+
+class _HDLRun(object):
+
+    """ The steps of an HDL simulator, in a thread.
+
+    The output lines of the simulator are put in a queue as they come,
+    followed by None at the end. The steps run in cwd, if given.
+    """
+
+    def __init__(self, elaborate, simulate, analyze=None, cwd=None):
+        self.steps = [("Analysis", analyze), ("Elaboration", elaborate)]
+        self.simulate = simulate
+        self.cwd = cwd
+        self.lines = queue.Queue()
+        self.ret = 0
+        self.failed = None
+        self.time = 0.0
+        self.proc = None
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def _run(self):
+        start = time.time()
+        try:
+            for step, cmd in self.steps:
+                if cmd is None:
+                    continue
+                self.ret = subprocess.call(cmd, shell=True, cwd=self.cwd)
+                if self.ret != 0:
+                    self.failed = step
+                    return
+            if self.simulate is None:
+                return
+            self.proc = subprocess.Popen(self.simulate, stdout=subprocess.PIPE,
+                                         shell=True, universal_newlines=True,
+                                         cwd=self.cwd)
+            for line in iter(self.proc.stdout.readline, ''):
+                self.lines.put(line)
+            self.proc.stdout.close()
+            self.ret = self.proc.wait()
+        finally:
+            self.time = time.time() - start
+            self.lines.put(None)
+
+    def output(self, skiplines, skipchars, ignore):
+        """ Generate the output lines that are to be compared """
+        n = 0
+        while True:
+            line = self.lines.get()
+            if line is None:
+                return
+            n += 1
+            if skiplines and n <= skiplines:
+                continue
+            if ignore and line.startswith(tuple(ignore)):
+                continue
+            yield line[skipchars:]
+
+    def stop(self):
+        """ Stop the simulator, its output is no longer needed """
+        proc = self.proc
+        if proc is not None and proc.poll() is None:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+        self.thread.join()
+
+
+class _Comparison(object):
+
+    """ Stand-in for stdout during the MyHDL simulation.
+
+    Each line that is printed is compared with the next line of the HDL
+    simulator. The simulation is stopped at the first mismatch. Without
+    HDL lines, the lines are only recorded.
+    """
+
+    def __init__(self, hdllines):
+        self.hdllines = hdllines
+        self.flines = []
+        self.glines = []
+        self.mismatch = False
+        self._partial = ''
+
+    def write(self, s):
+        if self.mismatch:
+            return
+        lines = (self._partial + s).split('\n')
+        self._partial = lines.pop()
+        for line in lines:
+            self._compare(line + '\n')
+
+    def flush(self):
+        pass
+
+    def finish(self):
+        if self._partial and not self.mismatch:
+            try:
+                self._compare(self._partial)
+            except StopSimulation:
+                pass
+
+    def _compare(self, line):
+        self.flines.append(line)
+        if self.hdllines is None:
+            return
+        g = next(self.hdllines, None)
+        if g is not None:
+            self.glines.append(g)
+        if g is None or g.lower() != line.lower():
+            self.mismatch = True
+            raise StopSimulation("MyHDL and HDL simulation outputs differ")
+
+
 class  _VerificationClass(object):
 
-    __slots__ = ("simulator", "_analyzeOnly")
+    __slots__ = ("simulator", "context", "directory", "workdir", "results",
+                 "_analyzeOnly")
 
     def __init__(self, analyzeOnly=False):
         self.simulator = "GHDL"
+        self.context = 3
+        self.directory = None
+        self.workdir = "verify"
+        self.results = None
         self._analyzeOnly = analyzeOnly
 
-
-    def __call__(self, func, *args, **kwargs):
-
-        if not self.simulator:
+    def _simulators(self):
+        simulators = self.simulator
+        if isinstance(simulators, string_types):
+            simulators = [simulators]
+        if not simulators:
             raise ValueError("No simulator specified")
-        if  self.simulator not in _simulators:
-            raise ValueError("Simulator %s is not registered" % self.simulator)
-        hdlsim = _simulators[self.simulator]
-        hdl = hdlsim.hdl
+        for s in simulators:
+            if s not in _simulators:
+                raise ValueError("Simulator %s is not registered" % s)
+        return [_simulators[s] for s in simulators]
+
+    def _name(self, func, hdl):
         if hdl == 'Verilog' and toVerilog.name is not None:
-            name = toVerilog.name
+            return toVerilog.name
         elif hdl == 'VHDL' and toVHDL.name is not None:
-            name = toVHDL.name
+            return toVHDL.name
         else:
-            name = func.__name__
+            return func.__name__
 
+    def _commands(self, hdlsim, name):
         vals = {}
         vals['topname'] = name
         vals['unitname'] = name.lower()
         vals['version'] = _version
-
-        analyze = hdlsim.analyze % vals
         elaborate = hdlsim.elaborate
         if elaborate is not None:
             elaborate = elaborate % vals
-        simulate = hdlsim.simulate % vals
+        return hdlsim.analyze % vals, elaborate, hdlsim.simulate % vals
+
+    def _convertor(self, hdl):
+        """ Return the convertor for an HDL, that writes to the directory """
+        convertor = toVHDL if hdl == "VHDL" else toVerilog
+        if self.directory is None:
+            return convertor
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        return convertor.copy(directory=self.directory)
+
+    def _diff(self, hdlsim, flines, glines):
+        """ Return the differences of the MyHDL and the HDL output """
+        flinesNorm = [line.lower() for line in flines]
+        glinesNorm = [line.lower() for line in glines]
+        g = difflib.unified_diff(flinesNorm, glinesNorm, fromfile=hdlsim.name,
+                                 tofile=hdlsim.hdl, n=self.context)
+        return "".join(g)
+
+    def __call__(self, func, *args, **kwargs):
+
+        hdlsims = self._simulators()
+        if not isinstance(self.simulator, string_types):
+            return self._matrix(hdlsims, func, *args, **kwargs)
+        hdlsim = hdlsims[0]
+        hdl = hdlsim.hdl
+        name = self._name(func, hdl)
+        analyze, elaborate, simulate = self._commands(hdlsim, name)
         skiplines = hdlsim.skiplines
         skipchars = hdlsim.skipchars
         ignore = hdlsim.ignore
 
-        if hdl == "VHDL":
-            inst = toVHDL(func, *args, **kwargs)
-        else:
-            inst = toVerilog(func, *args, **kwargs)
-
-        if hdl == "VHDL":
-            if not os.path.exists("work"):
-                os.mkdir("work")
-        if hdlsim.name in ('vlog', 'vcom'):
-            if not os.path.exists("work_vsim"):
-                try:
-                    subprocess.call("vlib work_vlog", shell=True)
-                    subprocess.call("vlib work_vcom", shell=True)
-                    subprocess.call("vmap work_vlog work_vlog", shell=True)
-                    subprocess.call("vmap work_vcom work_vcom", shell=True)
-                except:
-                    pass
+        inst = self._convertor(hdl)(func, *args, **kwargs)
+
+        cwd = self.directory
+        _prepare(hdlsim, cwd)
 
         #print(analyze)
-        ret = subprocess.call(analyze, shell=True)
+        ret = subprocess.call(analyze, shell=True, cwd=cwd)
         if ret != 0:
             print("Analysis failed", file=sys.stderr)
             return ret
@@ -157,62 +317,41 @@ class  _VerificationClass(object):
             print("Analysis succeeded", file=sys.stderr)
             return 0
 
-        f = tempfile.TemporaryFile(mode='w+t')
-        sys.stdout = f
-        sim = Simulation(inst)
-        sim.run()
-        sys.stdout = sys.__stdout__
-        f.flush()
-        f.seek(0)
-
-        flines = f.readlines()
-        f.close()
+        # the HDL simulator runs while the MyHDL simulation of the converted
+        # instance runs, and their outputs are compared as they come
+        run = _HDLRun(elaborate, simulate, cwd=cwd)
+        cmp = _Comparison(run.output(skiplines, skipchars, ignore))
+        sys.stdout = cmp
+        try:
+            sim = Simulation(inst)
+            sim.run()
+            cmp.finish()
+        finally:
+            sys.stdout = sys.__stdout__
+            run.stop()
+
+        if run.failed:
+            print("%s failed" % run.failed, file=sys.stderr)
+            return run.ret
+
+        flines, glines = cmp.flines, cmp.glines
         if not flines:
             print("No MyHDL simulation output - nothing to verify", file=sys.stderr)
             return 1
 
+        s = self._diff(hdlsim, flines, glines)
 
-        if elaborate is not None:
-            #print(elaborate)
-            ret = subprocess.call(elaborate, shell=True)
-            if ret != 0:
-                print("Elaboration failed", file=sys.stderr)
-                return ret
-            
-        g = tempfile.TemporaryFile(mode='w+t')
-        #print(simulate)
-        ret = subprocess.call(simulate, stdout=g, shell=True)
-    #    if ret != 0:
-    #        print "Simulation run failed"
-    #        return
-        g.flush()
-        g.seek(0)
-
-        glines = g.readlines()[skiplines:]
-        if ignore:
-            for p in ignore:
-                glines = [line for line in glines if not line.startswith(p)]
-        # limit diff window to the size of the MyHDL output
-        # this is a hack to remove an eventual simulator postamble
-        if len(glines) > len(flines):
-            glines = glines[:len(flines)]
-        glines = [line[skipchars:] for line in glines]
-        flinesNorm = [line.lower() for line in flines]
-        glinesNorm = [line.lower() for line in glines]
-        g = difflib.unified_diff(flinesNorm, glinesNorm, fromfile=hdlsim.name, tofile=hdl)
-
-        MyHDLLog = "MyHDL.log"
-        HDLLog = hdlsim.name + ".log"
+        MyHDLLog = os.path.join(cwd or '', "MyHDL.log")
+        HDLLog = os.path.join(cwd or '', hdlsim.name + ".log")
         try:
             os.remove(MyHDLLog)
             os.remove(HDLLog)
         except:
             pass
 
-        s = "".join(g)
         f = open(MyHDLLog, 'w')
         g = open(HDLLog, 'w')
-        d = open('diff.log', 'w')
+        d = open(os.path.join(cwd or '', 'diff.log'), 'w')
         f.writelines(flines)
         g.writelines(glines)
         d.write(s)
@@ -229,6 +368,83 @@ class  _VerificationClass(object):
 
         return 0
 
+    def _matrix(self, hdlsims, func, *args, **kwargs):
+        """ Verify with several simulators at once.
+
+        The design is converted once for each HDL, and each simulator
+        runs in a work directory of its own, in parallel with the others
+        and with the MyHDL simulation. The MyHDL output is the reference
+        for all of them.
+        """
+        directory = self.directory or ''
+        runs = []
+        for hdl in ("VHDL", "Verilog"):
+            sims = [s for s in hdlsims if s.hdl == hdl]
+            if not sims:
+                continue
+            name = self._name(func, hdl)
+            convertor = self._convertor(hdl)
+            inst = convertor(func, *args, **kwargs)
+            files = [f['path'] for f in convertor._manifest.files]
+            package = os.path.join(convertor.directory or '',
+                                   "pck_myhdl_%s.vhd" % _version)
+            if hdl == "VHDL" and os.path.exists(package):
+                files.append(package)
+            for hdlsim in sims:
+                cwd = os.path.join(directory, self.workdir, hdlsim.name)
+                if not os.path.exists(cwd):
+                    os.makedirs(cwd)
+                for path in files:
+                    shutil.copy(path, cwd)
+                _prepare(hdlsim, cwd)
+                analyze, elaborate, simulate = self._commands(hdlsim, name)
+                if self._analyzeOnly:
+                    elaborate = simulate = None
+                runs.append((hdlsim, cwd,
+                             _HDLRun(elaborate, simulate, analyze, cwd)))
+
+        flines = []
+        if not self._analyzeOnly:
+            cmp = _Comparison(None)
+            sys.stdout = cmp
+            try:
+                sim = Simulation(inst)
+                sim.run()
+                cmp.finish()
+            finally:
+                sys.stdout = sys.__stdout__
+            flines = cmp.flines
+            with open(os.path.join(directory, "MyHDL.log"), 'w') as f:
+                f.writelines(flines)
+
+        self.results = []
+        for hdlsim, cwd, run in runs:
+            glines = list(run.output(hdlsim.skiplines, hdlsim.skipchars,
+                                     hdlsim.ignore))[:len(flines)]
+            run.stop()
+            if run.failed:
+                status = "%s failed" % run.failed
+            elif self._analyzeOnly:
+                status = "Analysis succeeded"
+            elif not flines:
+                status = "No MyHDL simulation output - nothing to verify"
+            else:
+                s = self._diff(hdlsim, flines, glines)
+                with open(os.path.join(cwd, hdlsim.name + ".log"), 'w') as f:
+                    f.writelines(glines)
+                with open(os.path.join(cwd, 'diff.log'), 'w') as f:
+                    f.write(s)
+                if s:
+                    status = "Conversion verification failed"
+                else:
+                    status = "Conversion verification succeeded"
+            passed = status.endswith("succeeded")
+            self.results.append(result(hdlsim.name, passed, run.time))
+            print("%s: %s (%.2fs)" % (hdlsim.name, status, run.time),
+                  file=sys.stderr)
+
+        return 0 if all(r.passed for r in self.results) else 1
+
 
 verify = _VerificationClass(analyzeOnly=False)
 analyze = _VerificationClass(analyzeOnly=True)
@@ -0,0 +1,57 @@
+""" Time the conversion of a design with a few large Arrays.
+
+Usage: python bench_bigarray.py [size] [nr_of_arrays]
+
+The logic is small, so the time goes to the handling of the Array
+elements in the analysis and the emission.
+"""
+from __future__ import absolute_import, print_function
+
+import sys
+import tempfile
+import time
+
+from myhdl import *
+
+
+@block
+def ram(clk, we, addr, d, q, size):
+    mem = Array((size,), Signal(intbv(0)[len(d):]))
+
+    @always(clk.posedge)
+    def write():
+        if we:
+            mem[addr].next = d
+
+    @always_comb
+    def read():
+        q.next = mem[addr]
+
+    return write, read
+
+
+@block
+def top(clk, we, addr, d, q, size, n):
+    qs = [Signal(intbv(0)[len(d):]) for i in range(n)]
+    rams = [ram(clk, we, addr, d, qs[i], size) for i in range(n)]
+
+    @always_comb
+    def mux():
+        q.next = 0
+        for i in range(n):
+            if addr[0] == i % 2:
+                q.next = qs[i]
+
+    return rams, mux
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    clk, we = [Signal(bool(0)) for i in range(2)]
+    addr = Signal(intbv(0, min=0, max=size))
+    d, q = [Signal(intbv(0)[8:]) for i in range(2)]
+    toVHDL.directory = tempfile.mkdtemp()
+    t = time.time()
+    toVHDL(top, clk, we, addr, d, q, size, n)
+    print("%d Arrays of %d elements: %.2fs" % (n, size, time.time() - t))
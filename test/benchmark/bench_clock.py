@@ -0,0 +1,74 @@
+""" Time the simulation of clock domains, with generator clocks and with
+Clock objects.
+
+Usage: python bench_clock.py [duration]
+
+Each domain is a clock and a counter on its rising edge. The domains
+have different periods and phases; the Clock objects of a simulation
+share a schedule, so a timestep costs one future event, however many
+clocks have an edge in it.
+"""
+from __future__ import absolute_import, print_function
+
+import sys
+import time
+
+from myhdl import *
+
+
+def clkgen(clk, period, phase):
+
+    @instance
+    def gen():
+        yield delay(phase)
+        while True:
+            clk.next = 1
+            yield delay(period // 2)
+            clk.next = 0
+            yield delay(period - period // 2)
+
+    return gen
+
+
+def counter(clk, q):
+
+    @always(clk.posedge)
+    def count():
+        q.next = q + 1
+
+    return count
+
+
+def domains(n, native):
+    insts = []
+    counts = []
+    for i in range(n):
+        period = (10, 12, 16, 20)[i % 4]
+        phase = i // 4
+        clk = Signal(bool(0))
+        q = Signal(modbv(0)[32:])
+        if native:
+            insts.append(Clock(clk, period, phase=phase))
+        else:
+            insts.append(clkgen(clk, period, phase))
+        insts.append(counter(clk, q))
+        counts.append(q)
+    return insts, counts
+
+
+def bench(n, native, duration):
+    insts, counts = domains(n, native)
+    sim = Simulation(insts)
+    t = time.time()
+    sim.run(duration, quiet=1)
+    return time.time() - t, [int(q) for q in counts]
+
+
+if __name__ == '__main__':
+    duration = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    for n in (1, 4, 16):
+        tgen, cgen = bench(n, False, duration)
+        tclk, cclk = bench(n, True, duration)
+        assert cgen == cclk
+        print("%2d clock domains: generators %.2fs, Clock %.2fs, %.1fx" %
+              (n, tgen, tclk, tgen / tclk if tclk else 0.0))
@@ -0,0 +1,84 @@
+""" Time a cold and a warm toVHDL conversion with the conversion cache.
+
+Usage: python bench_convcache.py [nr_of_lanes]
+
+The second conversion reuses the text emitted for each process, and
+leaves the unchanged output file alone.
+"""
+from __future__ import absolute_import, print_function
+
+import os
+import sys
+import tempfile
+import time
+
+from myhdl import *
+from myhdl.conversion._convcache import clearConversionCache
+
+t_state = enum('IDLE', 'LOAD', 'ADD', 'SUB', 'SHIFT', 'STORE', 'WAIT', 'DONE')
+
+
+def lane(clk, reset, a, b, q):
+    state = Signal(t_state.IDLE)
+    acc = Signal(intbv(0)[16:])
+
+    @always_seq(clk.posedge, reset=reset)
+    def fsm():
+        if state == t_state.IDLE:
+            if a[0]:
+                state.next = t_state.LOAD
+        elif state == t_state.LOAD:
+            acc.next = concat(a, b)
+            state.next = t_state.ADD
+        elif state == t_state.ADD:
+            acc.next = (acc + a) % 2**16
+            state.next = t_state.SUB
+        elif state == t_state.SUB:
+            if acc > b:
+                acc.next = acc - b
+            state.next = t_state.SHIFT
+        elif state == t_state.SHIFT:
+            acc.next = acc[15:] << 1
+            state.next = t_state.STORE
+        elif state == t_state.STORE:
+            q.next = acc[8:] ^ acc[16:8]
+            state.next = t_state.WAIT
+        elif state == t_state.WAIT:
+            for i in range(8):
+                if b[i] and not a[i]:
+                    state.next = t_state.DONE
+        else:
+            state.next = t_state.IDLE
+
+    return fsm
+
+
+def top(clk, reset, ins, outs):
+    lanes = []
+    for i in range(len(outs)):
+        lanes.append(lane(clk, reset, ins[2 * i], ins[2 * i + 1], outs[i]))
+    return lanes
+
+
+def convert(n, directory):
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, async=False)
+    ins = [Signal(intbv(0)[8:]) for i in range(2 * n)]
+    outs = [Signal(intbv(0)[8:]) for i in range(n)]
+    toVHDL.directory = directory
+    t = time.time()
+    toVHDL(top, clk, reset, ins, outs)
+    t = time.time() - t
+    toVHDL.directory = None
+    return t, os.path.getmtime(os.path.join(directory, 'top.vhd'))
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    d = tempfile.mkdtemp()
+    clearConversionCache()
+    tc, mc = convert(n, d)
+    time.sleep(1)
+    tw, mw = convert(n, d)
+    print("%d lanes: cold %.2fs  warm %.2fs  output rewritten: %s" %
+          (n, tc, tw, mc != mw))
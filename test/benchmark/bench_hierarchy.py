@@ -0,0 +1,68 @@
+""" Compare profile based and explicit (@block) hierarchy extraction.
+
+Usage: python bench_hierarchy.py [nr_of_lanes]
+"""
+from __future__ import absolute_import, print_function
+
+import sys
+import time
+
+from myhdl import *
+from myhdl._extractHierarchy import _HierExtr
+
+
+def width(n):
+    # an ordinary helper call, as found in most designs
+    return len(bin(n))
+
+
+def lane(clk, reset, a, b, q):
+
+    @always_seq(clk.posedge, reset=reset)
+    def reg():
+        q.next = a + b
+
+    @always_comb
+    def comb():
+        a.next = b
+
+    return reg, comb
+
+
+def top(clk, reset, n):
+    lanes = []
+    for i in range(n):
+        a, b = [Signal(intbv(0)[width(255):]) for j in range(2)]
+        q = Signal(intbv(0)[9:])
+        lanes.append(lane(clk, reset, a, b, q))
+    return lanes
+
+
+laneBlock = block(lane)
+
+
+@block
+def topBlock(clk, reset, n):
+    lanes = []
+    for i in range(n):
+        a, b = [Signal(intbv(0)[width(255):]) for j in range(2)]
+        q = Signal(intbv(0)[9:])
+        lanes.append(laneBlock(clk, reset, a, b, q))
+    return lanes
+
+
+def run(dut, n):
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, async=False)
+    t = time.time()
+    _HierExtr('top', dut, clk, reset, n)
+    return time.time() - t
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    # warm up the code cache, so that both runs measure extraction only
+    run(top, 1)
+    tp = run(top, n)
+    tb = run(topBlock, n)
+    print("%d lanes: sys.setprofile %.2fs  @block %.2fs" % (n, tp, tb))
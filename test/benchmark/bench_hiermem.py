@@ -0,0 +1,49 @@
+""" Time and peak RSS of hierarchy extraction for a design with large globals.
+
+Usage: python bench_hiermem.py [nr_of_lanes] [nr_of_globals]
+
+The module globals are padded to mimic a design module that imports
+large packages.
+"""
+from __future__ import absolute_import, print_function
+
+import resource
+import sys
+import time
+
+from myhdl import *
+from myhdl._extractHierarchy import _HierExtr
+
+
+def lane(clk, reset, a, b, q):
+
+    @always_seq(clk.posedge, reset=reset)
+    def reg():
+        q.next = a + b
+
+    return reg
+
+
+def top(clk, reset, n):
+    lanes = []
+    for i in range(n):
+        a, b = [Signal(intbv(0)[8:]) for j in range(2)]
+        q = Signal(intbv(0)[9:])
+        u = lane(clk, reset, a, b, q)
+        lanes.append(u)
+    return lanes
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    g = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    globals().update(('padding%d' % i, i) for i in range(g))
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, async=False)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    t = time.time()
+    h = _HierExtr('top', top, clk, reset, n)
+    t = time.time() - t
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print("%d lanes, %d globals: %.2fs, peak RSS +%d MB" %
+          (n, g, t, (peak - rss) // 1024))
@@ -0,0 +1,63 @@
+""" Compare flat and hierarchical output of toVHDL and toVerilog.
+
+Usage: python bench_hieroutput.py [nr_of_lanes]
+
+The design is a chain of identical lanes. In hierarchical mode the lane
+is converted once, and instantiated for each lane. Each conversion runs
+in its own process, so that the conversion cache doesn't interfere.
+"""
+from __future__ import absolute_import, print_function
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from myhdl import *
+
+from bench_convcache import lane
+
+
+def chain(clk, reset, a, q, n):
+    lanes = []
+    prev = a
+    for i in range(n):
+        nxt = Signal(intbv(0)[8:]) if i < n - 1 else q
+        lanes.append(lane(clk, reset, prev, prev, nxt))
+        prev = nxt
+    return lanes
+
+
+def convert(hdl, n, hierarchical, directory):
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, async=False)
+    a, q = [Signal(intbv(0)[8:]) for i in range(2)]
+    hdl.directory = directory
+    hdl.hierarchical = hierarchical
+    t = time.time()
+    hdl(chain, clk, reset, a, q, n)
+    return time.time() - t
+
+
+def run(hdl, n, hierarchical, ext):
+    directory = tempfile.mkdtemp()
+    out = subprocess.check_output([sys.executable, __file__, '--one', hdl,
+                                   str(n), str(int(hierarchical)), directory])
+    size = sum(os.path.getsize(os.path.join(directory, f))
+               for f in os.listdir(directory) if f.endswith(ext))
+    return float(out.split()[-1]), size
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--one']:
+        hdl, n, hierarchical, directory = sys.argv[2:]
+        hdl = toVHDL if hdl == 'vhdl' else toVerilog
+        print(convert(hdl, int(n), bool(int(hierarchical)), directory))
+        sys.exit(0)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    for hdl, ext in (('vhdl', '.vhd'), ('verilog', '.v')):
+        tf, sf = run(hdl, n, False, ext)
+        th, sh = run(hdl, n, True, ext)
+        print("%s %d lanes: flat %.2fs %d bytes  hierarchical %.2fs %d bytes" %
+              (ext, n, tf, sf, th, sh))
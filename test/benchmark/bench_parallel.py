@@ -0,0 +1,61 @@
+""" Compare serial and parallel emission in toVHDL and toVerilog.
+
+Usage: python bench_parallel.py [nr_of_lanes] [nr_of_workers]
+
+The default number of workers (0) is the number of cpus.
+
+Each conversion runs in its own process, as the generated labels are
+numbered per process, and the outputs are checked to be identical.
+"""
+from __future__ import absolute_import, print_function
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from myhdl import *
+
+from bench_convcache import top
+
+
+def convert(hdl, n, workers, directory):
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, async=False)
+    ins = [Signal(intbv(0)[8:]) for i in range(2 * n)]
+    outs = [Signal(intbv(0)[8:]) for i in range(n)]
+    hdl.directory = directory
+    hdl.workers = workers
+    t = time.time()
+    hdl(top, clk, reset, ins, outs)
+    return time.time() - t
+
+
+def run(hdl, n, workers):
+    directory = tempfile.mkdtemp()
+    out = subprocess.check_output([sys.executable, __file__, '--one', hdl,
+                                   str(n), str(workers), directory])
+    return float(out.split()[-1]), directory
+
+
+def output(directory, ext):
+    with open(os.path.join(directory, 'top' + ext)) as f:
+        return [l for l in f if 'File:' not in l and 'Date:' not in l]
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--one']:
+        hdl, n, workers, directory = sys.argv[2:]
+        hdl = toVHDL if hdl == 'vhdl' else toVerilog
+        t = convert(hdl, int(n), int(workers) or None, directory)
+        print(t)
+        sys.exit(0)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    w = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    for hdl, ext in (('vhdl', '.vhd'), ('verilog', '.v')):
+        ts, ds = run(hdl, n, 1)
+        tp, dp = run(hdl, n, w)
+        same = output(ds, ext) == output(dp, ext)
+        print("%s %d lanes: serial %.2fs  parallel %.2fs  identical: %s" %
+              (ext, n, ts, tp, same))
@@ -0,0 +1,424 @@
+""" A benchmark suite for the simulator, the data types, tracing and conversion.
+
+Usage: python bench_suite.py run [-o results.json] [--quick] [designs]
+       python bench_suite.py compare base.json new.json [--threshold 0.1]
+
+Each design is elaborated, simulated for a number of clock cycles, traced
+to a VCD file, and converted to VHDL. The results are written as JSON,
+as a flat mapping of '<design>.<metric>' to a number:
+
+    elaborate_s     -- time to elaborate the design and set up a Simulation
+    cycles_per_s    -- clock cycles simulated per second
+    events_per_s    -- signal updates per second
+    deltas_per_s    -- delta cycles per second
+    vcd_bytes_per_s -- VCD output written per second, while tracing
+    convert_s       -- toVHDL conversion time, without a conversion cache
+
+Metrics that end in '_s' are times, where less is better; the others are
+rates, where more is better. The compare command flags the metrics that
+got worse by more than the threshold (a fraction), and exits with 1 if
+there are any.
+"""
+from __future__ import absolute_import, print_function
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import myhdl
+from myhdl import *
+from myhdl.conversion._convcache import clearConversionCache
+
+from bench_convcache import lane
+
+
+def counters(clk, reset, sel, q, n):
+    """ A farm of counters, one of which is selected """
+    cs = [Signal(modbv(0)[len(q):]) for i in range(n)]
+
+    def counter(c, step):
+
+        @always_seq(clk.posedge, reset=reset)
+        def count():
+            c.next = c + step
+
+        return count
+
+    insts = [counter(cs[i], i + 1) for i in range(n)]
+
+    @always_comb
+    def mux():
+        q.next = cs[sel]
+
+    return insts, mux
+
+
+def fifo(clk, reset, we, re, din, dout, full, empty, depth):
+    """ A synchronous FIFO """
+    mem = [Signal(intbv(0)[len(din):]) for i in range(depth)]
+    wp = Signal(intbv(0, min=0, max=depth))
+    rp = Signal(intbv(0, min=0, max=depth))
+    count = Signal(intbv(0, min=0, max=depth + 1))
+
+    @always(clk.posedge)
+    def write():
+        if we and count < depth:
+            mem[wp].next = din
+
+    @always_seq(clk.posedge, reset=reset)
+    def pointers():
+        w = we and count < depth
+        r = re and count > 0
+        if w:
+            if wp == depth - 1:
+                wp.next = 0
+            else:
+                wp.next = wp + 1
+        if r:
+            if rp == depth - 1:
+                rp.next = 0
+            else:
+                rp.next = rp + 1
+        if w and not r:
+            count.next = count + 1
+        elif r and not w:
+            count.next = count - 1
+
+    @always_comb
+    def outputs():
+        dout.next = mem[rp]
+        full.next = count == depth
+        empty.next = count == 0
+
+    return write, pointers, outputs
+
+
+def crc32(clk, reset, en, data, crc):
+    """ A bitwise CRC-32 over a byte per clock cycle """
+
+    @always_seq(clk.posedge, reset=reset)
+    def update():
+        c = intbv(0)[32:]
+        c[:] = crc
+        if en:
+            for i in range(8):
+                if c[0] ^ data[i]:
+                    c[:] = (c >> 1) ^ 0xEDB88320
+                else:
+                    c[:] = c >> 1
+            crc.next = c
+
+    return update
+
+
+def ram(clk, we, addr, d, q, size):
+    """ A large memory in an Array """
+    mem = Array((size,), Signal(intbv(0)[len(d):]))
+
+    @always(clk.posedge)
+    def write():
+        if we:
+            mem[addr].next = d
+
+    @always_comb
+    def read():
+        q.next = mem[addr]
+
+    return write, read
+
+
+class Pixel(StructType):
+
+    def __init__(self):
+        super(Pixel, self).__init__()
+        self.r = Signal(intbv(0)[8:])
+        self.g = Signal(intbv(0)[8:])
+        self.b = Signal(intbv(0)[8:])
+
+
+def pipeline(clk, r, g, b, q, depth):
+    """ A pipeline of StructType stages """
+    stages = Array((depth,), Pixel())
+
+    @always(clk.posedge)
+    def shift():
+        stages[0].r.next = r
+        stages[0].g.next = g
+        stages[0].b.next = b
+        for i in range(1, depth):
+            stages[i].r.next = stages[i - 1].r
+            stages[i].g.next = stages[i - 1].g
+            stages[i].b.next = stages[i - 1].b
+
+    @always_comb
+    def output():
+        q.next = stages[depth - 1].r + stages[depth - 1].g + \
+            stages[depth - 1].b
+
+    return shift, output
+
+
+def fsm(clk, reset, a, b, q, n):
+    """ A row of state machines """
+    qs = [Signal(intbv(0)[len(q):]) for i in range(n)]
+    lanes = [lane(clk, reset, a, b, qs[i]) for i in range(n)]
+
+    @always_comb
+    def mux():
+        q.next = qs[a[3:]]
+
+    return lanes, mux
+
+
+def slicer(clk, reset, bus, q, n):
+    """ Registers on the byte slices of a wide bus """
+    outs = [Signal(intbv(0)[8:]) for i in range(n)]
+    cat = ConcatSignal(*reversed(outs))
+
+    def reg(d, o):
+
+        @always_seq(clk.posedge, reset=reset)
+        def add():
+            o.next = (d + 1) % 256
+
+        return add
+
+    regs = [reg(bus(8 * i + 8, 8 * i), outs[i]) for i in range(n)]
+
+    @always_comb
+    def output():
+        q.next = cat
+
+    return regs, output
+
+
+def _designs(quick):
+    """ Return the designs by name: (function, args, inputs) makers """
+    k = 1 if quick else 4
+
+    def mk_counters():
+        clk, sel = Signal(bool(0)), Signal(intbv(0, min=0, max=16 * k))
+        reset = ResetSignal(0, active=1, async=False)
+        q = Signal(modbv(0)[16:])
+        return counters, (clk, reset, sel, q, 16 * k), [sel]
+
+    def mk_fifo():
+        clk, we, re, full, empty = [Signal(bool(0)) for i in range(5)]
+        reset = ResetSignal(0, active=1, async=False)
+        din, dout = [Signal(intbv(0)[8:]) for i in range(2)]
+        return (fifo, (clk, reset, we, re, din, dout, full, empty, 16 * k),
+                [we, re, din])
+
+    def mk_crc():
+        clk, en = Signal(bool(0)), Signal(bool(0))
+        reset = ResetSignal(0, active=1, async=False)
+        data, crc = Signal(intbv(0)[8:]), Signal(intbv(0)[32:])
+        return crc32, (clk, reset, en, data, crc), [en, data]
+
+    def mk_ram():
+        size = 1024 * k
+        clk, we = Signal(bool(0)), Signal(bool(0))
+        addr = Signal(intbv(0, min=0, max=size))
+        d, q = Signal(intbv(0)[8:]), Signal(intbv(0)[8:])
+        return ram, (clk, we, addr, d, q, size), [we, addr, d]
+
+    def mk_struct():
+        clk = Signal(bool(0))
+        r, g, b = [Signal(intbv(0)[8:]) for i in range(3)]
+        q = Signal(intbv(0)[10:])
+        return pipeline, (clk, r, g, b, q, 8 * k), [r, g, b]
+
+    def mk_fsm():
+        clk = Signal(bool(0))
+        reset = ResetSignal(0, active=1, async=False)
+        a, b = Signal(intbv(0)[8:]), Signal(intbv(0)[8:])
+        q = Signal(intbv(0)[16:])
+        return fsm, (clk, reset, a, b, q, 8), [a, b]
+
+    def mk_slicer():
+        n = 8 * k
+        clk = Signal(bool(0))
+        reset = ResetSignal(0, active=1, async=False)
+        bus, q = Signal(intbv(0)[8 * n:]), Signal(intbv(0)[8 * n:])
+        return slicer, (clk, reset, bus, q, n), [bus]
+
+    return [('counters', mk_counters), ('fifo', mk_fifo), ('crc', mk_crc),
+            ('ram', mk_ram), ('struct', mk_struct), ('fsm', mk_fsm),
+            ('slicer', mk_slicer)]
+
+
+def _stimulus(clk, inputs, cycles, seed=1):
+    """ A clock, and random values on the inputs at each falling edge """
+    rnd = random.Random(seed)
+
+    @instance
+    def stim():
+        for i in range(cycles):
+            yield delay(5)
+            clk.next = 1
+            yield delay(5)
+            clk.next = 0
+            for s in inputs:
+                s.next = rnd.getrandbits(len(s))
+        raise StopSimulation()
+
+    return stim
+
+
+def _simulate(maker, cycles, trace=False):
+    """ Return the elaboration time and the stats of a simulation """
+    func, args, inputs = maker()
+    t = time.time()
+    if trace:
+        dut = traceSignals(func, *args)
+    else:
+        dut = func(*args)
+    sim = Simulation(dut, _stimulus(args[0], inputs, cycles))
+    elaborated = time.time()
+    sim.run(quiet=1)
+    return elaborated - t, sim.stats
+
+
+def _vcdRate(maker, cycles):
+    """ Return the VCD bytes written per second """
+    cwd = os.getcwd()
+    directory = tempfile.mkdtemp()
+    os.chdir(directory)
+    try:
+        _, stats = _simulate(maker, cycles, trace=True)
+        size = sum(os.path.getsize(f) for f in os.listdir(directory))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(directory)
+    return size / stats.seconds
+
+
+def _convertTime(maker):
+    """ Return the toVHDL conversion time, from an empty emit cache """
+    func, args, inputs = maker()
+    convertor = toVHDL.copy(directory=tempfile.mkdtemp())
+    clearConversionCache()
+    t = time.time()
+    try:
+        convertor(func, *args)
+        t = time.time() - t
+    finally:
+        shutil.rmtree(convertor.directory)
+    return t
+
+
+def _intbvRate(n):
+    """ Return the intbv operations per second """
+    a = intbv(0)[32:]
+    b = intbv(0, min=-1000, max=1000)
+    t = time.time()
+    for i in range(n):
+        a[:] = (a + i) % 2**32
+        a[8:4] = i & 0xf
+        b[:] = (int(a[16:]) % 1999) - 999
+        a[31] ^ (b < 0)
+    return 4 * n / (time.time() - t)
+
+
+def _best(f, repeat):
+    return min(f() for i in range(repeat))
+
+
+def run(names, quick, repeat):
+    cycles = 200 if quick else 2000
+    results = {}
+    for name, maker in _designs(quick):
+        if names and name not in names:
+            continue
+        print("%s..." % name, file=sys.stderr)
+        runs = [_simulate(maker, cycles) for i in range(repeat)]
+        elaborate = min(e for e, stats in runs)
+        stats = min((stats for e, stats in runs), key=lambda s: s.seconds)
+        results[name + '.elaborate_s'] = elaborate
+        results[name + '.cycles_per_s'] = cycles / stats.seconds
+        results[name + '.events_per_s'] = stats.updates / stats.seconds
+        results[name + '.deltas_per_s'] = stats.deltas / stats.seconds
+        results[name + '.vcd_bytes_per_s'] = _vcdRate(maker, cycles)
+        try:
+            results[name + '.convert_s'] = _best(lambda: _convertTime(maker),
+                                                 repeat)
+        except ConversionError as e:
+            print("%s: not converted: %s" % (name, e), file=sys.stderr)
+    if not names or 'intbv' in names:
+        n = 20000 if quick else 200000
+        results['intbv.ops_per_s'] = max(_intbvRate(n) for i in range(repeat))
+    return results
+
+
+def compare(base, new, threshold):
+    """ Print the changes of the metrics, and return the regressions """
+    regressions = []
+    for key in sorted(set(base) & set(new)):
+        if key.endswith('_s') and not key.endswith('_per_s'):
+            change = base[key] / new[key] - 1 if new[key] else 0.0
+        else:
+            change = new[key] / base[key] - 1 if base[key] else 0.0
+        flag = ''
+        if change < -threshold:
+            flag = ' REGRESSION'
+            regressions.append(key)
+        print("%-28s %12.4g %12.4g %+7.1f%%%s" %
+              (key, base[key], new[key], 100 * change, flag))
+    for key in sorted(set(base) ^ set(new)):
+        print("%-28s only in %s" % (key, 'base' if key in base else 'new'))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command')
+    p = commands.add_parser('run', help="run the benchmarks")
+    p.add_argument('designs', nargs='*', help="designs to run (default: all)")
+    p.add_argument('-o', '--output', help="JSON result file (default: stdout)")
+    p.add_argument('--quick', action='store_true', help="small designs, short runs")
+    p.add_argument('--repeat', type=int, default=3, help="take the best of this many runs")
+    p = commands.add_parser('compare', help="compare two result files")
+    p.add_argument('base')
+    p.add_argument('new')
+    p.add_argument('--threshold', type=float, default=0.1,
+                   help="flag changes for the worse beyond this fraction")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        # keep the messages of the converter out of the results
+        stdout, sys.stdout = sys.stdout, sys.stderr
+        try:
+            results = run(args.designs, args.quick, args.repeat)
+        finally:
+            sys.stdout = stdout
+        data = {'myhdl': myhdl.__version__,
+                'python': platform.python_version(),
+                'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'results': results}
+        text = json.dumps(data, indent=2, sort_keys=True)
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.write(text + '\n')
+        else:
+            print(text)
+        return 0
+    else:
+        with open(args.base) as f:
+            base = json.load(f)['results']
+        with open(args.new) as f:
+            new = json.load(f)['results']
+        regressions = compare(base, new, args.threshold)
+        if regressions:
+            print("%d regression(s)" % len(regressions))
+            return 1
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,51 @@
+""" Time the conversion of an Array heavy design with tracing off.
+
+Usage: python bench_tracing.py [nr_of_lanes] [depth]
+
+The converter traces with lazily formatted messages, so a conversion
+with tracing off should not pay for the repr() of the Arrays.
+"""
+from __future__ import absolute_import, print_function
+
+import sys
+import tempfile
+import time
+
+from myhdl import *
+
+
+def lane(clk, reset, d, q, depth):
+    pl = Array((depth,), Signal(intbv(0)[len(d):]))
+
+    @always_comb
+    def comb():
+        q.next = pl[depth - 1]
+
+    @always_seq(clk.posedge, reset=reset)
+    def reg():
+        pl[1:].next = pl[:depth - 1]
+        pl[0].next = d
+
+    return comb, reg
+
+
+def top(clk, reset, d, q, n, depth):
+    lanes = []
+    prev = d
+    for i in range(n):
+        nxt = Signal(intbv(0)[8:]) if i < n - 1 else q
+        lanes.append(lane(clk, reset, prev, nxt, depth))
+        prev = nxt
+    return lanes
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    clk = Signal(bool(0))
+    reset = ResetSignal(0, active=1, async=True)
+    d, q = [Signal(intbv(0)[8:]) for i in range(2)]
+    toVHDL.directory = tempfile.mkdtemp()
+    t = time.time()
+    toVHDL(top, clk, reset, d, q, n, depth)
+    print("%d lanes of depth %d: %.2fs" % (n, depth, time.time() - t))
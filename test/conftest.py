@@ -1,8 +1,10 @@
+import os
 import sys
 
 import py
 import pytest
 
+from myhdl import toVHDL
 from myhdl.conversion import analyze, verify
 from myhdl.conversion._verify import _simulators
 
@@ -16,20 +18,34 @@ if sys.version_info[0] > 2:
 def pytest_addoption(parser):
     parser.addoption("--sim", action="store", choices=all_sims,
                      help="HDL Simulator")
+    parser.addoption("--lean", action="store_true",
+                     help="Convert to VHDL in the lean emission mode")
 
 
 def pytest_configure(config):
     sim = config.getoption('sim')
     if sim is not None:
         verify.simulator = analyze.simulator = sim
+    toVHDL.lean = config.getoption('lean')
+    # the workers of pytest-xdist write their output in directories of
+    # their own
+    worker = os.environ.get('PYTEST_XDIST_WORKER')
+    if worker is not None:
+        if not os.path.exists(worker):
+            os.mkdir(worker)
+        os.chdir(worker)
 
 
 def pytest_report_header(config):
     sim = config.getoption('sim')
+    hdr = []
     if config.getoption('sim') is not None:
-        hdr = ['Simulator: {sim}']
+        hdr += ['Simulator: {sim}']
         if not py.path.local.sysfind(sim):
             hdr += ['Warning: {sim} not found in PATH']
+    if config.getoption('lean'):
+        hdr += ['Lean VHDL emission']
+    if hdr:
         return '\n'.join(hdr).format(sim=sim)
 
 
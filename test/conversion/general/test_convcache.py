@@ -0,0 +1,151 @@
+import json
+import os
+import re
+
+from myhdl import *
+from myhdl.conversion._convcache import clearConversionCache
+
+
+def inc(count, enable, clock, reset):
+
+    @always_seq(clock.posedge, reset=reset)
+    def seq():
+        if enable:
+            count.next = count + 1
+
+    @always_comb
+    def comb():
+        if count == 3:
+            enable.next = 0
+        else:
+            enable.next = 1
+
+    return seq, comb
+
+
+def convert(tmpdir, width, hdl=toVHDL, cache='inc.cache'):
+    count = Signal(modbv(0)[width:])
+    enable = Signal(bool(0))
+    clock = Signal(bool(0))
+    reset = ResetSignal(0, active=1, async=True)
+    try:
+        hdl.directory = str(tmpdir)
+        hdl.manifest = 'inc.json'
+        hdl.conversion_cache = cache
+        hdl(inc, count, enable, clock, reset)
+    finally:
+        hdl.directory = None
+        hdl.manifest = None
+        hdl.conversion_cache = None
+    with open(str(tmpdir.join('inc.json'))) as f:
+        return json.load(f)
+
+
+def statuses(manifest):
+    return sorted(p['status'] for p in manifest['processes'])
+
+
+def test_reuse(tmpdir):
+    """ an unchanged design is not regenerated nor rewritten """
+    clearConversionCache()
+    m = convert(tmpdir, 8)
+    assert statuses(m) == ['regenerated', 'regenerated']
+    text = tmpdir.join('inc.vhd').read()
+    m = convert(tmpdir, 8)
+    assert statuses(m) == ['reused', 'reused']
+    assert [f['status'] for f in m['files']
+            if f['path'].endswith('inc.vhd')] == ['unchanged']
+    assert tmpdir.join('inc.vhd').read() == text
+
+
+def test_persisted(tmpdir):
+    """ the cache file primes the cache of a new run """
+    clearConversionCache()
+    convert(tmpdir, 8, toVerilog)
+    clearConversionCache()
+    m = convert(tmpdir, 8, toVerilog)
+    assert statuses(m) == ['reused', 'reused']
+
+
+def test_no_cache(tmpdir):
+    """ without a conversion cache, nothing is reused between runs """
+    clearConversionCache()
+    convert(tmpdir, 8)
+    m = convert(tmpdir, 8, cache=None)
+    assert statuses(m) == ['regenerated', 'regenerated']
+    m = convert(tmpdir, 8, toVerilog, cache=None)
+    m = convert(tmpdir, 8, toVerilog, cache=None)
+    assert statuses(m) == ['regenerated', 'regenerated']
+
+
+def test_changed_width(tmpdir):
+    """ the same source with other signal types is regenerated """
+    clearConversionCache()
+    convert(tmpdir, 8)
+    text = tmpdir.join('inc.vhd').read()
+    m = convert(tmpdir, 10)
+    assert 'seq' in m['regenerated']
+    assert tmpdir.join('inc.vhd').read() != text
+    clearConversionCache()
+    convert(tmpdir, 10)
+    assert tmpdir.join('inc.vhd').read() != text
+
+
+def parity(v):
+    p = False
+    for i in range(len(v)):
+        p = p ^ bool(v[i])
+    return p
+
+
+def lanes(ins, outs, flags):
+
+    def lane(a, q, f):
+
+        @always_comb
+        def logic():
+            q.next = a + 1
+
+        @always_comb
+        def check():
+            f.next = parity(a)
+
+        return logic, check
+
+    insts = []
+    for i in range(len(outs)):
+        insts.append(lane(ins[i], outs[i], flags[i]))
+    return insts
+
+
+def test_parallel(tmpdir):
+    """ the output doesn't depend on the number of workers """
+    n = 20
+    texts = []
+    for hdl, ext in ((toVHDL, '.vhd'), (toVerilog, '.v')):
+        for workers in (1, 3):
+            ins = [Signal(intbv(0)[8:]) for i in range(n)]
+            outs = [Signal(intbv(0)[8:]) for i in range(n)]
+            flags = [Signal(bool(0)) for i in range(n)]
+            clearConversionCache()
+            try:
+                hdl.directory = str(tmpdir)
+                hdl.workers = workers
+                hdl(lanes, ins, outs, flags)
+            finally:
+                hdl.directory = None
+                hdl.workers = None
+            text = tmpdir.join('lanes' + ext).read()
+            # generated labels are numbered per process
+            text = re.sub('MYHDL[0-9]+', 'MYHDL', text)
+            texts.append(re.sub('(--|//) Date: .*', '', text))
+        assert texts[-1] == texts[-2]
+
+
+def test_no_fork(monkeypatch):
+    """ without fork, the generators are emitted serially """
+    from myhdl.conversion import _convcache
+    monkeypatch.delattr(os, 'fork')
+    assert _convcache._forkContext() is None
+    assert _convcache._emitParallel('VHDL', [(0, None, None)], (), None,
+                                    3) == {}
@@ -0,0 +1,78 @@
+from __future__ import absolute_import
+
+from myhdl import *
+
+
+@block
+def inc(count, enable, clock, reset, n):
+
+    @always_seq(clock.posedge, reset=reset)
+    def seq():
+        if enable:
+            count.next = (count + 1) % n
+
+    return seq
+
+
+@block
+def counters(q0, q1, q2, enable, clock, reset):
+    i0 = inc(q0, enable, clock, reset, 10)
+    i1 = inc(q1, enable, clock, reset, 10)
+    i2 = inc(q2, enable, clock, reset, 20)
+    return i0, i1, i2
+
+
+@block
+def memcounters(q, enable, clock, reset):
+    qs = [Signal(intbv(0)[4:]) for i in range(2)]
+    insts = [inc(qs[i], enable, clock, reset, 10) for i in range(2)]
+
+    @always_comb
+    def comb():
+        q.next = qs[0] + qs[1]
+
+    return insts, comb
+
+
+def convert(hdl, tmpdir, top, *args):
+    hdl.directory = str(tmpdir)
+    hdl.hierarchical = True
+    try:
+        hdl(top, *args)
+    finally:
+        hdl.directory = None
+        hdl.hierarchical = False
+
+
+def ports(n):
+    sigs = [Signal(intbv(0)[4:]) for i in range(n)]
+    return sigs + [Signal(bool(0)), Signal(bool(0)),
+                   ResetSignal(0, active=1, async=True)]
+
+
+def test_vhdl(tmpdir):
+    convert(toVHDL, tmpdir, counters, *ports(3))
+    top = tmpdir.join('counters.vhd').read()
+    assert top.count('entity work.inc(MyHDL)') == 2
+    assert top.count('entity work.inc_1(MyHDL)') == 1
+    assert 'process' not in top
+    assert 'mod 10' in tmpdir.join('inc.vhd').read()
+    assert 'mod 20' in tmpdir.join('inc_1.vhd').read()
+
+
+def test_verilog(tmpdir):
+    convert(toVerilog, tmpdir, counters, *ports(3))
+    top = tmpdir.join('counters.v').read()
+    assert top.count('inc i') == 2
+    assert top.count('inc_1 i2') == 1
+    assert '.count(q0)' in top
+    assert not tmpdir.join('tb_inc.v').check()
+    assert 'module inc_1' in tmpdir.join('inc_1.v').read()
+
+
+def test_memory_ports(tmpdir):
+    """ memory words are ports in VHDL, but not in Verilog """
+    convert(toVHDL, tmpdir, memcounters, *ports(1))
+    assert 'count => qs(1)' in tmpdir.join('memcounters.vhd').read()
+    convert(toVerilog, tmpdir, memcounters, *ports(1))
+    assert not tmpdir.join('inc.v').check()
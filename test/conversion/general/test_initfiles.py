@@ -0,0 +1,74 @@
+from __future__ import absolute_import
+
+from myhdl import *
+
+ROM = tuple((i * 37) % 256 for i in range(64))
+SROM = tuple(v - 128 for v in ROM)
+
+
+@block
+def tables(dout, sout, tout, addr, clock):
+    table = [Signal(intbv(v)[8:]) for v in ROM]
+
+    @always_comb
+    def read():
+        dout.next = ROM[addr]
+
+    @always(clock.posedge)
+    def sread():
+        sout.next = SROM[addr]
+
+    @always_comb
+    def tread():
+        tout.next = table[addr]
+
+    return read, sread, tread
+
+
+def convert(hdl, tmpdir, threshold):
+    dout, tout = [Signal(intbv(0)[8:]) for _ in range(2)]
+    sout = Signal(intbv(0, min=-256, max=256))
+    addr = Signal(intbv(0, min=0, max=64))
+    clock = Signal(bool(0))
+    hdl.directory = str(tmpdir)
+    hdl.initfile_threshold = threshold
+    try:
+        hdl(tables, dout, sout, tout, addr, clock)
+    finally:
+        hdl.directory = None
+        hdl.initfile_threshold = None
+
+
+def test_vhdl(tmpdir):
+    convert(toVHDL, tmpdir, 64)
+    text = tmpdir.join('tables.vhd').read()
+    assert 'case' not in text
+    assert 'dout <= resize(read_ROM(to_integer(addr)), 8);' in text
+    assert 'init_sread_SROM("tables_sread_SROM.hex");' in text
+    assert 'init_table("tables_table.hex");' in text
+    assert readmemh(str(tmpdir.join('tables_read_ROM.hex'))) == ROM
+    assert readmemh(str(tmpdir.join('tables_sread_SROM.hex')), 8) == SROM
+    assert readmemh(str(tmpdir.join('tables_table.hex'))) == ROM
+    # smaller tables stay in the code
+    convert(toVHDL, tmpdir.mkdir('inline'), 65)
+    text = tmpdir.join('inline', 'tables.vhd').read()
+    assert 'hread' not in text
+    assert not tmpdir.join('inline', 'tables_read_ROM.hex').check()
+
+
+def test_verilog(tmpdir):
+    convert(toVerilog, tmpdir, 64)
+    text = tmpdir.join('tables.v').read()
+    assert 'case' not in text
+    assert 'initial $readmemh("tables_tables_read_ROM.hex", tables_read_ROM);' in text
+    assert 'reg signed [7:0] tables_sread_SROM [0:64-1];' in text
+    assert 'initial $readmemh("tables_table.hex", table);' in text
+    assert readmemh(str(tmpdir.join('tables_tables_sread_SROM.hex')), 8) == SROM
+    assert readmemh(str(tmpdir.join('tables_table.hex'))) == ROM
+
+
+def test_readmemh(tmpdir):
+    f = tmpdir.join('mem.hex')
+    f.write('// a comment\n0f\nff_ff // two words\n@4\n80\n@1\n1\n')
+    assert readmemh(str(f)) == (0x0f, 1, 0, 0, 0x80)
+    assert readmemh(str(f), 8) == (15, 1, 0, 0, -128)
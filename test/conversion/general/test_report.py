@@ -0,0 +1,50 @@
+from __future__ import absolute_import
+
+import json
+import sys
+
+from myhdl import *
+
+from test_convcache import inc
+
+
+def convert(hdl, tmpdir):
+    count = Signal(modbv(0)[8:])
+    enable = Signal(bool(0))
+    clock = Signal(bool(0))
+    reset = ResetSignal(0, active=1, async=True)
+    hdl.directory = str(tmpdir)
+    hdl.report = 'report.json'
+    try:
+        hdl(inc, count, enable, clock, reset)
+    finally:
+        hdl.directory = None
+        hdl.report = None
+    with open(str(tmpdir.join('report.json'))) as f:
+        return json.load(f)
+
+
+def test_report(tmpdir, capsys):
+    for hdl in (toVHDL, toVerilog):
+        r = convert(hdl, tmpdir)
+        phases = [p['phase'] for p in r['phases']]
+        assert phases[0] == 'hierarchy extraction'
+        for phase in ('analyzeGens', 'analyzeSigs', 'analyzeTopFunc',
+                      'signal declarations', 'convertGens', 'output'):
+            assert phase in phases
+        assert all(p['objects'] > 0 for p in r['phases'])
+        # the change of the resident memory over each phase, and the
+        # peak of the process so far
+        for p in r['phases']:
+            assert 'memory_change_kb' in p
+            assert 'process_peak_memory_kb' in p
+        if sys.platform.startswith('linux'):
+            assert all(isinstance(p['memory_change_kb'], int)
+                       for p in r['phases'])
+        # the VHDL labels are relative to the top level
+        names = sorted(p['name'] for p in r['processes'])
+        assert names in (['comb', 'seq'], ['inc_comb', 'inc_seq'])
+        assert r['seconds'] >= sum(p['seconds'] for p in r['processes'])
+    out = capsys.readouterr()[0]
+    assert out.count('Conversion report for inc') == 2
+    assert 'RSS change kB' in out and 'process peak kB' in out
@@ -0,0 +1,107 @@
+from __future__ import absolute_import
+import sys
+
+from myhdl import *
+from myhdl.conversion import verify, registerSimulator
+
+
+def counter():
+    """ A bench that prints a count """
+
+    @instance
+    def logic():
+        for i in range(10):
+            yield delay(10)
+            print(i)
+
+    return logic
+
+
+def _register(name, output, elaborate=None, hdl="VHDL", analyze="pass"):
+    registerSimulator(
+        name=name,
+        hdl=hdl,
+        analyze='%s -c "%s"' % (sys.executable, analyze),
+        elaborate=elaborate,
+        simulate='%s -c "print(%r)"' % (sys.executable, output),
+        skiplines=1,
+        ignore=("# note",),
+    )
+
+
+def _verify(tmpdir, name, directory=None):
+    tmpdir.chdir()
+    simulator = verify.simulator
+    verify.simulator = name
+    verify.directory = directory
+    try:
+        return verify(counter)
+    finally:
+        verify.simulator = simulator
+        verify.directory = None
+
+
+def test_match(tmpdir):
+    _register("stub_match", "header\n# note: start\n" +
+              "\n".join(str(i) for i in range(10)))
+    assert _verify(tmpdir, "stub_match") == 0
+    assert tmpdir.join("MyHDL.log").read() == \
+        "".join("%d\n" % i for i in range(10))
+
+
+def test_directory(tmpdir):
+    _register("stub_directory", "header\n" +
+              "\n".join(str(i) for i in range(10)),
+              analyze="import os; assert os.path.exists('counter.vhd')")
+    out = tmpdir.join("out")
+    assert _verify(tmpdir, "stub_directory", str(out)) == 0
+    for f in ("counter.vhd", "MyHDL.log", "diff.log", "work"):
+        assert out.join(f).check()
+        assert not tmpdir.join(f).check()
+
+
+def test_unicode_name(tmpdir):
+    """ a unicode name is a single simulator, also on Python 2 """
+    _register("stub_unicode", "header\n" +
+              "\n".join(str(i) for i in range(10)))
+    assert _verify(tmpdir, u"stub_unicode") == 0
+    assert tmpdir.join("MyHDL.log").check()
+
+
+def test_mismatch(tmpdir):
+    _register("stub_mismatch", "header\n" +
+              "\n".join(str(i) for i in [0, 1, 2, 7, 4, 5, 6, 7, 8, 9]))
+    assert _verify(tmpdir, "stub_mismatch") == 1
+    # the MyHDL simulation stops at the first difference
+    assert tmpdir.join("MyHDL.log").read() == "0\n1\n2\n3\n"
+    diff = tmpdir.join("diff.log").read()
+    assert "-3\n" in diff
+    assert "+7\n" in diff
+
+
+def test_short_output(tmpdir):
+    _register("stub_short", "header\n0\n1")
+    assert _verify(tmpdir, "stub_short") == 1
+    assert tmpdir.join("MyHDL.log").read() == "0\n1\n2\n"
+
+
+def test_elaboration_failure(tmpdir):
+    _register("stub_elaborate", "header",
+              elaborate='%s -c "raise SystemExit(2)"' % sys.executable)
+    assert _verify(tmpdir, "stub_elaborate") == 2
+
+
+def test_matrix(tmpdir):
+    output = "header\n" + "\n".join(str(i) for i in range(10))
+    # the analyzers check that they run next to a copy of the output
+    _register("stub_vhdl", output,
+              analyze="import os; assert os.path.exists('counter.vhd')")
+    _register("stub_verilog", output, hdl="Verilog",
+              analyze="import os; assert os.path.exists('counter.v')")
+    _register("stub_wrong", output.replace("5", "6"), hdl="Verilog")
+    sims = ["stub_vhdl", "stub_verilog", "stub_wrong"]
+    assert _verify(tmpdir, sims) == 1
+    assert [(r.name, r.passed) for r in verify.results] == \
+        [("stub_vhdl", True), ("stub_verilog", True), ("stub_wrong", False)]
+    assert "+6\n" in tmpdir.join("verify", "stub_wrong", "diff.log").read()
+    assert tmpdir.join("verify", "stub_vhdl", "diff.log").read() == ""
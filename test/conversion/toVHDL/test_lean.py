@@ -0,0 +1,65 @@
+from __future__ import absolute_import
+
+from myhdl import *
+
+ROM = tuple((i * 37) % 256 for i in range(16))
+N = 10
+
+
+def logic(dout, iout, a, b, c, addr, clock):
+
+    @always_comb
+    def comb():
+        dout.next = addr + N * 2
+
+    @always(clock.posedge)
+    def seq():
+        c.next = a and not b
+
+    @instance
+    def count():
+        n = 0
+        v = 0
+        while 1:
+            yield clock.posedge
+            n = (n + 1) % N
+            v = ROM[addr]
+            if not a:
+                iout.next = n + v
+
+    return comb, seq, count
+
+
+def convert(tmpdir, lean):
+    dout, addr = [Signal(intbv(0)[8:]) for _ in range(2)]
+    iout = Signal(intbv(0)[10:])
+    a, b, c, clock = [Signal(bool(0)) for _ in range(4)]
+    toVHDL.directory = str(tmpdir)
+    # keep the mode of the --lean option for the other tests
+    previous, toVHDL.lean = toVHDL.lean, lean
+    try:
+        toVHDL(logic, dout, iout, a, b, c, addr, clock)
+    finally:
+        toVHDL.directory = None
+        toVHDL.lean = previous
+    return tmpdir.join('logic.vhd').read()
+
+
+def test_lean(tmpdir):
+    text = convert(tmpdir, True)
+    # constants are folded
+    assert 'dout <= (addr + 20);' in text
+    # std_logic operands stay std_logic
+    assert 'c <= (a and (not b));' in text
+    assert "if ((not a) = '1') then" in text
+    assert 'bool(' not in text and 'stdl(' not in text
+    # integers that only get bounded values are constrained
+    assert 'variable n: natural range 0 to 9;' in text
+    assert 'variable v: natural range 0 to 225;' in text
+
+
+def test_default(tmpdir):
+    text = convert(tmpdir, False)
+    assert '(10 * 2)' in text
+    assert 'stdl(bool(a) and (not bool(b)))' in text
+    assert 'variable n: integer;' in text
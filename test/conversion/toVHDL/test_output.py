@@ -0,0 +1,110 @@
+from __future__ import absolute_import
+
+from myhdl import *
+from myhdl.conversion._toVHDL import _dropSuppressed
+
+
+def logic(a, b, clock):
+    """ A unit that drives an unused signal """
+    s = Signal(bool(0))
+    s.suppressWarning()
+    sb = Signal(bool(0))
+
+    @always(clock.posedge)
+    def seq():
+        s.next = a
+        sb.next = a
+
+    @always_comb
+    def comb():
+        b.next = sb
+
+    return seq, comb
+
+
+def test_output(tmpdir):
+    a, b, clock = [Signal(bool(0)) for _ in range(3)]
+    toVHDL.directory = str(tmpdir)
+    try:
+        toVHDL(logic, a, b, clock)
+    finally:
+        toVHDL.directory = None
+    text = tmpdir.join('logic.vhd').read()
+    assert not tmpdir.listdir(lambda p: p.ext == '.tmp')
+    # the top level name is stripped from the labels only
+    assert 'use IEEE.std_logic_1164.all;' in text
+    assert 'seq: process' in text
+    assert 'LOGIC_SEQ' not in text.upper()
+    # the lines with a suppressed signal are left out
+    assert 's <=' not in text
+    assert 'sb <= a;' in text
+
+
+def test_drop_suppressed():
+    """ indexed names and record fields are matched as a whole """
+    sigs = [Signal(bool(0)) for _ in range(3)]
+    for s, name in zip(sigs, ('mem(3)', 'pix.r', 's')):
+        s._name = name
+    chunks = ['\tsignal s: std_logic;\n\tmem(3) <= a;\n\tmem(',
+              '13) <= a;\n\tpix.r <= a', ';\n\tpix.g <= s(1);\n',
+              '\tsb <= mem(3);\n', '\tmem(to_integer(i)) <= a;']
+    text = ''.join(_dropSuppressed(chunks, sigs))
+    assert text == '\tmem(13) <= a;\n\tmem(to_integer(i)) <= a;'
+
+
+def ram(clock, addr, d, q, h):
+    """ A large memory, with two of its words in a concatenation """
+    mem = Array((1000,), Signal(intbv(0)[8:]))
+    c = ConcatSignal(mem[1], mem[2])
+
+    @always(clock.posedge)
+    def write():
+        mem[addr].next = d
+
+    @always_comb
+    def read():
+        if addr == 0:
+            q.next = c[8:]
+        else:
+            q.next = mem[addr]
+        h.next = c[16:8]
+
+    return write, read
+
+
+def test_large_array(tmpdir):
+    clock = Signal(bool(0))
+    addr = Signal(intbv(0, min=0, max=1000))
+    d, q, h = [Signal(intbv(0)[8:]) for _ in range(3)]
+    toVHDL.directory = str(tmpdir)
+    toVHDL.standard = '93'
+    try:
+        toVHDL(ram, clock, addr, d, q, h)
+    finally:
+        toVHDL.directory = None
+        toVHDL.standard = '2008'
+    text = tmpdir.join('ram.vhd').read()
+    # one aggregate for the initial value, and the Array itself in the
+    # sensitivity list
+    assert ":= (others => (others => '0'));" in text
+    senslist = text.split('read: process (')[1].split(')')[0]
+    assert sorted(senslist.split(', ')) == ['addr', 'c', 'mem']
+    # only the words in the concatenation are named
+    assert '<= mem(1);' in text
+    assert '<= mem(2);' in text
+    assert 'mem(0)' not in text
+
+
+def test_copy(tmpdir):
+    """ A copy of a convertor, with an output directory of its own """
+    dirs = [tmpdir.mkdir(str(i)) for i in range(2)]
+    for d in dirs:
+        a, b, clock = [Signal(bool(0)) for _ in range(3)]
+        toVHDL.copy(directory=str(d))(logic, a, b, clock)
+    assert toVHDL.directory is None
+
+    def lines(d):
+        return [l for l in d.join('logic.vhd').readlines()
+                if not l.startswith(('-- Date', '-- File'))]
+
+    assert lines(dirs[0]) == lines(dirs[1])
@@ -0,0 +1,109 @@
+import pytest
+
+from myhdl import *
+from myhdl import BlockError, ExtractHierarchyError
+from myhdl._block import _error
+from myhdl._extractHierarchy import _HierExtr
+
+
+def inc(clk, q):
+
+    @always(clk.posedge)
+    def logic():
+        q.next = q + 1
+
+    return logic
+
+
+def top(clk, q1, q2):
+    s = Signal(intbv(0)[4:])
+    u1 = inc(clk, q1)
+    u2 = inc(clk, q2)
+
+    @always_comb
+    def comb():
+        s.next = q1 ^ q2
+
+    return u1, u2, comb
+
+
+incBlock = block(inc)
+
+
+def helper(clk, q):
+    return incBlock(clk, q)
+
+
+@block
+def topBlock(clk, q1, q2):
+    s = Signal(intbv(0)[4:])
+    u1 = incBlock(clk, q1)
+    u2 = helper(clk, q2)
+
+    @always_comb
+    def comb():
+        s.next = q1 ^ q2
+
+    return u1, u2, comb
+
+
+def summary(h):
+    return [(inst.level, inst.name, sorted(inst.sigdict),
+             sorted(n for n, sub in inst.subs)) for inst in h.hierarchy]
+
+
+def test_argtype():
+    with pytest.raises(BlockError) as e:
+        block(1)
+    assert e.value.kind == _error.ArgType
+
+    def gen():
+        yield None
+
+    with pytest.raises(BlockError) as e:
+        block(gen)
+    assert e.value.kind == _error.ArgType
+
+
+def test_call_outside_extraction():
+    """ outside hierarchy extraction a block is a plain function """
+    clk = Signal(bool(0))
+    q = Signal(intbv(0)[4:])
+    inst = incBlock(clk, q)
+    assert inst.func.__name__ == 'logic'
+    assert incBlock.__name__ == 'inc'
+
+
+def test_same_hierarchy():
+    """ explicit and profile based extraction give the same result """
+    clk = Signal(bool(0))
+    q1, q2 = [Signal(intbv(0)[4:]) for i in range(2)]
+    h1 = _HierExtr('top', top, clk, q1, q2)
+    h2 = _HierExtr('top', topBlock, clk, q1, q2)
+    assert summary(h1) == summary(h2)
+    assert list(h1.absnames.values()) == list(h2.absnames.values())
+
+
+def test_block_in_profile_mode():
+    """ blocks are transparent when the top level is not a block """
+
+    def wrapper(clk, q1, q2):
+        u1 = incBlock(clk, q1)
+        u2 = incBlock(clk, q2)
+        return u1, u2
+
+    clk = Signal(bool(0))
+    q1, q2 = [Signal(intbv(0)[4:]) for i in range(2)]
+    h = _HierExtr('wrapper', wrapper, clk, q1, q2)
+    assert [(inst.level, inst.name) for inst in h.hierarchy] == \
+        [(1, 'wrapper'), (2, 'u2'), (2, 'u1')]
+    assert h.hierarchy[1].func is inc
+
+
+def test_no_instances():
+    @block
+    def empty():
+        return []
+
+    with pytest.raises(ExtractHierarchyError):
+        _HierExtr('empty', empty)
@@ -0,0 +1,77 @@
+import pytest
+
+from myhdl import *
+from myhdl import SimulationError
+
+
+class Pair(StructType):
+
+    def __init__(self):
+        super(Pair, self).__init__()
+        self.lo = Signal(intbv(0)[4:])
+        self.hi = Signal(intbv(0)[4:])
+
+
+def bench(clk, q, mem, pair):
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    @always(clk.posedge)
+    def count():
+        q.next = q + 1
+        mem[q % 4].next = q
+        pair.lo.next = q[4:]
+        pair.hi.next = q[8:4]
+
+    return clkgen, count
+
+
+def test_capture():
+    clk = Signal(bool(0))
+    q = Signal(modbv(0)[8:])
+    mem = Array((4,), Signal(intbv(0)[8:]))
+    pair = Pair()
+    expected = []
+
+    @always(clk.posedge)
+    def monitor():
+        expected.append((now(), int(q), int(mem[1]), int(pair.lo),
+                         int(pair.hi)))
+
+    sim = Simulation(bench(clk, q, mem, pair), monitor)
+    cap = sim.capture(dict(q=q, mem=mem, pair=pair), on=clk.posedge)
+    sim.run(200, quiet=1)
+    assert len(cap) == len(expected) == 20
+    assert sorted(cap.names) == ['mem[0]', 'mem[1]', 'mem[2]', 'mem[3]',
+                                 'pair.hi', 'pair.lo', 'q']
+    rows = list(zip(cap.time, cap['q'], cap['mem[1]'], cap['pair.lo'],
+                    cap['pair.hi']))
+    assert [tuple(int(v) for v in row) for row in rows] == expected
+    assert list(cap[q]) == list(cap['q'])
+    assert list(cap.columns())[0] == 'time'
+
+    cap.stop()
+    sim.run(100, quiet=1)
+    assert len(cap) == 20
+
+
+def test_capture_changes():
+    clk = Signal(bool(0))
+    q = Signal(modbv(0)[8:])
+    mem = Array((4,), Signal(intbv(0)[8:]))
+    sim = Simulation(bench(clk, q, mem, Pair()))
+    cap = sim.capture([q], on=q)
+    sim.run(100, quiet=1)
+    assert list(cap['0']) == list(range(1, 11))
+    assert list(cap.time) == list(range(5, 100, 10))
+
+
+def test_trigger():
+    clk = Signal(bool(0))
+    sim = Simulation()
+    with pytest.raises(SimulationError):
+        sim.capture([clk], on=delay(5))
+    with pytest.raises(SimulationError):
+        sim.capture([1], on=clk.posedge)
@@ -0,0 +1,137 @@
+import pytest
+
+from myhdl import *
+from myhdl import SimulationError
+from myhdl._checkpoint import _error
+
+
+def bench(results):
+    clk = Signal(bool(0))
+    q = Signal(intbv(0)[4:])
+    d = Signal(intbv(0)[6:], delay=3)
+    count = intbv(0, min=0, max=16)
+
+    @always(clk.posedge)
+    def logic():
+        count[:] = (count + 1) % 16
+        q.next = count
+        d.next = q * 2
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    @always(clk.negedge)
+    def monitor():
+        results.append((now(), int(q), int(d)))
+
+    return logic, clkgen, monitor
+
+
+def test_restore(tmpdir):
+    """ a restored simulation continues like the original one """
+    path = str(tmpdir.join('sim.ckpt'))
+    results = []
+    sim = Simulation(bench(results))
+    sim.run(47, quiet=1)
+    sim.checkpoint(path)
+    del results[:]
+    sim.run(100, quiet=1)
+    expected = results[:]
+    del results[:]
+    sim = Simulation(bench(results))
+    sim.restore(path)
+    sim.run(100, quiet=1)
+    assert results == expected
+    assert results[0][0] == 50
+    assert now() == 147
+
+
+def test_not_restorable(tmpdir):
+    @instance
+    def stim():
+        yield delay(100)
+
+    sim = Simulation(stim)
+    sim.run(10, quiet=1)
+    with pytest.raises(SimulationError) as e:
+        sim.checkpoint(str(tmpdir.join('sim.ckpt')))
+    assert e.value.kind == _error.NotRestorable
+
+
+def test_mismatch(tmpdir):
+    path = str(tmpdir.join('sim.ckpt'))
+    sim = Simulation(bench([]))
+    sim.run(20, quiet=1)
+    sim.checkpoint(path)
+    sim = Simulation(bench([])[:2])
+    with pytest.raises(SimulationError) as e:
+        sim.restore(path)
+    assert e.value.kind == _error.Mismatch
+
+
+def test_started(tmpdir):
+    path = str(tmpdir.join('sim.ckpt'))
+    sim = Simulation(bench([]))
+    sim.run(20, quiet=1)
+    sim.checkpoint(path)
+    with pytest.raises(SimulationError) as e:
+        sim.restore(path)
+    assert e.value.kind == _error.Started
+
+
+class Pixel(StructType):
+
+    def __init__(self):
+        super(Pixel, self).__init__()
+        self.r = Signal(intbv(0)[8:])
+        self.g = Signal(intbv(0)[8:])
+
+
+class Bus(object):
+
+    def __init__(self):
+        self.data = Signal(intbv(0)[8:])
+
+
+def structured():
+    clk = Signal(bool(0))
+    mem = Array((4,), Signal(intbv(0)[8:]))
+    pix = Pixel()
+    bus = Bus()
+
+    @always(clk.posedge)
+    def write():
+        for i in range(4):
+            mem[i].next = mem[i] + i + 1
+        pix.r.next = pix.r + 1
+        pix.g.next = pix.r
+        bus.data.next = bus.data + 3
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    values = lambda: ([int(s) for s in mem], int(pix.r), int(pix.g),
+                      int(bus.data))
+    return (write, clkgen), values
+
+
+def test_structured(tmpdir):
+    """ the signals of Arrays, StructTypes and interfaces are restored """
+    path = str(tmpdir.join('sim.ckpt'))
+    insts, values = structured()
+    sim = Simulation(insts)
+    sim.run(47, quiet=1)
+    sim.checkpoint(path)
+    assert values() == ([5, 10, 15, 20], 5, 4, 15)
+    sim.run(100, quiet=1)
+    expected = values()
+
+    insts, values = structured()
+    sim = Simulation(insts)
+    sim.restore(path)
+    sim.run(3, quiet=1)
+    assert values()[0] == [5, 10, 15, 20]
+    sim.run(97, quiet=1)
+    assert values() == expected
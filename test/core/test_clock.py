@@ -0,0 +1,127 @@
+import pytest
+
+from myhdl import *
+
+
+def edges(clk, log):
+
+    @instance
+    def monitor():
+        while True:
+            yield clk
+            log.append((now(), int(clk)))
+
+    return monitor
+
+
+def test_clkgen():
+    """ a Clock toggles like the usual clock generator """
+    clk = Signal(bool(0))
+    expected = []
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    Simulation(clkgen, edges(clk, expected)).run(100, quiet=1)
+    clk = Signal(bool(0))
+    log = []
+    Simulation(Clock(clk, 10, phase=5), edges(clk, log)).run(100, quiet=1)
+    assert log == expected
+
+
+def test_duty():
+    clk = Signal(bool(0))
+    log = []
+    Simulation(Clock(clk, 10, duty=0.3, phase=8),
+               edges(clk, log)).run(30, quiet=1)
+    assert log == [(8, 1), (11, 0), (18, 1), (21, 0), (28, 1)]
+
+
+def test_shared():
+    """ clocks share a schedule over their common period """
+    a, b = Signal(bool(0)), Signal(bool(0))
+    loga, logb = [], []
+    sim = Simulation(Clock(a, 4), Clock(b, 6, phase=1),
+                     edges(a, loga), edges(b, logb))
+    assert len(sim._clocks) == 1
+    sim.run(24, quiet=1)
+    assert [t for t, v in loga if v] == [0, 4, 8, 12, 16, 20, 24]
+    assert [t for t, v in logb if v] == [1, 7, 13, 19]
+    assert [t for t, v in logb if not v] == [4, 10, 16, 22]
+
+
+def counter(q):
+    clk = Signal(bool(0))
+
+    @always(clk.posedge)
+    def count():
+        q.next = q + 1
+
+    return Clock(clk, 10, duty=0.2, phase=3), count
+
+
+def test_checkpoint(tmpdir):
+    path = str(tmpdir.join('sim.ckpt'))
+    q = Signal(intbv(0)[8:])
+    sim = Simulation(counter(q))
+    sim.run(45, quiet=1)
+    sim.checkpoint(path)
+    sim.run(100, quiet=1)
+    assert q == 15
+
+    q = Signal(intbv(0)[8:])
+    sim = Simulation(counter(q))
+    sim.restore(path)
+    sim.run(100, quiet=1)
+    assert q == 15
+
+
+def test_args():
+    clk = Signal(bool(0))
+    with pytest.raises(TypeError):
+        Clock(clk._val, 10)
+    with pytest.raises(ValueError):
+        Clock(clk, 1)
+    with pytest.raises(ValueError):
+        Clock(clk, 10, duty=0.01)
+    with pytest.raises(ValueError):
+        Clock(clk, 10, phase=10)
+
+
+def tb(q):
+    clk = Signal(bool(0))
+    clock = Clock(clk, 10)
+
+    @always(clk.posedge)
+    def count():
+        q.next = q + 1
+
+    return instances()
+
+
+def test_instances():
+    q = Signal(intbv(0)[8:])
+    Simulation(tb(q)).run(45, quiet=1)
+    assert q == 5
+
+
+def test_trace(tmpdir):
+    q = Signal(intbv(0)[8:])
+    with tmpdir.as_cwd():
+        dut = traceSignals(tb, q)
+        Simulation(dut).run(45, quiet=1)
+    assert q == 5
+    vcd = tmpdir.join('tb.vcd').read()
+    assert '$var reg 1' in vcd and ' clk ' in vcd
+
+
+def test_profile():
+    q = Signal(intbv(0)[8:])
+    profile = SimulationProfile()
+    dut = profile(tb, q)
+    Simulation(dut).run(45, quiet=1, profile=profile)
+    assert q == 5
+    stats = dict((p, n) for p, n, t in profile.stats())
+    # the start, and 5 rising edges
+    assert stats[('tb', 'count')] == 6
@@ -0,0 +1,133 @@
+import imp
+import os
+import tempfile
+
+from myhdl import *
+from myhdl._codecache import (_codeInfoMap, _getCodeInfo, clearCodeCache,
+                              loadCodeCache, saveCodeCache)
+from myhdl._util import _makeAST
+
+
+def comb(a, b, c):
+
+    @always_comb
+    def logic():
+        c.next = a + b
+
+    return logic
+
+
+class Bus(object):
+
+    def __init__(self):
+        self.x = Signal(intbv(0)[8:])
+        self.y = Signal(intbv(0)[8:])
+
+
+def busComb(bus):
+
+    @always_comb
+    def logic():
+        bus.y.next = bus.x
+
+    return logic
+
+
+def waiter(a, b):
+
+    @instance
+    def logic():
+        while 1:
+            yield a
+            b.next = a
+
+    return logic
+
+
+def test_info_per_code_object():
+    """ the source is only fetched once per code object """
+    info = _getCodeInfo(comb)
+    assert _getCodeInfo(comb.__code__) is info
+    assert 'c' in info.names
+    assert ('c', 'next') in info.chains
+
+
+def test_equal_code_objects(tmpdir):
+    """ code objects that compare equal still get their own source """
+    src = "def f():\n    a = 1\n%s"
+    p1 = tmpdir.join('m1.py')
+    p1.write(src % '    """ a docstring that the compiler drops """\n')
+    p2 = tmpdir.join('m2.py')
+    p2.write(src % '')
+    f1 = imp.load_source('m1', str(p1)).f
+    f2 = imp.load_source('m2', str(p2)).f
+    assert f1.__code__ == f2.__code__
+    assert _getCodeInfo(f1) is not _getCodeInfo(f2)
+    assert 'docstring' in _getCodeInfo(f1).source
+    assert 'docstring' not in _getCodeInfo(f2).source
+
+
+def test_independent_trees():
+    """ callers get a fresh tree that they are free to modify """
+    t1 = _makeAST(comb)
+    t2 = _makeAST(comb)
+    assert t1 is not t2
+    t1.body = []
+    assert _makeAST(comb).body
+    assert t2.sourcefile == t1.sourcefile
+    assert t2.lineoffset == t1.lineoffset
+
+
+def test_instances_keep_own_signals():
+    """ instances of the same block share results but not signals """
+    a, b, c = [Signal(intbv(0)[4:]) for i in range(3)]
+    d, e, f = [Signal(intbv(0)[4:]) for i in range(3)]
+    g1 = comb(a, b, c)
+    g2 = comb(d, e, f)
+    assert set(g1.inputs) == set(['a', 'b'])
+    assert set(g2.inputs) == set(['a', 'b'])
+    assert set(id(s) for s in g1.senslist) == set([id(a), id(b)])
+    assert set(id(s) for s in g2.senslist) == set([id(d), id(e)])
+    assert g1.outputs == g2.outputs == set(['c'])
+
+
+def test_interface_replay():
+    """ attribute references are resolved again for each instance """
+    b1 = Bus()
+    b2 = Bus()
+    g1 = busComb(b1)
+    g2 = busComb(b2)
+    assert g1.symdict['bus_x'] is b1.x
+    assert g2.symdict['bus_x'] is b2.x
+    assert g2.symdict['bus_y'] is b2.y
+    assert len(g2.senslist) == 1
+    assert g2.senslist[0] is b2.x
+
+
+def test_signature():
+    """ a different kind of object gives a different signature """
+    info = _getCodeInfo(waiter)
+    s1 = info.signature(dict(a=Signal(bool(0)), b=Signal(bool(0))))
+    s2 = info.signature(dict(a=Signal(bool(0)), b=Signal(bool(0))))
+    s3 = info.signature(dict(a=delay(10), b=Signal(bool(0))))
+    assert s1 == s2
+    assert s1 != s3
+
+
+def test_save_load():
+    """ the source-derived part survives a roundtrip through a file """
+    info = _getCodeInfo(comb)
+    fd, filename = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        saveCodeCache(filename)
+        clearCodeCache()
+        assert not _codeInfoMap
+        loadCodeCache(filename)
+        new = _getCodeInfo(comb)
+        assert new is not info
+        assert new.digest == info.digest
+        assert new.names == info.names
+        assert new.chains == info.chains
+    finally:
+        os.remove(filename)
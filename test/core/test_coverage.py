@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from myhdl import *
+from myhdl import SimulationError
+
+t_state = enum('IDLE', 'RUN', 'DONE', 'ERROR')
+
+
+def counter(clk, q):
+
+    @always(clk.posedge)
+    def count():
+        q.next = q + 1
+
+    return count
+
+
+def fsm(clk, q, state, err):
+
+    @always(clk.posedge)
+    def step():
+        if state == t_state.IDLE:
+            state.next = t_state.RUN
+        elif state == t_state.RUN:
+            if q == 5:
+                state.next = t_state.DONE
+
+    @always(err.posedge)
+    def error():
+        state.next = t_state.ERROR
+
+    return step, error
+
+
+def top(clk, q, state, err):
+    cnt = counter(clk, q)
+    ctl = fsm(clk, q, state, err)
+    return cnt, ctl
+
+
+def run(duration=100):
+    clk = Signal(bool(0))
+    q = Signal(modbv(0)[4:])
+    state = Signal(t_state.IDLE)
+    err = Signal(bool(0))
+    coverage = SimulationCoverage()
+    dut = coverage(top, clk, q, state, err)
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    Simulation(dut, clkgen).run(duration, quiet=1, coverage=coverage)
+    return coverage
+
+
+def test_toggle():
+    coverage = run()
+    rise, fall, changes, mask = coverage.toggles['top.q']
+    # 10 rising edges: q counts to 10, bit 3 rises but does not fall
+    assert (rise, fall, changes, mask) == (0xf, 0x7, 10, 0xf)
+    assert coverage.toggles['top.clk'][:3] == [1, 1, 20]
+    assert coverage.toggles['top.err'][:3] == [0, 0, 0]
+
+
+def test_states():
+    states = run().states['top.state']
+    assert states['states'] == {'IDLE': 1, 'RUN': 1, 'DONE': 1}
+    assert states['transitions'] == {'IDLE -> RUN': 1, 'RUN -> DONE': 1}
+    assert states['all'] == ['IDLE', 'RUN', 'DONE', 'ERROR']
+
+
+def test_activations():
+    coverage = run()
+    assert coverage.activations == {'top.cnt.count': 10,
+                                     'top.ctl.step': 10,
+                                     'top.ctl.error': 0}
+    summary = coverage.summary()
+    assert summary['blocks'] == [2, 3]
+    assert summary['states'] == [3, 4]
+    assert 'top.ctl.error' in str(coverage)
+    assert 'top.state.ERROR' in str(coverage)
+
+
+def test_merge(tmpdir):
+    path = str(tmpdir.join('coverage.json'))
+    run(200).write(path)
+    coverage = run()
+    coverage.merge(path)
+    assert coverage.toggles['top.q'][:3] == [0xf, 0xf, 30]
+    assert coverage.activations['top.cnt.count'] == 30
+    assert coverage.states['top.state']['transitions']['RUN -> DONE'] == 2
+    data = json.loads(tmpdir.join('coverage.json').read())
+    assert data['summary']['toggle'][1] == 1 + 4 + 1
+
+
+def test_profile():
+    clk = Signal(bool(0))
+    sim = Simulation(counter(clk, Signal(modbv(0)[4:])))
+    with pytest.raises(SimulationError):
+        sim.run(10, quiet=1, profile=SimulationProfile(),
+                coverage=SimulationCoverage())
+
+
+def test_default_names():
+    """ without a hierarchy, the signals of Arrays are covered too """
+    clk = Signal(bool(0))
+    mem = Array((2,), Signal(intbv(0)[2:]))
+
+    @always(clk.posedge)
+    def write():
+        mem[0].next = (mem[0] + 1) % 4
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    coverage = SimulationCoverage()
+    Simulation(write, clkgen).run(100, quiet=1, coverage=coverage)
+    assert coverage.summary()['toggle'] == [1 + 2, 1 + 2 + 2]
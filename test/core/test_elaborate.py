@@ -0,0 +1,75 @@
+import pytest
+
+from myhdl import *
+from myhdl import SimulationError
+from myhdl._elaborate import _error
+
+
+def counter(clk, q):
+    count = intbv(0, min=0, max=16)
+
+    @always(clk.posedge)
+    def logic():
+        count[:] = (count + 1) % 16
+        q.next = count
+
+    return logic
+
+
+def bench(results, calls):
+    calls.append(1)
+    clk = Signal(bool(0))
+    q = Signal(intbv(0)[4:])
+    d = Signal(intbv(0)[6:])
+    s = d(4, 0)
+    dut = counter(clk, q)
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    @instance
+    def check():
+        for i in range(5):
+            yield clk.negedge
+            d.next = q * 2
+            results.append((now(), int(q), int(s)))
+        raise StopSimulation()
+
+    return dut, clkgen, check
+
+
+def test_reuse():
+    """ each simulation starts from the elaborated state """
+    results, calls = [], []
+    design = elaborate(bench, results, calls)
+    design.simulation().run(quiet=1)
+    first = results[:]
+    del results[:]
+    design.simulation().run(quiet=1)
+    assert results == first
+    assert len(calls) == 1
+    assert first[0][0] == 10
+
+
+def test_suspended():
+    """ a design can be reset after a suspended run """
+    results, calls = [], []
+    design = elaborate(bench, results, calls)
+    design.simulation().run(17, quiet=1)
+    del results[:]
+    design.simulation().run(quiet=1)
+    assert results[0] == (10, 1, 0)
+    assert len(results) == 5
+
+
+def test_not_restartable():
+    def g():
+        yield delay(10)
+
+    def top():
+        return g()
+
+    with pytest.raises(SimulationError) as e:
+        elaborate(top)
+    assert e.value.kind == _error.NotRestartable
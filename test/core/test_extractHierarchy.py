@@ -0,0 +1,73 @@
+from myhdl import *
+from myhdl._extractHierarchy import _HierExtr
+
+g = Signal(intbv(0)[4:])
+r = 0
+
+
+def comb(a, b):
+
+    @always_comb
+    def logic():
+        g = a + 1
+        b.next = g
+
+    return logic
+
+
+def top(a, b):
+    u = comb(a, b)
+    return u
+
+
+def test_global_signals():
+    """ signals in the globals are recorded at each level """
+    a, b = [Signal(intbv(0)[4:]) for i in range(2)]
+    h = _HierExtr('top', top, a, b)
+    for inst in h.hierarchy:
+        assert inst.sigdict['g'] is g
+
+
+def test_new_global():
+    """ globals that are added during elaboration are seen """
+    a, b = [Signal(intbv(0)[4:]) for i in range(2)]
+
+    def top2(a, b):
+        u = comb(a, b)
+        globals()['extra'] = Signal(bool(0))
+        return u
+
+    try:
+        h = _HierExtr('top2', top2, a, b)
+        assert 'extra' not in h.hierarchy[1].sigdict
+        assert 'extra' in h.hierarchy[0].sigdict
+    finally:
+        del globals()['extra']
+
+
+def test_rebound_global():
+    """ a global that is rebound to a signal during elaboration is seen """
+    global r
+    a, b = [Signal(intbv(0)[4:]) for i in range(2)]
+
+    def top3(a, b):
+        global r
+        u = comb(a, b)
+        r = Signal(bool(0))
+        return u
+
+    try:
+        h = _HierExtr('top3', top3, a, b)
+        assert 'r' not in h.hierarchy[1].sigdict
+        assert h.hierarchy[0].sigdict['r'] is r
+    finally:
+        r = 0
+
+
+def test_local_hides_global():
+    """ a local variable of a block hides a global signal """
+    a, b = [Signal(intbv(0)[4:]) for i in range(2)]
+    inst = comb(a, b)
+    assert 'g' not in inst.symdict
+    assert inst.inputs == set(['a'])
+    assert inst.symdict['a'] is a
@@ -0,0 +1,81 @@
+from myhdl import *
+from myhdl import SimulationError
+from myhdl._fork import _error
+
+import pytest
+
+
+def bench(results):
+    clk = Signal(bool(0))
+    d = Signal(intbv(0)[8:])
+    q = Signal(intbv(0)[8:])
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    @always(clk.posedge)
+    def logic():
+        q.next = d + 1
+        if q == 100:
+            raise StopSimulation()
+        if q == 200:
+            raise ValueError("bad value")
+
+    @always(clk.negedge)
+    def monitor():
+        results.append(int(q))
+
+    return (clkgen, logic, monitor), d
+
+
+def test_fork():
+    """ each child continues from the parent state with its own stimulus """
+    results = []
+    insts, d = bench(results)
+    sim = Simulation(insts)
+    sim.run(22, quiet=1)
+    prefix = results[:]
+
+    def setup(i):
+        d.next = 10 * (i + 1)
+        return results
+
+    res = sim.fork(3, setup=setup, duration=30)
+    assert [r.index for r in res] == [0, 1, 2]
+    for i, r in enumerate(res):
+        assert r.exception is None
+        assert r.returncode == 1
+        assert r.time == 52
+        assert r.value[:len(prefix)] == prefix
+        assert r.value[-1] == 10 * (i + 1) + 1
+    # the parent is not affected
+    assert results == prefix
+    assert now() == 22
+
+
+def test_fork_stop_and_exception():
+    results = []
+    insts, d = bench(results)
+    sim = Simulation(insts)
+    sim.run(10, quiet=1)
+
+    def setup(i):
+        d.next = (99, 199)[i]
+
+    res = sim.fork(2, setup=setup)
+    assert res[0].returncode == 0
+    assert res[0].exception is None
+    assert res[1].returncode is None
+    assert 'bad value' in res[1].exception
+
+
+def test_fork_finished():
+    results = []
+    insts, d = bench(results)
+    sim = Simulation(insts)
+    d.next = 99
+    sim.run(quiet=1)
+    with pytest.raises(SimulationError) as e:
+        sim.fork(2)
+    assert e.value.kind == _error.Finished
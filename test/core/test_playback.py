@@ -0,0 +1,93 @@
+import struct
+
+import pytest
+
+from myhdl import *
+from myhdl import SimulationError
+
+
+def adder(clk, a, b, q):
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    @always(clk.posedge)
+    def add():
+        q.next = a + b
+
+    return clkgen, add
+
+
+def npy(path, descr, shape, data):
+    """ Write a .npy file, as numpy.save does """
+    header = "{'descr': '%s', 'fortran_order': False, 'shape': %r, }" % \
+        (descr, shape)
+    header += ' ' * (63 - len(header) % 64) + '\n'
+    with open(path, 'wb') as f:
+        f.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)))
+        f.write(header.encode('latin1') + data)
+
+
+def run(path, on, **kwargs):
+    clk = Signal(bool(0))
+    a = Signal(intbv(0)[8:])
+    b = Signal(intbv(0, min=-100, max=100))
+    q = Signal(intbv(0, min=-200, max=300))
+    sums = []
+
+    @always(clk.negedge)
+    def monitor():
+        sums.append(int(q))
+
+    sim = Simulation(adder(clk, a, b, q), monitor)
+    pb = sim.playback([a, b], path, on=on(clk), **kwargs)
+    sim.run(100, quiet=1)
+    return pb, sums
+
+
+def test_raw(tmpdir):
+    path = str(tmpdir.join('vectors.bin'))
+    rows = [(i, -i) for i in range(3)] + [(200, 50), (7, 0)]
+    with open(path, 'wb') as f:
+        for row in rows:
+            f.write(struct.pack('<Bb', *row))
+    pb, sums = run(path, lambda clk: clk.negedge)
+    assert len(pb) == pb.index == 5
+    # a row is applied at a falling edge, and added at the next rising edge
+    assert sums[:6] == [0, 0, 0, 0, 250, 7]
+    assert sums[6:] == [7] * 4
+
+
+def test_npy(tmpdir):
+    path = str(tmpdir.join('vectors.npy'))
+    rows = [(i, i) for i in range(10)]
+    npy(path, '<i4', (10, 2),
+        b''.join(struct.pack('<ii', *row) for row in rows))
+    pb, sums = run(path, lambda clk: clk.negedge)
+    assert pb.index == 10
+    assert sums == [0] + [2 * i for i in range(9)]
+
+
+def test_timed(tmpdir):
+    path = str(tmpdir.join('vectors.bin'))
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<QBbQBb', 0, 1, 2, 42, 5, 5))
+    pb, sums = run(path, lambda clk: None)
+    assert pb.index == 2
+    assert sums == [3, 3, 3, 3, 10, 10, 10, 10, 10, 10]
+
+
+def test_errors(tmpdir):
+    path = str(tmpdir.join('vectors.bin'))
+    with open(path, 'wb') as f:
+        f.write(b'\0' * 3)
+    with pytest.raises(SimulationError):
+        run(path, lambda clk: clk.negedge)
+    with pytest.raises(SimulationError):
+        run(path, lambda clk: clk.negedge, fmt='<B')
+    with pytest.raises(SimulationError):
+        run(path, lambda clk: delay(5))
+    npy(path, '<f8', (1, 2), b'\0' * 16)
+    with pytest.raises(SimulationError):
+        run(path, lambda clk: clk.negedge)
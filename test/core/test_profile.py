@@ -0,0 +1,71 @@
+from myhdl import *
+
+
+def counter(clk, q):
+
+    @always(clk.posedge)
+    def count():
+        q.next = q + 1
+
+    return count
+
+
+def top(clk, q, n):
+    qs = [Signal(modbv(0)[8:]) for i in range(n)]
+    counters = [counter(clk, qs[i]) for i in range(n)]
+    s = q(4, 0)
+
+    @always_comb
+    def total():
+        v = 0
+        for i in range(n):
+            v = v + qs[i]
+        q.next = v % 256
+
+    return counters, total
+
+
+def run():
+    clk = Signal(bool(0))
+    q = Signal(modbv(0)[8:])
+    profile = SimulationProfile()
+    dut = profile(top, clk, q, 3)
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    sim = Simulation(dut, clkgen)
+    sim.run(100, quiet=1, profile=profile)
+    return profile
+
+
+def test_processes():
+    profile = run()
+    stats = dict((p, n) for p, n, t in profile.stats())
+    # the start, and 10 rising edges
+    for i in range(3):
+        assert stats[('top', 'counters%d' % i, 'count')] == 11
+    assert stats[('top', 'total')] >= 11
+    assert stats[('clkgen',)] == 21
+    assert stats[('top', 's')] == 11
+
+
+def test_rollup():
+    profile = run()
+    levels = dict((p, (n, t)) for p, n, t in profile.rollup())
+    assert levels[('top', 'counters1')][0] == 11
+    total = [n for p, n, t in profile.stats() if p == ('top', 'total')][0]
+    assert levels[('top',)][0] == 33 + total + 11
+    assert 'top.counters1' in str(profile)
+
+
+def test_collapsed(tmpdir):
+    profile = run()
+    path = tmpdir.join('sim.folded')
+    profile.writeCollapsed(str(path))
+    lines = path.read().splitlines()
+    assert len(lines) == len(profile.stats())
+    stacks = [l.rsplit(' ', 1)[0] for l in lines]
+    assert 'top;counters0;count' in stacks
+    assert all(l.rsplit(' ', 1)[1].isdigit() for l in lines)
@@ -0,0 +1,56 @@
+import json
+
+from myhdl import *
+
+
+def bench(clk, q):
+
+    @always(delay(5))
+    def clkgen():
+        clk.next = not clk
+
+    @always(clk.posedge)
+    def count():
+        q.next = q + 1
+
+    return clkgen, count
+
+
+def test_stats(tmpdir):
+    clk = Signal(bool(0))
+    q = Signal(modbv(0)[8:])
+    sim = Simulation(bench(clk, q))
+    sim.stats.filename = str(tmpdir.join('stats.json'))
+    sim.run(100, quiet=1)
+    stats = sim.stats
+    # the timesteps 0, 5, ... 100
+    assert stats.timesteps == 21
+    assert stats.simulated == 100
+    assert stats.events == 21
+    assert stats.rate > 0
+    data = json.loads(tmpdir.join('stats.json').read())
+    assert data['deltas'] == stats.deltas
+
+    # the counters go on in the next run; the rising edges take 3 delta
+    # cycles, and the falling edges 2
+    deltas, updates, events = stats.deltas, stats.updates, stats.events
+    sim.run(50, quiet=1)
+    assert stats.timesteps == 31
+    assert stats.simulated == 150
+    assert stats.deltas - deltas == 5 * 3 + 5 * 2
+    assert stats.updates - updates == 10 + 5
+    # the delays of the clock; the end of the run is scheduled before
+    # the run starts
+    assert stats.events - events == 10
+    assert stats.histogram[3] == 15
+    assert '3: 15' in str(stats)
+
+
+def test_interval(capsys):
+    clk = Signal(bool(0))
+    q = Signal(modbv(0)[8:])
+    sim = Simulation(bench(clk, q))
+    sim.stats.interval = 1e-9
+    sim.run(20, quiet=1)
+    err = capsys.readouterr()[1]
+    assert err.count('timesteps') == 4
@@ -11,25 +11,60 @@ from __future__ import print_function
 # import inspect
 
 
+import logging
+
+
 tracejbindentlevel = 0
 previous = False
 DEBUGINDENT = 2
 
+# the trace output goes to the 'myhdl.trace' logger; by default it is
+# printed, but it can be redirected or silenced with the logging module
+_logger = logging.getLogger('myhdl.trace')
+
+
+class _PrintHandler(logging.Handler):
+
+    """ Print the records on the current sys.stdout """
+
+    def emit(self, record):
+        print(self.format(record))
+
+
+_logger.addHandler(_PrintHandler())
+_logger.setLevel(logging.DEBUG)
+_logger.propagate = False
+
 
 class Tracing(object):
 
+    """ Trace messages, in a stack of contexts that can switch tracing.
+
+    Nothing is formatted when tracing is off: use log() with a format
+    string and its arguments instead of formatting at the call site.
+    """
+
     def __init__(self, initialstate=False, message=None, source=None):
         self._level = 0
         self._trace = initialstate
         self._message = message if message is not None else ''
         self._source = source
         self._tracestack = []
+        if source is None:
+            self._logger = _logger
+        else:
+            self._logger = _logger.getChild(source)
+
+    @property
+    def enabled(self):
+        return self._trace and self._logger.isEnabledFor(logging.DEBUG)
 
     def push(self, newstate=None, message=None):
-        self._tracestack.append([self._trace, self._message])
+        self._tracestack.append((self._trace, self._message))
         if newstate is not None:
             self._trace = bool(newstate)
-        self._message += (' ' + message) if message is not None else ''
+        if message is not None:
+            self._message = (self._message, message)
         self._level += 2
 
     def pop(self):
@@ -37,13 +72,31 @@ class Tracing(object):
             self._trace, self._message = self._tracestack.pop()
             self._level -= 2
 
+    def _context(self):
+        # the messages are only joined when something is traced
+        parts = []
+        message = self._message
+        while isinstance(message, tuple):
+            message, part = message
+            parts.append(part)
+        parts.append(message)
+        return ' '.join(reversed(parts))
+
+    def _emit(self, text):
+        if self._source is None:
+            prefix = '{}  '.format(self._context())
+        else:
+            prefix = '[{} {}]  '.format(self._source, self._context())
+        self._logger.debug(prefix + text)
+
     def print(self, *args):
-        if self._trace:
-            if self._source is None:
-                print('{}  '.format(self._message), end='')
-            else:
-                print('[{} {}]  '.format(self._source, self._message), end='')
-            print(*args)
+        if self._trace and self._logger.isEnabledFor(logging.DEBUG):
+            self._emit(' '.join(str(arg) for arg in args))
+
+    def log(self, fmt, *args):
+        """ Trace fmt.format(*args), only formatting it when traced """
+        if self._trace and self._logger.isEnabledFor(logging.DEBUG):
+            self._emit(fmt.format(*args))
 
 
 # filetracejb = open("Tracejb.log", 'w')